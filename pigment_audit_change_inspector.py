@@ -4,16 +4,43 @@ Pigment audit change inspector.
 """
 from __future__ import annotations
 
+import sys
+
+if __name__ == "__main__" and sys.argv[1:2] == ["quick"]:
+    # Dispatch before the pandas/asyncio imports below so a quick scan starts in interpreter time.
+    from pigment_audit_quick import quick_main
+
+    raise SystemExit(quick_main(sys.argv[2:]))
+
 import argparse
+import asyncio
+import hashlib
+import html
 import json
 import logging
 import os
+import random
 import re
-from dataclasses import dataclass
-from typing import Any, Dict, Iterable, List, Optional, Tuple
-
+import shutil
+import ssl
+import tempfile
+import time
+import urllib.parse
+import zlib
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
 import pandas as pd
 
+from pigment_audit_quick import SEVERITY_RANK, base_severity, categorize_event, is_change_event, quick_main
+
+# Stages below filter or add columns to frames they own instead of copying them defensively;
+# copy-on-write (always on from pandas 3) keeps filtered frames and shallow copies from sharing writes.
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
 try:
     from zoneinfo import ZoneInfo
 except Exception:  # pragma: no cover - fallback for older Python
@@ -27,6 +54,207 @@ UUID_RE = re.compile(
     r"[0-9a-fA-F]{12}"
 )
 
+# Formula tokens: comments, double-quoted list items/text, UUIDs and numbers are matched only to be
+# skipped; block references are bare or single-quoted names, optionally followed by `.Property`.
+FORMULA_TOKEN_RE = re.compile(
+    r"//[^\n]*|/\*.*?(?:\*/|$)"
+    r'|"(?:[^"]|"")*"'
+    r"|" + UUID_RE.pattern +
+    r"|\d[\w.]*"
+    r"|(?P<name>'(?:[^']|'')+'|[^\W\d]\w*)"
+    r"(?:\s*\.\s*(?P<member>'(?:[^']|'')+'|[^\W\d]\w*))?"
+    r"(?P<call>\s*\()?",
+    re.S,
+)
+FORMULA_KEYWORDS = frozenset({
+    "FILTER", "EXCLUDE", "SELECT", "REMOVE", "KEEP", "ADD", "BY", "ON",
+    "SUM", "AVG", "MEDIAN", "MIN", "MAX", "FIRST", "FIRSTNONBLANK", "LAST", "LASTNONBLANK",
+    "STDEVS", "STDEVP", "COUNT", "COUNTBLANK", "COUNTALL", "COUNTUNIQUE", "ANY", "ALL", "TEXTLIST",
+    "CONSTANT", "SPLIT", "CURRENTVALUE", "TRUE", "FALSE", "BLANK", "AND", "OR", "NOT",
+})
+NAME_SCOPE_ANY = "\x1f*"
+
+AUDIT_COLUMNS = [
+    "event_id",
+    "event_timestamp",
+    "event_type",
+    "payload_json",
+    "actor_type",
+    "entity_application_id",
+    "entity_application_name",
+    "entity_id",
+    "entity_name",
+    "entity_type",
+    "user_email",
+    "organization_name",
+]
+PAYLOAD_FIELDS = {
+    "payload_entity_application_id": ["entity", "application", "id"],
+    "payload_entity_application_name": ["entity", "application", "name"],
+    "payload_entity_type": ["entity", "entityType"],
+    "payload_entity_id": ["entity", "id"],
+    "payload_entity_name": ["entity", "name"],
+    "payload_settings_dataType": ["settings", "dataType"],
+    "payload_settings_isSecurityBlock": ["settings", "isSecurityBlock"],
+    "payload_type": ["type"],
+}
+SEVERITY_BY_RANK = {v: k for k, v in SEVERITY_RANK.items()}
+ENTITY_SUMMARY_KEYS = ["application_id_norm", "entity_type_norm", "entity_id_norm"]
+METADATA_COLUMNS = [
+    "meta_name",
+    "meta_entity_type",
+    "meta_application_id",
+    "meta_application_name",
+    "meta_data_type",
+    "meta_is_security_block",
+    "meta_dimensions",
+    "dependency_extraction_method",
+    "direct_dependents_count",
+    "transitive_dependents_count",
+    "boards_using_count",
+    "views_using_count",
+    "boards_impacted_transitive",
+    "views_impacted_transitive",
+    "diff_changed_fields",
+    "diff_summary",
+]
+METADATA_COUNT_COLUMNS = METADATA_COLUMNS[8:14]
+
+OUT_OF_CORE_OVERHEAD = 6
+OUT_OF_CORE_MERGE_FAN_IN = 16
+OUT_OF_CORE_MIN_ROWS = 1000
+MIN_SORT_TS = pd.Timestamp("1678-01-01", tz="UTC")
+MAX_SORT_TS = pd.Timestamp("2262-04-11", tz="UTC")
+DEDUPE_ORDER = ["event_id", "__sort_ts", "__row_num"]
+TIME_ORDER = ["__sort_ts", "event_id"]
+
+WATCH_SETTLE_SECONDS = 2.0
+
+# pandas' default NA markers, so the DuckDB scan reads the same cells as missing.
+AUDIT_NA_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+]
+
+METADATA_NORMALIZE_BATCH = 20_000
+# Collections being normalized by forked workers; set only for the lifetime of that pool.
+_NORMALIZE_SOURCE: List[Tuple[str, List[Any]]] = []
+
+BATCH_MEMORY_FACTOR = 8
+BATCH_SUMMARY_COLUMNS = ["name", "status", "exit_code", "wall_seconds", "cpu_seconds", "audit", "out", "error"]
+BATCH_MANIFEST_KEYS = {"defaults", "orgs"}
+BATCH_ENTRY_KEYS = {"name", "audit", "metadata", "metadata_before", "metadata_after", "library", "out", "args"}
+# Library contexts built in this process, keyed by file signature; batch workers inherit it on fork.
+LIBRARY_CONTEXT_CACHE: Dict[Tuple[Tuple[str, int, int], ...], MetadataContext] = {}
+
+CHANGE_SESSION_MAX_ENTITIES = 20
+CHANGE_SESSION_COLUMNS = [
+    "session_id",
+    "actor",
+    "actor_label",
+    "session_start",
+    "session_end",
+    "duration_minutes",
+    "change_count",
+    "distinct_entities",
+    "distinct_applications",
+    "max_risk_score",
+    "affected_entities",
+]
+
+SKETCH_CAPACITY = 1000
+SKETCH_CM_WIDTH = 4096
+SKETCH_CM_DEPTH = 5
+SKETCH_HLL_PRECISION = 14
+SKETCH_DIMENSIONS = {"application": "application_name", "user": "user_email"}
+SKETCH_DISTINCT_COLUMNS = {
+    "events": "event_id",
+    "users": "user_email",
+    "applications": "application_name",
+    "changed entities": "entity_id",
+}
+
+REPORT_NEXT_CHECKS = [
+    "",
+    "## Next Checks",
+    "- Validate critical deletions and security changes for intent and approvals.",
+    "- Review formula or metric updates with high blast radius for regressions.",
+    "- Confirm data exports were authorized and expected.",
+    "- Audit impersonation sessions for scope and duration.",
+]
+REPORT_SHARD_ROWS = 500
+REPORT_SHARD_DIR = "report_shards"
+REPORT_SHARD_TABLES = {
+    "changes_by_risk": (
+        "Changes by risk score",
+        ["time", "severity", "event_type", "entity", "application", "user", "risk_score", "risk_reasons"],
+    ),
+    "changes_by_app": ("Changes by application", ["application", "change_count", "max_risk"]),
+    "changes_by_user": ("Changes by user", ["user", "change_count", "max_risk"]),
+    "change_sessions": (
+        "Change sessions (bursts)",
+        ["start", "end", "actor", "change_count", "distinct_entities", "max_risk", "affected_entities"],
+    ),
+    "exports": ("Exports", ["time", "entity", "user"]),
+    "impersonations": ("Impersonations", ["time", "user"]),
+}
+REPORT_SHARD_SOURCE_COLUMNS = [
+    "event_id",
+    "event_timestamp_utc",
+    "severity",
+    "event_type",
+    "entity_name",
+    "meta_name",
+    "application_name",
+    "user_email",
+    "actor_label",
+    "risk_score",
+    "risk_reasons",
+]
+RISK_ORDER = ["__neg_risk", "__neg_ts", "event_id"]
+
+PAYLOAD_STORE_DIR = "payload_store"
+PAYLOAD_DICT_SAMPLES = 2000
+PAYLOAD_DICT_SIZE = 112_640
+PAYLOAD_FETCH_ROWS = 10_000
+
+# Daily change-rate baselines (--rate-baselines): dimension -> events column holding its key.
+RATE_DIMENSIONS = {"actor": "user_email", "application": "application_id"}
+RATE_HALF_LIFE_DAYS = 14.0
+RATE_MIN_HISTORY_DAYS = 7
+RATE_ANOMALY_Z = 4.0
+RATE_ANOMALY_MIN_COUNT = 20
+RATE_FLAG_RETENTION_DAYS = 366
+EPOCH_UTC = pd.Timestamp("1970-01-01", tz="UTC")
+
+FETCH_RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+EVENT_QUERY_KEYS = ["entity_id", "user_email", "application_id"]
+EVENT_QUERY_COLUMNS = [
+    "event_id",
+    "event_timestamp_utc",
+    "event_type",
+    "category",
+    "severity",
+    "risk_score",
+    "risk_reasons",
+    "actor_label",
+    "user_email",
+    "entity_type",
+    "entity_id",
+    "entity_name",
+    "meta_name",
+    "application_id",
+    "application_name",
+    "direct_dependents_count",
+    "transitive_dependents_count",
+    "boards_using_count",
+    "views_using_count",
+    "boards_impacted_transitive",
+    "views_impacted_transitive",
+    "diff_changed_fields",
+]
+
 
 @dataclass
 class MetadataContext:
@@ -35,6 +263,21 @@ class MetadataContext:
     reverse_deps: Dict[str, List[str]]
     views_using: Dict[str, int]
     boards_using: Dict[str, int]
+    views_by_entity: Dict[str, List[str]] = field(default_factory=dict)
+    boards_by_entity: Dict[str, List[str]] = field(default_factory=dict)
+    dependencies: Dict[str, List[str]] = field(default_factory=dict)
+    unresolved_refs: Dict[str, List[str]] = field(default_factory=dict)
+    waiting_on: Dict[str, List[str]] = field(default_factory=dict)
+    view_underlying: Dict[str, str] = field(default_factory=dict)
+    board_targets: Dict[str, List[str]] = field(default_factory=dict)
+    view_boards: Dict[str, List[str]] = field(default_factory=dict)
+    transitive_cache: Dict[str, int] = field(default_factory=dict)
+    name_index: Dict[str, Dict[str, List[str]]] = field(default_factory=dict)
+    name_refs: Dict[str, List[str]] = field(default_factory=dict)
+    name_referrers: Dict[str, List[str]] = field(default_factory=dict)
+    # Whole-graph board/view reach, filled lazily by transitive_usage(); None until computed.
+    boards_impacted_transitive: Optional[Dict[str, int]] = None
+    views_impacted_transitive: Optional[Dict[str, int]] = None
 
 
 @dataclass
@@ -43,6 +286,87 @@ class DiffContext:
     diff_summary: Dict[str, str]
 
 
+@dataclass
+class MetadataDelta:
+    upserts: Dict[str, Dict[str, Any]]
+    removed: List[str]
+
+
+@dataclass
+class MetadataSeries:
+    labels: List[str]
+    effective_from: List[pd.Timestamp]
+    base: MetadataContext
+    deltas: List[MetadataDelta]
+
+
+@dataclass
+class ReportAggregates:
+    top_n: int
+    total_events: int
+    total_changes: int
+    export_count: int
+    impersonation_count: int
+    orgs: Set[str]
+    apps: Set[str]
+    start: Optional[pd.Timestamp]
+    end: Optional[pd.Timestamp]
+    top_changes: pd.DataFrame
+    high_risk: pd.DataFrame
+    by_app: pd.DataFrame
+    by_user: pd.DataFrame
+    exports: pd.DataFrame
+    impersonations: pd.DataFrame
+    sessions: Optional[pd.DataFrame] = None
+
+
+@dataclass
+class EntitySummaryPartial:
+    base: pd.DataFrame
+    event_type_counts: pd.DataFrame
+    user_counts: pd.DataFrame
+
+
+@dataclass
+class StreamingSummary:
+    rows: int
+    changes: int
+    export_count: int
+    impersonation_count: int
+    start: Optional[pd.Timestamp]
+    end: Optional[pd.Timestamp]
+    severity_counts: Dict[str, int]
+    heavy_hitters: Dict[str, "SpaceSaving"]
+    frequencies: Dict[str, "CountMinSketch"]
+    distinct: Dict[str, "HyperLogLog"]
+
+
+@dataclass
+class EventQueryIndex:
+    events: pd.DataFrame
+    times: pd.Series
+    time_positions: pd.Index
+    by_key: Dict[str, Tuple[pd.Series, pd.Series, pd.Index]]
+
+
+@dataclass
+class WatchState:
+    meta_ctx: Optional[MetadataContext]
+    diff_ctx: Optional[DiffContext]
+    metadata_signature: Optional[Tuple[Tuple[str, int, int], ...]]
+    seen_files: Dict[str, Tuple[int, int]]
+    # event_id -> timestamp (epoch microseconds, undated as MAX_SORT_TS) of the ingested copy
+    event_ids: Dict[str, int]
+    row_offset: int
+    report_aggs: Optional[ReportAggregates]
+    summary_partial: Optional[EntitySummaryPartial]
+    # change_session_inputs of every ingested change; files can arrive out of time order, so sessions
+    # are rebuilt from these on each write.
+    session_inputs: List[pd.DataFrame]
+    events_writer: "TableStreamWriter"
+    changes_writer: "TableStreamWriter"
+
+
 def setup_logging(verbose: bool) -> None:
     level = logging.DEBUG if verbose else logging.INFO
     logging.basicConfig(
@@ -51,14 +375,33 @@ def setup_logging(verbose: bool) -> None:
     )
 
 
-def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+def build_arg_parser(prog: Optional[str] = None) -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
-        description="Inspect Pigment audit logs for changes and blast radius."
+        prog=prog,
+        description="Inspect Pigment audit logs for changes and blast radius.",
     )
     parser.add_argument("--audit", required=False, help="Path to audit CSV export")
     parser.add_argument("--metadata", help="Path to metadata snapshot (file or directory)")
     parser.add_argument("--metadata-before", help="Path to metadata BEFORE snapshot")
     parser.add_argument("--metadata-after", help="Path to metadata AFTER snapshot")
+    parser.add_argument(
+        "--metadata-series",
+        help="Directory of dated snapshots (YYYY-MM-DD*.json or YYYY-MM-DD*/); events use the snapshot in effect",
+    )
+    parser.add_argument(
+        "--metadata-at",
+        action="append",
+        default=[],
+        metavar="DATE=PATH",
+        help="Add a dated snapshot to the series (repeatable)",
+    )
+    parser.add_argument(
+        "--metadata-library",
+        action="append",
+        default=[],
+        metavar="PATH",
+        help="Shared library application snapshot layered under the metadata snapshots (repeatable)",
+    )
     parser.add_argument("--out", default="./out", help="Output directory")
     parser.add_argument("--from", dest="date_from", help="Start date YYYY-MM-DD")
     parser.add_argument("--to", dest="date_to", help="End date YYYY-MM-DD")
@@ -72,9 +415,83 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser.add_argument("--timezone", default="UTC", help="Timezone for report display")
     parser.add_argument("--top", type=int, default=20, help="Top N items in report sections")
     parser.add_argument("--format", choices=["csv", "parquet"], default="csv", help="Output format for tables")
+    parser.add_argument(
+        "--html-shards",
+        action="store_true",
+        help="Write report.html as a viewer that lazy-loads full detail tables from paginated JSON shards",
+    )
+    parser.add_argument("--shard-rows", type=int, default=REPORT_SHARD_ROWS, help="Rows per page in --html-shards")
     parser.add_argument("--chunk-rows", type=int, default=None, help="CSV chunk size (rows)")
+    parser.add_argument(
+        "--payload-store",
+        action="store_true",
+        help="Move payload_json into a deduplicated, compressed side table (payload_store/) referenced by payload_hash",
+    )
+    parser.add_argument(
+        "--payload-dictionary",
+        action="store_true",
+        help="Train a zstd dictionary on the payloads for --payload-store",
+    )
+    parser.add_argument(
+        "--rate-baselines",
+        default=None,
+        help="JSON state file of per-actor/per-application daily change-rate baselines; "
+        "updated with this run's new days and used to flag rate_anomaly events",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["pandas", "duckdb"],
+        default="pandas",
+        help="Engine that scans, dedupes, filters, enriches and summarizes the audit (duckdb requires duckdb)",
+    )
+    parser.add_argument(
+        "--session-gap",
+        type=float,
+        default=30.0,
+        help="Minutes of inactivity that end a per-actor change session",
+    )
+    parser.add_argument(
+        "--memory-limit",
+        type=parse_memory_limit,
+        default=None,
+        help="Process out-of-core with on-disk sorted runs, keeping memory near this budget (e.g. 512M, 4G)",
+    )
+    parser.add_argument(
+        "--streaming-summary",
+        action="store_true",
+        help="Write a fixed-memory triage report from streaming sketches (no dedupe or enrichment)",
+    )
+    parser.add_argument(
+        "--sketch-capacity",
+        type=int,
+        default=SKETCH_CAPACITY,
+        help="Heavy-hitter counters kept per dimension in --streaming-summary",
+    )
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes for --streaming-summary chunks")
+    parser.add_argument(
+        "--metadata-workers",
+        type=int,
+        default=None,
+        help="Processes for parsing/normalizing metadata files (default: CPU count; 1 disables)",
+    )
+    parser.add_argument("--spill-dir", default=None, help="Directory for out-of-core spill files (default: system temp)")
+    parser.add_argument("--watch", metavar="DIR", help="Keep running and ingest new audit CSVs as they appear in DIR")
+    parser.add_argument("--watch-interval", type=float, default=30.0, help="Seconds between --watch polls")
     parser.add_argument("--smoke-test", action="store_true", help="Run a tiny in-memory self-test")
     parser.add_argument("--verbose", action="store_true", help="Verbose logging")
+    return parser
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    return build_arg_parser().parse_args(argv)
+
+
+def parse_serve_args(argv: List[str]) -> argparse.Namespace:
+    parser = build_arg_parser(prog="pigment_audit_change_inspector.py serve")
+    parser.description = "Serve enriched audit events over a local HTTP/JSON query API."
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=8765, help="Port to bind (0 picks a free port)")
+    parser.add_argument("--max-results", type=int, default=500, help="Maximum (and default) number of events per response")
     return parser.parse_args(argv)
 
 
@@ -120,16 +537,7 @@ def get_nested(obj: Dict[str, Any], path: List[str]) -> Any:
 
 
 def flatten_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
-    return {
-        "payload_entity_application_id": get_nested(payload, ["entity", "application", "id"]),
-        "payload_entity_application_name": get_nested(payload, ["entity", "application", "name"]),
-        "payload_entity_type": get_nested(payload, ["entity", "entityType"]),
-        "payload_entity_id": get_nested(payload, ["entity", "id"]),
-        "payload_entity_name": get_nested(payload, ["entity", "name"]),
-        "payload_settings_dataType": get_nested(payload, ["settings", "dataType"]),
-        "payload_settings_isSecurityBlock": get_nested(payload, ["settings", "isSecurityBlock"]),
-        "payload_type": payload.get("type"),
-    }
+    return {col: get_nested(payload, path) for col, path in PAYLOAD_FIELDS.items()}
 
 
 def normalize_actor_label(actor_type: Any) -> str:
@@ -144,43 +552,13 @@ def normalize_actor_label(actor_type: Any) -> str:
     return "unknown"
 
 
-def categorize_event(event_type: Optional[str]) -> str:
-    if not event_type:
-        return "other"
-    t = event_type.lower()
-    if "accessed" in t:
-        return "access"
-    if "login" in t or "impersonation" in t:
-        return "auth"
-    if "export" in t:
-        return "export"
-    if any(k in t for k in ["created", "updated", "deleted", "datachanged", "security", "permission", "accessright", "formula", "role", "rights"]):
-        return "change"
-    return "other"
-
-
-def is_change_event(event_type: Optional[str]) -> bool:
-    if not event_type:
-        return False
-    t = event_type.lower()
-    return any(k in t for k in ["created", "updated", "deleted", "datachanged", "security", "permission", "accessright", "formula", "role", "rights"])
-
-
-def base_severity(event_type: Optional[str]) -> str:
-    if not event_type:
-        return "LOW"
-    t = event_type.lower()
-    if any(k in t for k in ["impersonation", "permission", "accessright", "security", "deleted"]):
-        return "CRITICAL"
-    if any(k in t for k in ["metricupdated", "metriccreated", "metricdeleted", "dimensionupdated", "dimensioncreated", "dimensiondeleted", "formula", "boardupdated", "boardcreated", "viewupdated", "viewcreated", "tableupdated", "tablecreated"]):
-        return "HIGH"
-    if any(k in t for k in ["datachanged", "export"]):
-        return "MEDIUM"
-    if "accessed" in t or "login" in t:
-        return "LOW"
-    if is_change_event(event_type):
-        return "MEDIUM"
-    return "LOW"
+def as_count(value: Any) -> int:
+    if value is None or isinstance(value, bool):
+        return 0
+    try:
+        return 0 if pd.isna(value) else int(value)
+    except (TypeError, ValueError):
+        return 0
 
 
 def compute_risk(
@@ -207,6 +585,10 @@ def compute_risk(
     if "impersonation" in et:
         reasons.append("impersonation")
 
+    if safe_str(meta.get("rate_anomaly")):
+        score += 15
+        reasons.append("rate_anomaly")
+
     if meta.get("is_security_block") is True:
         score += 15
         reasons.append("security_block")
@@ -216,44 +598,74 @@ def compute_risk(
         score += 5
         reasons.append("fundamental_data_type")
 
-    direct = meta.get("direct_dependents_count")
-    transitive = meta.get("transitive_dependents_count")
-    boards = meta.get("boards_using_count")
-    views = meta.get("views_using_count")
+    # Counts arrive as floats when the column also holds missing values.
+    direct = as_count(meta.get("direct_dependents_count"))
+    transitive = as_count(meta.get("transitive_dependents_count"))
+    boards = as_count(meta.get("boards_using_count"))
+    views = as_count(meta.get("views_using_count"))
+    boards_transitive = as_count(meta.get("boards_impacted_transitive"))
+    views_transitive = as_count(meta.get("views_impacted_transitive"))
 
-    if isinstance(direct, int) and direct > 0:
+    if direct > 0:
         score += min(20, direct * 2)
         reasons.append(f"direct_dependents={direct}")
-    if isinstance(transitive, int) and transitive > 0:
+    if transitive > 0:
         score += min(20, transitive)
         reasons.append(f"transitive_dependents={transitive}")
-    if isinstance(boards, int) and boards > 0:
-        score += min(15, boards * 3)
-        reasons.append(f"boards_using={boards}")
-    if isinstance(views, int) and views > 0:
-        score += min(10, views)
-        reasons.append(f"views_using={views}")
+    if boards > 0 or boards_transitive > 0:
+        score += min(15, max(boards, boards_transitive) * 3)
+        if boards > 0:
+            reasons.append(f"boards_using={boards}")
+        if boards_transitive > boards:
+            reasons.append(f"boards_impacted_transitive={boards_transitive}")
+    if views > 0 or views_transitive > 0:
+        score += min(10, max(views, views_transitive))
+        if views > 0:
+            reasons.append(f"views_using={views}")
+        if views_transitive > views:
+            reasons.append(f"views_impacted_transitive={views_transitive}")
 
     score = max(0, min(100, score))
     return score, ";".join(reasons)
 
 
-def process_chunk(df: pd.DataFrame, row_offset: int) -> pd.DataFrame:
-    df = df.copy()
-    for col in [
-        "event_id",
-        "event_timestamp",
-        "event_type",
-        "payload_json",
-        "actor_type",
-        "entity_application_id",
-        "entity_application_name",
-        "entity_id",
-        "entity_name",
-        "entity_type",
-        "user_email",
-        "organization_name",
-    ]:
+# compute_risk as DuckDB expressions over the joined events (--engine duckdb); keep the two in step.
+DUCKDB_RISK_SQL = """
+greatest(0, least(100,
+    CASE severity WHEN 'CRITICAL' THEN 80 WHEN 'HIGH' THEN 60 WHEN 'MEDIUM' THEN 40 ELSE 10 END
+    + CASE WHEN contains(__et, 'deleted') THEN 10 ELSE 0 END
+    + CASE WHEN contains(__et, 'formula') THEN 8 ELSE 0 END
+    + CASE WHEN contains(__et, 'metric') AND contains(__et, 'updated') THEN 6 ELSE 0 END
+    + CASE WHEN __rate_flag THEN 15 ELSE 0 END
+    + CASE WHEN __security_block THEN 15 ELSE 0 END
+    + CASE WHEN __fundamental THEN 5 ELSE 0 END
+    + least(20, __direct * 2)
+    + least(20, __transitive)
+    + least(15, greatest(__boards, __boards_transitive) * 3)
+    + least(10, greatest(__views, __views_transitive))
+))::BIGINT AS risk_score,
+concat_ws(';',
+    CASE WHEN contains(__et, 'deleted') THEN 'deletion' END,
+    CASE WHEN contains(__et, 'formula') THEN 'formula_change' END,
+    CASE WHEN contains(__et, 'metric') AND contains(__et, 'updated') THEN 'metric_update' END,
+    CASE WHEN contains(__et, 'export') THEN 'data_export' END,
+    CASE WHEN contains(__et, 'impersonation') THEN 'impersonation' END,
+    CASE WHEN __rate_flag THEN 'rate_anomaly' END,
+    CASE WHEN __security_block THEN 'security_block' END,
+    CASE WHEN __fundamental THEN 'fundamental_data_type' END,
+    CASE WHEN __direct > 0 THEN 'direct_dependents=' || __direct END,
+    CASE WHEN __transitive > 0 THEN 'transitive_dependents=' || __transitive END,
+    CASE WHEN __boards > 0 THEN 'boards_using=' || __boards END,
+    CASE WHEN __boards_transitive > __boards THEN 'boards_impacted_transitive=' || __boards_transitive END,
+    CASE WHEN __views > 0 THEN 'views_using=' || __views END,
+    CASE WHEN __views_transitive > __views THEN 'views_impacted_transitive=' || __views_transitive END
+) AS risk_reasons
+"""
+
+
+def process_chunk(df: pd.DataFrame, row_offset: int, payload_store: Optional[PayloadStore] = None) -> pd.DataFrame:
+    df = df.reset_index(drop=True)
+    for col in AUDIT_COLUMNS:
         if col not in df.columns:
             df[col] = None
     df["__row_num"] = range(row_offset, row_offset + len(df))
@@ -264,17 +676,21 @@ def process_chunk(df: pd.DataFrame, row_offset: int) -> pd.DataFrame:
     df["event_timestamp_utc"] = parse_timestamp_series(df.get("event_timestamp"))
     df["event_timestamp_iso"] = iso_format_series(df["event_timestamp_utc"])
 
-    payloads: List[Dict[str, Any]] = []
-    parse_errors: List[bool] = []
-    for val in df.get("payload_json", pd.Series([None] * len(df))):
-        payload, err = parse_payload(val)
-        payloads.append(payload)
-        parse_errors.append(err)
-    df["payload_parse_error"] = parse_errors
-
-    payload_flat = [flatten_payload(p) for p in payloads]
-    payload_df = pd.DataFrame(payload_flat)
-    df = pd.concat([df.reset_index(drop=True), payload_df.reset_index(drop=True)], axis=1)
+    # Identical payloads are parsed once and their rows share the result; missing ones (code -1) take the
+    # trailing empty entry.
+    codes, uniques = pd.factorize(df["payload_json"])
+    parsed = [parse_payload(val) for val in uniques] + [({}, False)]
+    flat = [flatten_payload(payload) for payload, _ in parsed]
+    df["payload_parse_error"] = [parsed[c][1] for c in codes]
+
+    payload_df = pd.DataFrame([flat[c] for c in codes], index=df.index)
+    for col in payload_df.columns:
+        df[col] = payload_df[col]
+    if payload_store is not None:
+        # The raw text moves to the store here; rows keep only its hash, in the same column position.
+        keys = np.array(payload_store.add(uniques) + [None], dtype=object)
+        df["payload_json"] = keys[codes]
+        df = df.rename(columns={"payload_json": "payload_hash"})
 
     actor_series = df["actor_type"] if "actor_type" in df.columns else pd.Series([None] * len(df))
     df["actor_label"] = actor_series.map(normalize_actor_label)
@@ -291,43 +707,52 @@ def process_chunk(df: pd.DataFrame, row_offset: int) -> pd.DataFrame:
 
 
 def dedupe_events(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.sort_values(by=["event_timestamp_utc", "event_id"], kind="mergesort")
-    df = df.drop_duplicates(subset=["event_id"], keep="last")
-    return df
+    # Sort and dedupe the two key columns only, then take the surviving rows in a single pass.
+    keys = df[["event_timestamp_utc", "event_id"]].reset_index(drop=True)
+    keys = keys.sort_values(by=["event_timestamp_utc", "event_id"], kind="mergesort")
+    return df.iloc[keys.drop_duplicates(subset=["event_id"], keep="last").index]
 
 
-def read_audit_csv(path: str, chunk_rows: Optional[int] = None) -> pd.DataFrame:
+def audit_chunk_rows(path: str, chunk_rows: Optional[int] = None) -> Optional[int]:
     size_mb = os.path.getsize(path) / (1024 * 1024)
     if chunk_rows is None and size_mb > 50:
-        chunk_rows = 200_000
+        return 200_000
+    return chunk_rows
 
+
+def read_audit_csv(
+    path: str,
+    chunk_rows: Optional[int] = None,
+    payload_store: Optional[PayloadStore] = None,
+) -> pd.DataFrame:
+    chunk_rows = audit_chunk_rows(path, chunk_rows)
     if chunk_rows:
         logging.info("Reading audit CSV in chunks of %s rows", chunk_rows)
-        store: Dict[str, Dict[str, Any]] = {}
+        parts: List[pd.DataFrame] = []
         offset = 0
-        for chunk in pd.read_csv(path, dtype=str, chunksize=chunk_rows, low_memory=False):
-            processed = process_chunk(chunk, offset)
+        for chunk_no, chunk in enumerate(pd.read_csv(path, dtype=str, chunksize=chunk_rows, low_memory=False)):
+            processed = process_chunk(chunk, offset, payload_store)
             processed = processed.sort_values(by=["event_timestamp_utc", "event_id"], kind="mergesort")
             processed = processed.drop_duplicates(subset=["event_id"], keep="last")
-            for _, row in processed.iterrows():
-                eid = row.get("event_id")
-                if eid is None:
-                    continue
-                ts = row.get("event_timestamp_utc")
-                existing = store.get(eid)
-                if existing is None:
-                    store[eid] = row.to_dict()
-                else:
-                    existing_ts = existing.get("event_timestamp_utc")
-                    if pd.isna(existing_ts) or (pd.notna(ts) and ts > existing_ts):
-                        store[eid] = row.to_dict()
+            # Across chunks the latest timestamp wins, the earliest chunk on ties, and the last
+            # chunk when no copy has a timestamp.
+            missing_ts = processed["event_timestamp_utc"].isna().to_numpy()
+            processed["__chunk_rank"] = np.where(missing_ts, chunk_no, -chunk_no)
+            parts.append(processed)
             offset += len(chunk)
-        df = pd.DataFrame(store.values())
-        return dedupe_events(df)
+        if not parts:
+            return process_chunk(pd.read_csv(path, dtype=str, low_memory=False), 0, payload_store)
+        df = pd.concat(parts, ignore_index=True)
+        del parts
+        keys = df[["event_timestamp_utc", "__chunk_rank", "event_id"]]
+        keys = keys.sort_values(by=["event_timestamp_utc", "__chunk_rank"], kind="mergesort", na_position="first")
+        keys = keys.drop_duplicates(subset=["event_id"], keep="last")
+        keys = keys.sort_values(by=["event_timestamp_utc", "event_id"], kind="mergesort")
+        return df.drop(columns=["__chunk_rank"]).iloc[keys.index]
 
     logging.info("Reading audit CSV")
     df = pd.read_csv(path, dtype=str, low_memory=False)
-    df = process_chunk(df, 0)
+    df = process_chunk(df, 0, payload_store)
     return dedupe_events(df)
 
 
@@ -359,33 +784,40 @@ def load_json_file(path: str) -> Any:
         return json.load(f)
 
 
-def load_metadata(path: str) -> Dict[str, List[Dict[str, Any]]]:
-    collections: Dict[str, List[Dict[str, Any]]] = {}
+def metadata_files(path: str) -> List[str]:
     if os.path.isdir(path):
-        for fname in os.listdir(path):
-            if not fname.endswith(".json"):
-                continue
-            fpath = os.path.join(path, fname)
-            try:
-                data = load_json_file(fpath)
-            except Exception as exc:
-                logging.warning("Failed to parse %s: %s", fpath, exc)
-                continue
-            key = normalize_collection_name(os.path.splitext(fname)[0])
-            if isinstance(data, list):
-                collections[key] = data
-            elif isinstance(data, dict):
-                for k, v in data.items():
-                    if isinstance(v, list):
-                        collections[normalize_collection_name(k)] = v
+        return [os.path.join(path, f) for f in sorted(os.listdir(path)) if f.endswith(".json")]
+    return [path]
+
+
+def read_metadata_file(fpath: str, in_directory: bool) -> List[Tuple[str, List[Any]]]:
+    # (collection, items) pairs in file order. Unparseable files in a directory are skipped;
+    # a single snapshot file that fails to parse is an error.
+    if in_directory:
+        try:
+            data = load_json_file(fpath)
+        except Exception as exc:
+            logging.warning("Failed to parse %s: %s", fpath, exc)
+            return []
+        default_key = normalize_collection_name(os.path.splitext(os.path.basename(fpath))[0])
     else:
-        data = load_json_file(path)
-        if isinstance(data, list):
-            collections["items"] = data
-        elif isinstance(data, dict):
-            for k, v in data.items():
-                if isinstance(v, list):
-                    collections[normalize_collection_name(k)] = v
+        data = load_json_file(fpath)
+        default_key = "items"
+    if isinstance(data, list):
+        return [(default_key, data)]
+    if isinstance(data, dict):
+        return [(normalize_collection_name(k), v) for k, v in data.items() if isinstance(v, list)]
+    return []
+
+
+def load_metadata(path: str) -> Dict[str, List[Dict[str, Any]]]:
+    # Files are read in name order and same-named collections are concatenated, so per-application
+    # export files all contribute and later files win on duplicate ids.
+    collections: Dict[str, List[Dict[str, Any]]] = {}
+    in_directory = os.path.isdir(path)
+    for fpath in metadata_files(path):
+        for key, items in read_metadata_file(fpath, in_directory):
+            collections.setdefault(key, []).extend(items)
     return collections
 
 
@@ -463,6 +895,7 @@ def normalize_entity(item: Dict[str, Any], collection_hint: str) -> Optional[Dic
         "dimensions": dimensions,
         "formula": formula,
         "explicit_dependencies": explicit_deps,
+        "collection": collection_hint,
         "raw": item,
     }
 
@@ -474,47 +907,277 @@ def extract_uuid_dependencies(formula: Any) -> List[str]:
     return list({m.group(0) for m in UUID_RE.finditer(s)})
 
 
-def build_metadata_context(collections: Dict[str, List[Dict[str, Any]]]) -> MetadataContext:
-    index: Dict[str, Dict[str, Any]] = {}
-    views_raw: List[Tuple[str, Dict[str, Any]]] = []
-    boards_raw: List[Tuple[str, Dict[str, Any]]] = []
+def unquote_name(token: str) -> str:
+    return token[1:-1].replace("''", "'") if token[:1] == "'" else token
 
-    for name, items in collections.items():
-        hint = normalize_collection_name(name)
-        for item in items:
-            if not isinstance(item, dict):
-                continue
-            norm = normalize_entity(item, hint)
-            if not norm:
-                continue
-            entity_id = norm["id"]
-            index[entity_id] = norm
-            if norm["entity_type"].lower() == "view" or hint == "views":
-                views_raw.append((entity_id, item))
-            if norm["entity_type"].lower() == "board" or hint == "boards":
-                boards_raw.append((entity_id, item))
 
-    dependency_method: Dict[str, str] = {}
-    deps_map: Dict[str, List[str]] = {}
+def formula_references(formula: Any) -> List[Tuple[str, Optional[str]]]:
+    # (name, property) pairs referenced by a formula; keywords and function calls are skipped.
+    if not formula:
+        return []
+    refs: Dict[Tuple[str, Optional[str]], None] = {}
+    for name, member, call in FORMULA_TOKEN_RE.findall(str(formula)):
+        if not name:
+            continue
+        if name[0] != "'" and (call or name.upper() in FORMULA_KEYWORDS):
+            continue
+        refs[(unquote_name(name), unquote_name(member) if member else None)] = None
+    return list(refs)
 
-    for entity_id, norm in index.items():
-        explicit = norm.get("explicit_dependencies") or []
-        if explicit:
-            deps_map[entity_id] = [d for d in explicit if d in index]
-            dependency_method[entity_id] = "explicit"
-        else:
-            deps_map[entity_id] = []
 
+def entity_name_entries(norm: Dict[str, Any]) -> List[Tuple[str, str]]:
+    # (casefolded name, scope) pairs. Blocks are indexed within their application and globally
+    # (for library references); list properties only under their parent list id, so
+    # `List.Property` never collides with a block of the same name.
+    name = norm.get("name")
+    if not name or norm.get("collection") in {"applications", "orgs"}:
+        return []
+    if is_view_entity(norm) or is_board_entity(norm):
+        return []
+    name = str(name).casefold()
+    parent = first_present(norm["raw"], ["listId", "parentListId"])
+    if parent and str(parent) != norm["id"]:
+        return [(name, str(parent))]
+    app_id = norm.get("application_id")
+    return [(name, str(app_id) if app_id else ""), (name, NAME_SCOPE_ANY)]
+
+
+def build_name_index(index: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, List[str]]]:
+    name_index: Dict[str, Dict[str, List[str]]] = {}
     for entity_id, norm in index.items():
-        if deps_map.get(entity_id):
+        for name, scope in entity_name_entries(norm):
+            name_index.setdefault(name, {}).setdefault(scope, []).append(entity_id)
+    return name_index
+
+
+def resolve_name_references(
+    norm: Dict[str, Any],
+    name_index: Dict[str, Dict[str, List[str]]],
+) -> Tuple[List[str], List[str]]:
+    # Returns (resolved ids, casefolded names looked up). Names resolve within the entity's
+    # application first, then globally when exactly one entity carries the name.
+    deps: Dict[str, None] = {}
+    names: Dict[str, None] = {}
+    app_id = norm.get("application_id")
+    scope = str(app_id) if app_id else ""
+    for name, member in formula_references(norm.get("formula")):
+        name = name.casefold()
+        names[name] = None
+        scopes = name_index.get(name)
+        if not scopes:
+            continue
+        hits = scopes.get(scope)
+        if not hits:
+            hits = scopes.get(NAME_SCOPE_ANY)
+            if not hits or len(hits) > 1:
+                continue
+        deps.update(dict.fromkeys(hits))
+        if member:
+            member = member.casefold()
+            names[member] = None
+            props = name_index.get(member)
+            if props:
+                for hit in hits:
+                    deps.update(dict.fromkeys(props.get(hit, ())))
+    deps.pop(norm["id"], None)
+    return list(deps), list(names)
+
+
+def normalize_items(name: str, items: Iterable[Any]) -> List[Dict[str, Any]]:
+    hint = normalize_collection_name(name)
+    out: List[Dict[str, Any]] = []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        norm = normalize_entity(item, hint)
+        if norm:
+            out.append(norm)
+    return out
+
+
+def metadata_workers(requested: Optional[int], tasks: int) -> int:
+    if tasks < 2:
+        return 1
+    return max(1, min(requested or os.cpu_count() or 1, tasks))
+
+
+def fork_context() -> Any:
+    import multiprocessing
+
+    return multiprocessing.get_context("fork") if "fork" in multiprocessing.get_all_start_methods() else None
+
+
+def _normalize_shared_batch(pos: int, start: int, stop: int) -> List[Optional[Dict[str, Any]]]:
+    # Runs in a forked worker: items are read from the parent's memory and results travel back
+    # without "raw", which the parent re-attaches from its own copy.
+    name, items = _NORMALIZE_SOURCE[pos]
+    hint = normalize_collection_name(name)
+    out: List[Optional[Dict[str, Any]]] = []
+    for item in items[start:stop]:
+        norm = normalize_entity(item, hint) if isinstance(item, dict) else None
+        if norm:
+            del norm["raw"]
+        out.append(norm)
+    return out
+
+
+def normalize_collections(
+    collections: Dict[str, List[Dict[str, Any]]],
+    workers: Optional[int] = None,
+) -> Dict[str, Dict[str, Any]]:
+    global _NORMALIZE_SOURCE
+    index: Dict[str, Dict[str, Any]] = {}
+    sources = list(collections.items())
+    batches = [
+        (pos, start, min(start + METADATA_NORMALIZE_BATCH, len(items)))
+        for pos, (_, items) in enumerate(sources)
+        for start in range(0, len(items), METADATA_NORMALIZE_BATCH)
+    ]
+    workers = metadata_workers(workers, len(batches))
+    mp_context = fork_context() if workers > 1 else None
+    if mp_context is None:
+        for name, items in sources:
+            for norm in normalize_items(name, items):
+                index[norm["id"]] = norm
+        return index
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    # Batches come back in submission order and are inserted in that order, so duplicate ids
+    # resolve exactly as in the sequential loop (last writer wins, first position kept).
+    _NORMALIZE_SOURCE = sources
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context) as pool:
+            results = pool.map(_normalize_shared_batch, *zip(*batches))
+            for (pos, start, _), norms in zip(batches, results):
+                items = sources[pos][1]
+                for offset, norm in enumerate(norms):
+                    if norm is not None:
+                        norm["raw"] = items[start + offset]
+                        index[norm["id"]] = norm
+    finally:
+        _NORMALIZE_SOURCE = []
+    return index
+
+
+def load_normalized_file(fpath: str, in_directory: bool) -> List[Tuple[str, List[Dict[str, Any]]]]:
+    return [(key, normalize_items(key, items)) for key, items in read_metadata_file(fpath, in_directory)]
+
+
+def load_metadata_index(paths: List[str], workers: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+    # Same result as normalize_collections over the concatenated collections of ``paths``, but
+    # with several files each one is parsed and normalized on a worker.
+    files = [(fpath, os.path.isdir(path)) for path in paths for fpath in metadata_files(path)]
+    file_workers = metadata_workers(workers, len(files))
+    if file_workers <= 1:
+        # One file (or one worker): parse here, then split normalization into batches instead.
+        collections: Dict[str, List[Dict[str, Any]]] = {}
+        for path in paths:
+            for key, items in load_metadata(path).items():
+                collections.setdefault(key, []).extend(items)
+        return normalize_collections(collections, workers)
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    grouped: Dict[str, List[List[Dict[str, Any]]]] = {}
+    with ProcessPoolExecutor(max_workers=file_workers, mp_context=fork_context()) as pool:
+        for parts in pool.map(load_normalized_file, *zip(*files)):
+            for key, norms in parts:
+                grouped.setdefault(key, []).append(norms)
+    index: Dict[str, Dict[str, Any]] = {}
+    for parts in grouped.values():
+        for norms in parts:
+            for norm in norms:
+                index[norm["id"]] = norm
+    return index
+
+
+def is_view_entity(norm: Dict[str, Any]) -> bool:
+    return norm["entity_type"].lower() == "view" or norm.get("collection") == "views"
+
+
+def is_board_entity(norm: Dict[str, Any]) -> bool:
+    return norm["entity_type"].lower() == "board" or norm.get("collection") == "boards"
+
+
+def build_metadata_context(collections: Dict[str, List[Dict[str, Any]]]) -> MetadataContext:
+    return derive_metadata_context(normalize_collections(collections))
+
+
+def resolve_entity_dependencies(
+    norm: Dict[str, Any],
+    index: Dict[str, Dict[str, Any]],
+    name_index: Dict[str, Dict[str, List[str]]],
+) -> Tuple[List[str], str, List[str], List[str]]:
+    # Returns (dependencies, method, referenced ids missing from the index, names looked up);
+    # the missing ids and names are remembered so that adding or renaming entities later
+    # re-resolves only the entities that mention them.
+    explicit = norm.get("explicit_dependencies") or []
+    missing = [d for d in explicit if d not in index]
+    if explicit:
+        deps = [d for d in explicit if d in index]
+        if deps:
+            return deps, "explicit", missing, []
+    candidates = extract_uuid_dependencies(norm.get("formula"))
+    deps = [d for d in candidates if d in index]
+    missing.extend(d for d in candidates if d not in index)
+    named, names = resolve_name_references(norm, name_index)
+    if deps:
+        return list(dict.fromkeys(deps + named)), "regex", missing, names
+    if named:
+        return named, "name", missing, names
+    return [], "none", missing, names
+
+
+def view_underlying_id(view: Dict[str, Any]) -> Optional[str]:
+    underlying_id = first_present(view, ["underlyingId", "underlyingBlockId", "blockId", "contentId"])
+    return str(underlying_id) if underlying_id else None
+
+
+def board_block_targets(board: Dict[str, Any], view_underlying: Dict[str, str]) -> Tuple[List[str], List[str]]:
+    targets: List[str] = []
+    view_refs: List[str] = []
+    blocks = board.get("blocks") or board.get("boardBlocks") or []
+    if not isinstance(blocks, list):
+        return targets, view_refs
+    for block in blocks:
+        if not isinstance(block, dict):
             continue
-        formula = norm.get("formula")
-        ids = [d for d in extract_uuid_dependencies(formula) if d in index]
-        if ids:
-            deps_map[entity_id] = ids
-            dependency_method[entity_id] = "regex"
+        block_id = first_present(block, ["blockId", "id", "contentId"])
+        block_type = (first_present(block, ["blockType", "type"]) or "").lower()
+        if not block_id:
+            continue
+        block_id = str(block_id)
+        if block_type == "view":
+            view_refs.append(block_id)
+        if block_type == "view" and block_id in view_underlying:
+            targets.append(view_underlying[block_id])
         else:
-            dependency_method[entity_id] = "none"
+            targets.append(block_id)
+    return targets, view_refs
+
+
+def derive_metadata_context(index: Dict[str, Dict[str, Any]]) -> MetadataContext:
+    dependency_method: Dict[str, str] = {}
+    deps_map: Dict[str, List[str]] = {}
+    unresolved_refs: Dict[str, List[str]] = {}
+    waiting_on: Dict[str, List[str]] = {}
+    name_index = build_name_index(index)
+    name_refs: Dict[str, List[str]] = {}
+    name_referrers: Dict[str, List[str]] = {}
+
+    for entity_id, norm in index.items():
+        deps, method, missing, names = resolve_entity_dependencies(norm, index, name_index)
+        deps_map[entity_id] = deps
+        dependency_method[entity_id] = method
+        if missing:
+            unresolved_refs[entity_id] = missing
+            for ref in missing:
+                waiting_on.setdefault(ref, []).append(entity_id)
+        if names:
+            name_refs[entity_id] = names
+            for name in names:
+                name_referrers.setdefault(name, []).append(entity_id)
 
     reverse_deps: Dict[str, List[str]] = {}
     for src, deps in deps_map.items():
@@ -522,33 +1185,34 @@ def build_metadata_context(collections: Dict[str, List[Dict[str, Any]]]) -> Meta
             reverse_deps.setdefault(dep, []).append(src)
 
     view_underlying: Dict[str, str] = {}
-    for view_id, view in views_raw:
-        underlying_id = first_present(view, ["underlyingId", "underlyingBlockId", "blockId", "contentId"])
-        if underlying_id:
-            view_underlying[view_id] = str(underlying_id)
+    for view_id, norm in index.items():
+        if is_view_entity(norm):
+            underlying_id = view_underlying_id(norm["raw"])
+            if underlying_id:
+                view_underlying[view_id] = underlying_id
 
     views_using: Dict[str, int] = {}
+    views_by_entity: Dict[str, List[str]] = {}
     for view_id, underlying_id in view_underlying.items():
         views_using[underlying_id] = views_using.get(underlying_id, 0) + 1
+        views_by_entity.setdefault(underlying_id, []).append(view_id)
 
     boards_using: Dict[str, int] = {}
-    for board_id, board in boards_raw:
-        blocks = board.get("blocks") or board.get("boardBlocks") or []
-        if not isinstance(blocks, list):
+    boards_by_entity: Dict[str, List[str]] = {}
+    board_targets: Dict[str, List[str]] = {}
+    view_boards: Dict[str, List[str]] = {}
+    for board_id, norm in index.items():
+        if not is_board_entity(norm):
             continue
-        for block in blocks:
-            if not isinstance(block, dict):
-                continue
-            block_id = first_present(block, ["blockId", "id", "contentId"])
-            block_type = (first_present(block, ["blockType", "type"]) or "").lower()
-            if not block_id:
-                continue
-            block_id = str(block_id)
-            if block_type == "view" and block_id in view_underlying:
-                target = view_underlying[block_id]
-            else:
-                target = block_id
+        targets, view_refs = board_block_targets(norm["raw"], view_underlying)
+        board_targets[board_id] = targets
+        for view_id in dict.fromkeys(view_refs):
+            view_boards.setdefault(view_id, []).append(board_id)
+        for target in targets:
             boards_using[target] = boards_using.get(target, 0) + 1
+            board_ids = boards_by_entity.setdefault(target, [])
+            if board_id not in board_ids:
+                board_ids.append(board_id)
 
     return MetadataContext(
         index=index,
@@ -556,9 +1220,47 @@ def build_metadata_context(collections: Dict[str, List[Dict[str, Any]]]) -> Meta
         reverse_deps=reverse_deps,
         views_using=views_using,
         boards_using=boards_using,
+        views_by_entity=views_by_entity,
+        boards_by_entity=boards_by_entity,
+        dependencies=deps_map,
+        unresolved_refs=unresolved_refs,
+        waiting_on=waiting_on,
+        view_underlying=view_underlying,
+        board_targets=board_targets,
+        view_boards=view_boards,
+        name_index=name_index,
+        name_refs=name_refs,
+        name_referrers=name_referrers,
     )
 
 
+def _list_without(mapping: Dict[str, List[str]], key: str, value: str) -> None:
+    # Copy-on-write removal so the source context's lists stay untouched.
+    current = mapping.get(key)
+    if current is None:
+        return
+    remaining = [x for x in current if x != value]
+    if remaining:
+        mapping[key] = remaining
+    else:
+        del mapping[key]
+
+
+def _list_with(mapping: Dict[str, List[str]], key: str, value: str, unique: bool = False) -> None:
+    current = mapping.get(key, [])
+    if unique and value in current:
+        return
+    mapping[key] = current + [value]
+
+
+def _bump(counts: Dict[str, int], key: str, amount: int) -> None:
+    value = counts.get(key, 0) + amount
+    if value > 0:
+        counts[key] = value
+    else:
+        counts.pop(key, None)
+
+
 def compute_transitive_dependents(
     entity_id: str,
     reverse_deps: Dict[str, List[str]],
@@ -581,9 +1283,213 @@ def compute_transitive_dependents(
     return len(visited)
 
 
+def collect_reachable(
+    reverse_deps: Dict[str, List[str]],
+    roots: Iterable[str],
+    max_depth: Optional[int] = None,
+) -> List[str]:
+    seen = set(roots)
+    order = list(seen)
+    frontier = list(seen)
+    depth = 0
+    while frontier and (max_depth is None or depth < max_depth):
+        next_frontier: List[str] = []
+        for node in frontier:
+            for dep in reverse_deps.get(node, []):
+                if dep not in seen:
+                    seen.add(dep)
+                    order.append(dep)
+                    next_frontier.append(dep)
+        frontier = next_frontier
+        depth += 1
+    return order
+
+
+def strongly_connected_components(nodes: List[str], edges: Dict[str, List[str]]) -> List[List[str]]:
+    # Iterative Tarjan; components come out in reverse topological order (dependents before their sources).
+    index_of: Dict[str, int] = {}
+    lowlink: Dict[str, int] = {}
+    on_stack: Set[str] = set()
+    stack: List[str] = []
+    components: List[List[str]] = []
+    counter = 0
+    for start in nodes:
+        if start in index_of:
+            continue
+        work: List[Tuple[str, int]] = [(start, 0)]
+        while work:
+            node, child_pos = work.pop()
+            if child_pos == 0:
+                index_of[node] = lowlink[node] = counter
+                counter += 1
+                stack.append(node)
+                on_stack.add(node)
+            children = edges.get(node, [])
+            recursed = False
+            while child_pos < len(children):
+                child = children[child_pos]
+                child_pos += 1
+                if child not in index_of:
+                    work.append((node, child_pos))
+                    work.append((child, 0))
+                    recursed = True
+                    break
+                if child in on_stack:
+                    lowlink[node] = min(lowlink[node], index_of[child])
+            if recursed:
+                continue
+            if lowlink[node] == index_of[node]:
+                component: List[str] = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+    return components
+
+
+def transitive_dependent_bits(
+    reverse_deps: Dict[str, List[str]],
+    roots: Iterable[str],
+    max_depth: Optional[int] = None,
+) -> Tuple[Dict[str, int], List[str]]:
+    # Dependents are encoded as int bitsets over the reachable subgraph so overlapping
+    # downstream cones are computed once and shared by every root that reaches them.
+    roots = list(dict.fromkeys(roots))
+    nodes = collect_reachable(reverse_deps, roots, max_depth)
+    position = {node: i for i, node in enumerate(nodes)}
+    if max_depth is None:
+        comp_of: Dict[str, int] = {}
+        comp_bits: List[int] = []
+        for comp_id, component in enumerate(strongly_connected_components(nodes, reverse_deps)):
+            bits = 0
+            for member in component:
+                comp_of[member] = comp_id
+            for member in component:
+                for dep in reverse_deps.get(member, []):
+                    bits |= 1 << position[dep]
+                    if comp_of.get(dep, comp_id) != comp_id:
+                        bits |= comp_bits[comp_of[dep]]
+            comp_bits.append(bits)
+        reach = {root: comp_bits[comp_of[root]] for root in roots}
+    else:
+        # reach_k(v) = children(v) | reach_{k-1}(children); nodes farther than max_depth - k never feed a root.
+        prev: Dict[str, int] = {}
+        for _ in range(max_depth):
+            current: Dict[str, int] = {}
+            for node in nodes:
+                bits = 0
+                for dep in reverse_deps.get(node, []):
+                    if dep in position:
+                        bits |= (1 << position[dep]) | prev.get(dep, 0)
+                current[node] = bits
+            prev = current
+        reach = {root: prev.get(root, 0) for root in roots}
+    for root in roots:
+        reach[root] &= ~(1 << position[root])
+    return reach, nodes
+
+
+def decode_bits(bits: int, nodes: List[str]) -> List[str]:
+    out: List[str] = []
+    while bits:
+        low = bits & -bits
+        out.append(nodes[low.bit_length() - 1])
+        bits ^= low
+    return out
+
+
+def compute_impact(
+    entity_ids: List[str],
+    meta: MetadataContext,
+    max_depth: Optional[int] = None,
+) -> pd.DataFrame:
+    reach, nodes = transitive_dependent_bits(meta.reverse_deps, entity_ids, max_depth)
+    rows: List[Dict[str, Any]] = []
+    for entity_id in dict.fromkeys(entity_ids):
+        dependents = decode_bits(reach[entity_id], nodes)
+        boards: Dict[str, None] = {}
+        views: Dict[str, None] = {}
+        for target in [entity_id, *dependents]:
+            boards.update(dict.fromkeys(meta.boards_by_entity.get(target, [])))
+            views.update(dict.fromkeys(meta.views_by_entity.get(target, [])))
+        direct = meta.reverse_deps.get(entity_id, [])
+        rows.append({
+            "entity_id": entity_id,
+            "entity_name": meta.index.get(entity_id, {}).get("name"),
+            "known_in_metadata": entity_id in meta.index,
+            "direct_dependents_count": len(direct),
+            "transitive_dependents_count": len(dependents),
+            "affected_boards_count": len(boards),
+            "affected_views_count": len(views),
+            "direct_dependents": ";".join(direct),
+            "transitive_dependents": ";".join(dependents),
+            "affected_boards": ";".join(boards),
+            "affected_views": ";".join(views),
+        })
+    return pd.DataFrame(rows)
+
+
+def compute_transitive_usage(meta: MetadataContext) -> Tuple[Dict[str, int], Dict[str, int]]:
+    # Distinct boards/views showing each entity or any of its transitive dependents, for the whole
+    # graph in one pass: components are visited dependents-first and each carries the union of its
+    # own and its downstream components' board/view bitsets. Only non-zero counts are stored.
+    board_pos: Dict[str, int] = {}
+    view_pos: Dict[str, int] = {}
+    own_boards: Dict[str, int] = {}
+    own_views: Dict[str, int] = {}
+    for entity_id, board_ids in meta.boards_by_entity.items():
+        for board_id in board_ids:
+            own_boards[entity_id] = own_boards.get(entity_id, 0) | (1 << board_pos.setdefault(board_id, len(board_pos)))
+    for entity_id, view_ids in meta.views_by_entity.items():
+        for view_id in view_ids:
+            own_views[entity_id] = own_views.get(entity_id, 0) | (1 << view_pos.setdefault(view_id, len(view_pos)))
+
+    nodes = list(dict.fromkeys([*meta.reverse_deps, *own_boards, *own_views]))
+    comp_of: Dict[str, int] = {}
+    comp_boards: List[int] = []
+    comp_views: List[int] = []
+    boards_out: Dict[str, int] = {}
+    views_out: Dict[str, int] = {}
+    for comp_id, component in enumerate(strongly_connected_components(nodes, meta.reverse_deps)):
+        for member in component:
+            comp_of[member] = comp_id
+        boards = 0
+        views = 0
+        for member in component:
+            boards |= own_boards.get(member, 0)
+            views |= own_views.get(member, 0)
+            for dep in meta.reverse_deps.get(member, []):
+                if comp_of[dep] != comp_id:
+                    boards |= comp_boards[comp_of[dep]]
+                    views |= comp_views[comp_of[dep]]
+        comp_boards.append(boards)
+        comp_views.append(views)
+        board_count = bin(boards).count("1")
+        view_count = bin(views).count("1")
+        for member in component:
+            if board_count:
+                boards_out[member] = board_count
+            if view_count:
+                views_out[member] = view_count
+    return boards_out, views_out
+
+
+def transitive_usage(meta: MetadataContext) -> Tuple[Dict[str, int], Dict[str, int]]:
+    if meta.boards_impacted_transitive is None or meta.views_impacted_transitive is None:
+        meta.boards_impacted_transitive, meta.views_impacted_transitive = compute_transitive_usage(meta)
+    return meta.boards_impacted_transitive, meta.views_impacted_transitive
+
+
 def build_diff_context(
     before: Optional[MetadataContext],
     after: Optional[MetadataContext],
+    entity_ids: Optional[Iterable[str]] = None,
 ) -> DiffContext:
     if not before or not after:
         return DiffContext(diff_changed_fields={}, diff_summary={})
@@ -600,7 +1506,7 @@ def build_diff_context(
         "formula",
         "explicit_dependencies",
     ]
-    all_ids = set(before.index.keys()) | set(after.index.keys())
+    all_ids = set(entity_ids) if entity_ids is not None else set(before.index.keys()) | set(after.index.keys())
     for entity_id in all_ids:
         before_item = before.index.get(entity_id, {})
         after_item = after.index.get(entity_id, {})
@@ -620,61 +1526,327 @@ def build_diff_context(
     return DiffContext(diff_changed_fields=changed_fields, diff_summary=diff_summary)
 
 
+def entity_fingerprint(norm: Dict[str, Any]) -> bytes:
+    payload = json.dumps([norm.get("collection"), norm.get("raw")], sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).digest()
+
+
+def compute_metadata_delta(
+    before_fingerprints: Dict[str, bytes],
+    after_index: Dict[str, Dict[str, Any]],
+) -> Tuple[MetadataDelta, Dict[str, bytes]]:
+    after_fingerprints = metadata_fingerprints(after_index)
+    upserts = {
+        entity_id: after_index[entity_id]
+        for entity_id, fp in after_fingerprints.items()
+        if before_fingerprints.get(entity_id) != fp
+    }
+    removed = [entity_id for entity_id in before_fingerprints if entity_id not in after_index]
+    return MetadataDelta(upserts=upserts, removed=removed), after_fingerprints
+
+
+def metadata_fingerprints(index: Dict[str, Dict[str, Any]]) -> Dict[str, bytes]:
+    return {entity_id: entity_fingerprint(norm) for entity_id, norm in index.items()}
+
+
+def apply_metadata_delta(ctx: MetadataContext, delta: MetadataDelta) -> MetadataContext:
+    # Derive the next context from ``ctx`` by touching only what the delta can affect:
+    # changed entities, dependents of removed ids and entities that referenced newly added ids.
+    # ``ctx`` is left intact; dicts are shallow-copied and lists replaced copy-on-write.
+    old_index = ctx.index
+    index = dict(old_index)
+    for entity_id in delta.removed:
+        index.pop(entity_id, None)
+    index.update(delta.upserts)
+
+    dependencies = dict(ctx.dependencies)
+    dependency_method = dict(ctx.dependency_method)
+    reverse_deps = dict(ctx.reverse_deps)
+    unresolved_refs = dict(ctx.unresolved_refs)
+    waiting_on = dict(ctx.waiting_on)
+    name_index = dict(ctx.name_index)
+    name_refs = dict(ctx.name_refs)
+    name_referrers = dict(ctx.name_referrers)
+
+    stale: Dict[str, None] = dict.fromkeys(delta.upserts)
+    stale.update(dict.fromkeys(delta.removed))
+    for entity_id in delta.removed:
+        stale.update(dict.fromkeys(ctx.reverse_deps.get(entity_id, [])))
+    for entity_id in delta.upserts:
+        if entity_id not in old_index:
+            stale.update(dict.fromkeys(ctx.waiting_on.get(entity_id, [])))
+    for entity_id in dict.fromkeys([*delta.upserts, *delta.removed]):
+        old = old_index.get(entity_id)
+        new = index.get(entity_id)
+        old_entries = entity_name_entries(old) if old else []
+        new_entries = entity_name_entries(new) if new else []
+        if old_entries == new_entries:
+            continue
+        for name, scope in old_entries:
+            scopes = dict(name_index.get(name, {}))
+            _list_without(scopes, scope, entity_id)
+            if scopes:
+                name_index[name] = scopes
+            else:
+                name_index.pop(name, None)
+        for name, scope in new_entries:
+            scopes = dict(name_index.get(name, {}))
+            _list_with(scopes, scope, entity_id, unique=True)
+            name_index[name] = scopes
+        for name, _ in (*old_entries, *new_entries):
+            stale.update(dict.fromkeys(ctx.name_referrers.get(name, [])))
+
+    changed_targets: Set[str] = set()
+    for entity_id in stale:
+        for dep in dependencies.pop(entity_id, []):
+            _list_without(reverse_deps, dep, entity_id)
+            changed_targets.add(dep)
+        for ref in unresolved_refs.pop(entity_id, []):
+            _list_without(waiting_on, ref, entity_id)
+        for name in name_refs.pop(entity_id, []):
+            _list_without(name_referrers, name, entity_id)
+        dependency_method.pop(entity_id, None)
+    for entity_id in stale:
+        norm = index.get(entity_id)
+        if norm is None:
+            continue
+        deps, method, missing, names = resolve_entity_dependencies(norm, index, name_index)
+        dependencies[entity_id] = deps
+        dependency_method[entity_id] = method
+        for dep in deps:
+            _list_with(reverse_deps, dep, entity_id)
+            changed_targets.add(dep)
+        if missing:
+            unresolved_refs[entity_id] = missing
+            for ref in missing:
+                _list_with(waiting_on, ref, entity_id)
+        if names:
+            name_refs[entity_id] = names
+            for name in names:
+                _list_with(name_referrers, name, entity_id)
+
+    # Cached transitive counts are only stale upstream of a changed reverse edge.
+    invalid: Set[str] = set(delta.removed)
+    frontier = list(changed_targets)
+    while frontier:
+        node = frontier.pop()
+        if node in invalid:
+            continue
+        invalid.add(node)
+        frontier.extend(dependencies.get(node, []))
+        frontier.extend(ctx.dependencies.get(node, []))
+    transitive_cache = dict(ctx.transitive_cache)
+    for node in invalid:
+        transitive_cache.pop(node, None)
+
+    view_underlying = dict(ctx.view_underlying)
+    views_using = dict(ctx.views_using)
+    views_by_entity = dict(ctx.views_by_entity)
+    boards_using = dict(ctx.boards_using)
+    boards_by_entity = dict(ctx.boards_by_entity)
+    board_targets = dict(ctx.board_targets)
+    view_boards = dict(ctx.view_boards)
+
+    touched = list(dict.fromkeys([*delta.upserts, *delta.removed]))
+    affected_boards: Dict[str, None] = {}
+    for entity_id in touched:
+        old = old_index.get(entity_id)
+        new = index.get(entity_id)
+        if (old and is_view_entity(old)) or (new and is_view_entity(new)):
+            old_target = ctx.view_underlying.get(entity_id)
+            new_target = view_underlying_id(new["raw"]) if new and is_view_entity(new) else None
+            if old_target != new_target:
+                if old_target:
+                    _list_without(views_by_entity, old_target, entity_id)
+                    _bump(views_using, old_target, -1)
+                    del view_underlying[entity_id]
+                if new_target:
+                    _list_with(views_by_entity, new_target, entity_id)
+                    _bump(views_using, new_target, 1)
+                    view_underlying[entity_id] = new_target
+                affected_boards.update(dict.fromkeys(ctx.view_boards.get(entity_id, [])))
+        if (old and is_board_entity(old)) or (new and is_board_entity(new)):
+            affected_boards[entity_id] = None
+
+    for board_id in affected_boards:
+        old_targets = board_targets.pop(board_id, [])
+        for target in old_targets:
+            _bump(boards_using, target, -1)
+        for target in dict.fromkeys(old_targets):
+            _list_without(boards_by_entity, target, board_id)
+        old = old_index.get(board_id)
+        if old and is_board_entity(old):
+            for view_id in dict.fromkeys(board_block_targets(old["raw"], {})[1]):
+                _list_without(view_boards, view_id, board_id)
+        new = index.get(board_id)
+        if not (new and is_board_entity(new)):
+            continue
+        targets, view_refs = board_block_targets(new["raw"], view_underlying)
+        board_targets[board_id] = targets
+        for view_id in dict.fromkeys(view_refs):
+            _list_with(view_boards, view_id, board_id, unique=True)
+        for target in targets:
+            _bump(boards_using, target, 1)
+            _list_with(boards_by_entity, target, board_id, unique=True)
+
+    return MetadataContext(
+        index=index,
+        dependency_method=dependency_method,
+        reverse_deps=reverse_deps,
+        views_using=views_using,
+        boards_using=boards_using,
+        views_by_entity=views_by_entity,
+        boards_by_entity=boards_by_entity,
+        dependencies=dependencies,
+        unresolved_refs=unresolved_refs,
+        waiting_on=waiting_on,
+        view_underlying=view_underlying,
+        board_targets=board_targets,
+        view_boards=view_boards,
+        transitive_cache=transitive_cache,
+        name_index=name_index,
+        name_refs=name_refs,
+        name_referrers=name_referrers,
+    )
+
+
+def parse_snapshot_date(name: str) -> Optional[pd.Timestamp]:
+    match = re.match(r"(\d{4}-\d{2}-\d{2})(?:[T_ ](\d{2})[:-]?(\d{2}))?", name)
+    if not match:
+        return None
+    stamp = match.group(1)
+    if match.group(2):
+        stamp += f" {match.group(2)}:{match.group(3)}"
+    return pd.Timestamp(stamp, tz="UTC")
+
+
+def discover_metadata_series(args: argparse.Namespace) -> List[Tuple[pd.Timestamp, str, str]]:
+    entries: List[Tuple[pd.Timestamp, str, str]] = []
+    if args.metadata_series:
+        for name in sorted(os.listdir(args.metadata_series)):
+            ts = parse_snapshot_date(name)
+            path = os.path.join(args.metadata_series, name)
+            if ts is None or not (os.path.isdir(path) or name.endswith(".json")):
+                continue
+            entries.append((ts, os.path.splitext(name)[0] if not os.path.isdir(path) else name, path))
+    for spec in args.metadata_at:
+        date, _, path = spec.partition("=")
+        ts = parse_snapshot_date(date.strip())
+        if ts is None or not path:
+            raise ValueError(f"--metadata-at expects DATE=PATH, got {spec!r}")
+        entries.append((ts, date.strip(), path))
+    return sorted(entries, key=lambda e: e[0])
+
+
+def load_metadata_series(entries: List[Tuple[pd.Timestamp, str, str]], workers: Optional[int] = None) -> MetadataSeries:
+    # Only the first snapshot is materialized; later ones are reduced to per-entity deltas
+    # against the previous fingerprints, so unchanged entities are never stored twice.
+    first_ts, first_label, first_path = entries[0]
+    base_index = load_metadata_index([first_path], workers)
+    fingerprints = metadata_fingerprints(base_index)
+    base = derive_metadata_context(base_index)
+    deltas: List[MetadataDelta] = []
+    for ts, label, path in entries[1:]:
+        delta, fingerprints = compute_metadata_delta(fingerprints, load_metadata_index([path], workers))
+        logging.info(
+            "Snapshot %s: %s changed/added, %s removed entities",
+            label,
+            len(delta.upserts),
+            len(delta.removed),
+        )
+        deltas.append(delta)
+    return MetadataSeries(
+        labels=[label for _, label, _ in entries],
+        effective_from=[ts for ts, _, _ in entries],
+        base=base,
+        deltas=deltas,
+    )
+
+
+def enrich_with_metadata_series(
+    df: pd.DataFrame,
+    series: MetadataSeries,
+    diff: Optional[DiffContext],
+) -> pd.DataFrame:
+    df = df.sort_values(by=["event_timestamp_utc", "event_id"], kind="mergesort").reset_index(drop=True)
+    ts = df["event_timestamp_utc"]
+    snapshots = pd.DataFrame({
+        "effective_from": pd.Series(series.effective_from).astype(ts.dtype),
+        "snapshot_pos": range(len(series.labels)),
+    })
+    dated = ts.notna()
+    matched = pd.merge_asof(
+        pd.DataFrame({"event_timestamp_utc": ts[dated]}),
+        snapshots,
+        left_on="event_timestamp_utc",
+        right_on="effective_from",
+        direction="backward",
+    )
+    # Events before the first snapshot use the earliest one; undated events use the latest.
+    snapshot_pos = pd.Series(len(series.labels) - 1, index=df.index)
+    snapshot_pos[dated] = matched["snapshot_pos"].fillna(0).astype(int).to_numpy()
+
+    parts: List[pd.DataFrame] = []
+    ctx = series.base
+    for pos in range(len(series.labels)):
+        if pos > 0:
+            ctx = apply_metadata_delta(ctx, series.deltas[pos - 1])
+        part = df[snapshot_pos == pos]
+        if part.empty:
+            continue
+        part = enrich_with_metadata(part, ctx, diff)
+        part["metadata_snapshot"] = series.labels[pos]
+        parts.append(part)
+    if not parts:
+        return enrich_with_metadata(df, None, diff).assign(metadata_snapshot=None)
+    return pd.concat(parts)
+
+
 def apply_filters(df: pd.DataFrame, args: argparse.Namespace) -> pd.DataFrame:
-    df = df.copy()
+    # One combined mask, so the frame is taken once rather than once per filter.
+    keep = pd.Series(True, index=df.index)
     if args.date_from:
         start = pd.to_datetime(args.date_from, utc=True)
-        df = df[df["event_timestamp_utc"] >= start]
+        keep &= df["event_timestamp_utc"] >= start
     if args.date_to:
         end = pd.to_datetime(args.date_to, utc=True) + pd.Timedelta(days=1) - pd.Timedelta(seconds=1)
-        df = df[df["event_timestamp_utc"] <= end]
+        keep &= df["event_timestamp_utc"] <= end
 
     if args.app_id:
-        df = df[df["application_id"].isin(args.app_id)]
+        keep &= df["application_id"].isin(args.app_id)
     if args.app_name:
         mask = False
         for name in args.app_name:
             mask |= df["application_name"].str.contains(name, case=False, na=False)
-        df = df[mask]
+        keep &= mask
     if args.user_email:
         mask = False
         for email in args.user_email:
             mask |= df["user_email"].str.contains(email, case=False, na=False)
-        df = df[mask]
+        keep &= mask
     if args.event_type:
-        df = df[df["event_type"].isin(args.event_type)]
+        keep &= df["event_type"].isin(args.event_type)
 
-    if args.all_events:
-        return df
-
-    allowed = {"change", "auth", "export"}
-    if args.include_access:
-        allowed.add("access")
-    df = df[df["category"].isin(allowed)]
-    return df
+    if not args.all_events:
+        allowed = {"change", "auth", "export"}
+        if args.include_access:
+            allowed.add("access")
+        keep &= df["category"].isin(allowed)
+    return df if keep.all() else df[keep]
 
 
-def enrich_with_metadata(
-    df: pd.DataFrame,
+def entity_metadata_columns(
+    entity_ids: pd.Series,
     meta: Optional[MetadataContext],
     diff: Optional[DiffContext],
 ) -> pd.DataFrame:
-    df = df.copy()
+    columns: Dict[str, pd.Series] = {}
     if not meta:
-        df["meta_name"] = None
-        df["meta_entity_type"] = None
-        df["meta_application_id"] = None
-        df["meta_application_name"] = None
-        df["meta_data_type"] = None
-        df["meta_is_security_block"] = None
-        df["meta_dimensions"] = None
-        df["dependency_extraction_method"] = None
-        df["direct_dependents_count"] = None
-        df["transitive_dependents_count"] = None
-        df["boards_using_count"] = None
-        df["views_using_count"] = None
+        for col in METADATA_COLUMNS[:-2]:
+            columns[col] = pd.Series(None, index=entity_ids.index, dtype=object)
     else:
-        cache_transitive: Dict[str, int] = {}
+        cache_transitive = meta.transitive_cache
+        boards_transitive, views_transitive = transitive_usage(meta)
 
         def lookup(entity_id: Any) -> Dict[str, Any]:
             if entity_id is None or (isinstance(entity_id, float) and pd.isna(entity_id)):
@@ -696,34 +1868,52 @@ def enrich_with_metadata(
             cache_transitive[key] = count
             return count
 
-        df["meta_name"] = df["entity_id"].map(lambda x: lookup(x).get("name"))
-        df["meta_entity_type"] = df["entity_id"].map(lambda x: lookup(x).get("entity_type"))
-        df["meta_application_id"] = df["entity_id"].map(lambda x: lookup(x).get("application_id"))
-        df["meta_application_name"] = df["entity_id"].map(lambda x: lookup(x).get("application_name"))
-        df["meta_data_type"] = df["entity_id"].map(lambda x: lookup(x).get("data_type"))
-        df["meta_is_security_block"] = df["entity_id"].map(lambda x: lookup(x).get("is_security_block"))
-        df["meta_dimensions"] = df["entity_id"].map(lambda x: lookup(x).get("dimensions"))
-        df["dependency_extraction_method"] = df["entity_id"].map(lambda x: meta.dependency_method.get(str(x)))
-        df["direct_dependents_count"] = df["entity_id"].map(direct_count)
-        df["transitive_dependents_count"] = df["entity_id"].map(transitive_count)
-        df["boards_using_count"] = df["entity_id"].map(lambda x: meta.boards_using.get(str(x)))
-        df["views_using_count"] = df["entity_id"].map(lambda x: meta.views_using.get(str(x)))
+        columns["meta_name"] = entity_ids.map(lambda x: lookup(x).get("name"))
+        columns["meta_entity_type"] = entity_ids.map(lambda x: lookup(x).get("entity_type"))
+        columns["meta_application_id"] = entity_ids.map(lambda x: lookup(x).get("application_id"))
+        columns["meta_application_name"] = entity_ids.map(lambda x: lookup(x).get("application_name"))
+        columns["meta_data_type"] = entity_ids.map(lambda x: lookup(x).get("data_type"))
+        columns["meta_is_security_block"] = entity_ids.map(lambda x: lookup(x).get("is_security_block"))
+        columns["meta_dimensions"] = entity_ids.map(lambda x: lookup(x).get("dimensions"))
+        columns["dependency_extraction_method"] = entity_ids.map(lambda x: meta.dependency_method.get(str(x)))
+        columns["direct_dependents_count"] = entity_ids.map(direct_count)
+        columns["transitive_dependents_count"] = entity_ids.map(transitive_count)
+        columns["boards_using_count"] = entity_ids.map(lambda x: meta.boards_using.get(str(x)))
+        columns["views_using_count"] = entity_ids.map(lambda x: meta.views_using.get(str(x)))
+        columns["boards_impacted_transitive"] = entity_ids.map(lambda x: boards_transitive.get(str(x)))
+        columns["views_impacted_transitive"] = entity_ids.map(lambda x: views_transitive.get(str(x)))
 
     if diff:
-        df["diff_changed_fields"] = df["entity_id"].map(lambda x: diff.diff_changed_fields.get(str(x)))
-        df["diff_summary"] = df["entity_id"].map(lambda x: diff.diff_summary.get(str(x)))
+        columns["diff_changed_fields"] = entity_ids.map(lambda x: diff.diff_changed_fields.get(str(x)))
+        columns["diff_summary"] = entity_ids.map(lambda x: diff.diff_summary.get(str(x)))
     else:
-        df["diff_changed_fields"] = None
-        df["diff_summary"] = None
+        columns["diff_changed_fields"] = pd.Series(None, index=entity_ids.index, dtype=object)
+        columns["diff_summary"] = pd.Series(None, index=entity_ids.index, dtype=object)
+    return pd.DataFrame(columns, index=entity_ids.index)
+
+
+def enrich_with_metadata(
+    df: pd.DataFrame,
+    meta: Optional[MetadataContext],
+    diff: Optional[DiffContext],
+) -> pd.DataFrame:
+    # Shallow: new columns go on this frame only, the caller's column data is shared, not copied.
+    df = df.copy(deep=False)
+    meta_columns = entity_metadata_columns(df["entity_id"], meta, diff)
+    for col in METADATA_COLUMNS:
+        df[col] = meta_columns[col]
 
     def row_risk(row: pd.Series) -> Tuple[int, str]:
         meta_info = {
+            "rate_anomaly": row.get("rate_anomaly"),
             "is_security_block": row.get("meta_is_security_block"),
             "data_type": row.get("meta_data_type"),
             "direct_dependents_count": row.get("direct_dependents_count"),
             "transitive_dependents_count": row.get("transitive_dependents_count"),
             "boards_using_count": row.get("boards_using_count"),
             "views_using_count": row.get("views_using_count"),
+            "boards_impacted_transitive": row.get("boards_impacted_transitive"),
+            "views_impacted_transitive": row.get("views_impacted_transitive"),
         }
         return compute_risk(row.get("event_type"), row.get("severity"), meta_info)
 
@@ -735,19 +1925,24 @@ def enrich_with_metadata(
 
 
 def build_changes_timeline(df: pd.DataFrame) -> pd.DataFrame:
-    changes = df[df["is_change_event"] == True].copy()  # noqa: E712
+    changes = df[df["is_change_event"] == True]  # noqa: E712
     changes = changes.sort_values(by=["event_timestamp_utc", "event_id"], kind="mergesort")
     return changes
 
 
+def add_entity_summary_keys(changes: pd.DataFrame) -> pd.DataFrame:
+    changes["application_id_norm"] = changes["application_id"].fillna("unknown")
+    changes["entity_type_norm"] = changes["entity_type"].fillna(changes["meta_entity_type"]).fillna("unknown")
+    changes["entity_id_norm"] = changes["entity_id"].fillna("unknown")
+    return changes
+
+
 def build_entity_summary(df: pd.DataFrame) -> pd.DataFrame:
-    changes = df[df["is_change_event"] == True].copy()  # noqa: E712
+    changes = df[df["is_change_event"] == True]  # noqa: E712
     if changes.empty:
         return pd.DataFrame()
 
-    changes["application_id_norm"] = changes["application_id"].fillna("unknown")
-    changes["entity_type_norm"] = changes["entity_type"].fillna(changes["meta_entity_type"]).fillna("unknown")
-    changes["entity_id_norm"] = changes["entity_id"].fillna("unknown")
+    changes = add_entity_summary_keys(changes)
 
     def agg_event_types(series: pd.Series) -> str:
         counts = series.value_counts()
@@ -758,10 +1953,9 @@ def build_entity_summary(df: pd.DataFrame) -> pd.DataFrame:
         return ";".join([f"{k}={v}" for k, v in counts.head(5).items()])
 
     def severity_rank(val: Any) -> int:
-        order = {"LOW": 0, "MEDIUM": 1, "HIGH": 2, "CRITICAL": 3}
-        return order.get(str(val), 0)
+        return SEVERITY_RANK.get(str(val), 0)
 
-    grouped = changes.groupby(["application_id_norm", "entity_type_norm", "entity_id_norm"], dropna=False)
+    grouped = changes.groupby(ENTITY_SUMMARY_KEYS, dropna=False)
     summary = grouped.agg(
         application_name=("application_name", "first"),
         entity_name=("entity_name", "first"),
@@ -776,11 +1970,308 @@ def build_entity_summary(df: pd.DataFrame) -> pd.DataFrame:
         transitive_dependents_count=("transitive_dependents_count", "max"),
         boards_using_count=("boards_using_count", "max"),
         views_using_count=("views_using_count", "max"),
+        boards_impacted_transitive=("boards_impacted_transitive", "max"),
+        views_impacted_transitive=("views_impacted_transitive", "max"),
     ).reset_index()
 
     return summary
 
 
+def _group_value_counts(changes: pd.DataFrame, column: str) -> pd.DataFrame:
+    # First-seen order within an entity, which _join_counts keeps for tied counts like value_counts().
+    counts = changes.groupby(ENTITY_SUMMARY_KEYS + [column], dropna=True, sort=False).size()
+    return counts.rename("count").reset_index()
+
+
+def entity_summary_partial(df: pd.DataFrame) -> Optional[EntitySummaryPartial]:
+    changes = df[df["is_change_event"] == True]  # noqa: E712
+    if changes.empty:
+        return None
+    changes = add_entity_summary_keys(changes)
+    changes["severity_rank"] = changes["severity"].map(lambda v: SEVERITY_RANK.get(str(v), 0))
+    base = changes.groupby(ENTITY_SUMMARY_KEYS, dropna=False, sort=False).agg(
+        application_name=("application_name", "first"),
+        entity_name=("entity_name", "first"),
+        meta_name=("meta_name", "first"),
+        first_seen=("event_timestamp_utc", "min"),
+        last_seen=("event_timestamp_utc", "max"),
+        severity_rank=("severity_rank", "max"),
+        max_risk_score=("risk_score", "max"),
+        direct_dependents_count=("direct_dependents_count", "max"),
+        transitive_dependents_count=("transitive_dependents_count", "max"),
+        boards_using_count=("boards_using_count", "max"),
+        views_using_count=("views_using_count", "max"),
+        boards_impacted_transitive=("boards_impacted_transitive", "max"),
+        views_impacted_transitive=("views_impacted_transitive", "max"),
+    ).reset_index()
+    return EntitySummaryPartial(
+        base=base,
+        event_type_counts=_group_value_counts(changes, "event_type"),
+        user_counts=_group_value_counts(changes, "user_email"),
+    )
+
+
+def merge_entity_summary_partials(
+    a: Optional[EntitySummaryPartial],
+    b: Optional[EntitySummaryPartial],
+) -> Optional[EntitySummaryPartial]:
+    if a is None or b is None:
+        return a if b is None else b
+    base = pd.concat([a.base, b.base], ignore_index=True).groupby(ENTITY_SUMMARY_KEYS, dropna=False, sort=False).agg(
+        application_name=("application_name", "first"),
+        entity_name=("entity_name", "first"),
+        meta_name=("meta_name", "first"),
+        first_seen=("first_seen", "min"),
+        last_seen=("last_seen", "max"),
+        severity_rank=("severity_rank", "max"),
+        max_risk_score=("max_risk_score", "max"),
+        direct_dependents_count=("direct_dependents_count", "max"),
+        transitive_dependents_count=("transitive_dependents_count", "max"),
+        boards_using_count=("boards_using_count", "max"),
+        views_using_count=("views_using_count", "max"),
+        boards_impacted_transitive=("boards_impacted_transitive", "max"),
+        views_impacted_transitive=("views_impacted_transitive", "max"),
+    ).reset_index()
+
+    def merge_counts(x: pd.DataFrame, y: pd.DataFrame, column: str) -> pd.DataFrame:
+        merged = pd.concat([x, y], ignore_index=True)
+        return merged.groupby(ENTITY_SUMMARY_KEYS + [column], sort=False)["count"].sum().reset_index()
+
+    return EntitySummaryPartial(
+        base=base,
+        event_type_counts=merge_counts(a.event_type_counts, b.event_type_counts, "event_type"),
+        user_counts=merge_counts(a.user_counts, b.user_counts, "user_email"),
+    )
+
+
+def _join_counts(counts: pd.DataFrame, column: str, limit: Optional[int], name: str) -> pd.DataFrame:
+    ordered = counts.sort_values(by="count", ascending=False, kind="mergesort")
+    if limit is not None:
+        ordered = ordered[ordered.groupby(ENTITY_SUMMARY_KEYS, dropna=False).cumcount() < limit]
+    labels = ordered[column].astype(str) + "=" + ordered["count"].astype(str)
+    joined = labels.groupby([ordered[k] for k in ENTITY_SUMMARY_KEYS], dropna=False).agg(";".join)
+    return joined.rename(name).reset_index()
+
+
+def finalize_entity_summary(partial: Optional[EntitySummaryPartial]) -> pd.DataFrame:
+    if partial is None:
+        return pd.DataFrame()
+    summary = partial.base.merge(
+        _join_counts(partial.event_type_counts, "event_type", None, "event_types"), on=ENTITY_SUMMARY_KEYS, how="left"
+    ).merge(
+        _join_counts(partial.user_counts, "user_email", 5, "top_users"), on=ENTITY_SUMMARY_KEYS, how="left"
+    )
+    summary["event_types"] = summary["event_types"].fillna("")
+    summary["top_users"] = summary["top_users"].fillna("")
+    summary["highest_severity"] = summary["severity_rank"].map(SEVERITY_BY_RANK)
+    summary = summary.sort_values(by=ENTITY_SUMMARY_KEYS, kind="mergesort").reset_index(drop=True)
+    return summary[[
+        *ENTITY_SUMMARY_KEYS,
+        "application_name",
+        "entity_name",
+        "meta_name",
+        "first_seen",
+        "last_seen",
+        "event_types",
+        "top_users",
+        "highest_severity",
+        "max_risk_score",
+        "direct_dependents_count",
+        "transitive_dependents_count",
+        "boards_using_count",
+        "views_using_count",
+        "boards_impacted_transitive",
+        "views_impacted_transitive",
+    ]]
+
+
+def coalesce_categorical(columns: List[pd.Series], default: str) -> pd.Categorical:
+    # First non-null value across `columns`, factorized once: each later column is only looked at on
+    # the rows the earlier ones left missing, so no full-length string column is built.
+    codes = np.full(len(columns[0]), -1, dtype=np.intp)
+    labels: List[Any] = []
+    missing: Optional[np.ndarray] = None
+    for column in columns:
+        part, found = pd.factorize(column if missing is None else column.iloc[missing])
+        hit = part >= 0
+        positions = np.flatnonzero(hit) if missing is None else missing[hit]
+        codes[positions] = part[hit] + len(labels)
+        labels.extend(str(value) for value in found)
+        missing = np.flatnonzero(~hit) if missing is None else missing[~hit]
+        if not len(missing):
+            break
+    if missing is not None and len(missing):
+        codes[missing] = len(labels)
+        labels.append(default)
+    # The same text from two columns gets two labels above; fold them into one category.
+    merged, categories = pd.factorize(np.array(labels, dtype=object))
+    return pd.Categorical.from_codes(merged[codes], categories=categories)
+
+
+def category_codes(values: pd.Series) -> Tuple[np.ndarray, Any]:
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(), values.cat.categories
+    return pd.factorize(values)
+
+
+def change_session_inputs(changes: pd.DataFrame) -> pd.DataFrame:
+    actor_columns = ["user_email", "user_id", "user_name", "actor_label"]
+    entity_columns = ["entity_name", "meta_name", "entity_id"]
+    return pd.DataFrame({
+        "event_id": changes["event_id"].to_numpy(),
+        "actor": coalesce_categorical([changes[c] for c in actor_columns if c in changes.columns], "unknown"),
+        "actor_label": changes["actor_label"].to_numpy(),
+        "ts": changes["event_timestamp_utc"].array,
+        "entity": coalesce_categorical([changes[c] for c in entity_columns], "unknown"),
+        "application": pd.Categorical(changes["application_id"]),
+        "risk_score": changes["risk_score"].to_numpy(),
+    })
+
+
+class ChangeSessionBuilder:
+    # Change sessions over batches of change_session_inputs in time order (undated changes last). Each
+    # actor's last session stays open, with its entity and application sets, until a later batch starts a
+    # gap after it; every other session is final within its batch and is aggregated on factorized codes.
+    def __init__(self, gap_minutes: float) -> None:
+        self.gap = pd.Timedelta(minutes=gap_minutes)
+        self.rows = 0
+        self.ts_dtype: Any = None
+        self.open: Dict[str, Dict[str, Any]] = {}
+        self.closed: List[pd.DataFrame] = []
+        self.closed_open: List[Dict[str, Any]] = []
+
+    def add(self, inputs: pd.DataFrame) -> None:
+        if inputs.empty:
+            return
+        ts = inputs["ts"].array
+        self.ts_dtype = ts.dtype
+        actor_codes, actors = category_codes(inputs["actor"])
+        entity_codes, entities = category_codes(inputs["entity"])
+        app_codes, applications = category_codes(inputs["application"])
+        undated = np.asarray(ts.isna())
+        stamps = np.where(undated, np.iinfo(np.int64).max, ts.asi8)
+        # (actor, time) order with undated changes last; lexsort is stable, so ties keep the input order.
+        order = np.lexsort((stamps, actor_codes))
+        actor_sorted, stamps, entity_sorted, app_sorted = (
+            actor_codes[order], stamps[order], entity_codes[order], app_codes[order]
+        )
+        # A new session starts at every actor boundary, at every gap >= N minutes, and for events
+        # without a timestamp.
+        first_of_actor = np.r_[True, actor_sorted[1:] != actor_sorted[:-1]]
+        gap = self.gap // pd.Timedelta(1, unit=ts.unit)
+        new_session = first_of_actor | undated[order] | (np.diff(stamps, prepend=stamps[0]) >= gap)
+        session = np.cumsum(new_session) - 1
+        starts = np.flatnonzero(new_session)
+        ends = np.r_[starts[1:], len(order)] - 1
+
+        # Distinct (session, entity) and (session, application) pairs on integer codes; the rows stay
+        # sorted by session, so each session's entities are contiguous.
+        distinct = ~pd.Series(session * len(entities) + entity_sorted).duplicated().to_numpy()
+        entity_session, entity_runs = session[distinct], entity_sorted[distinct]
+        entity_starts = np.searchsorted(entity_session, np.arange(len(starts) + 1))
+        named = app_sorted >= 0
+        app_pairs = pd.Series(session[named] * max(len(applications), 1) + app_sorted[named])
+        app_keep = ~app_pairs.duplicated().to_numpy()
+        app_session, app_runs = session[named][app_keep], app_sorted[named][app_keep]
+        rank = np.arange(len(entity_session)) - np.repeat(entity_starts[:-1], np.diff(entity_starts))
+        listed = rank < CHANGE_SESSION_MAX_ENTITIES
+        names = np.asarray(entities, dtype=object)
+        # One reduceat pass concatenates each session's listed entities without a per-group Python call.
+        joined = np.add.reduceat(
+            (pd.Series(names[entity_runs[listed]]) + ";").to_numpy(dtype=object),
+            np.searchsorted(entity_session[listed], np.arange(len(starts))),
+        )
+        sessions = pd.DataFrame({
+            "actor": np.asarray(actors, dtype=object)[actor_sorted[starts]],
+            "actor_label": inputs["actor_label"].iloc[order[starts]].to_numpy(dtype=object),
+            "session_start": ts.take(order[starts]),
+            "session_end": ts.take(order[ends]),
+            "change_count": np.diff(np.r_[starts, len(order)]),
+            "distinct_entities": np.diff(entity_starts),
+            "distinct_applications": np.bincount(app_session, minlength=len(starts)),
+            "max_risk_score": np.fmax.reduceat(inputs["risk_score"].to_numpy()[order], starts),
+            "first_row": np.minimum.reduceat(order, starts) + self.rows,
+            "affected_entities": pd.Series(joined).str[:-1].to_numpy(dtype=object),
+        })
+        self.rows += len(order)
+
+        # Only an actor's first session can continue its open one, and only its last can stay open.
+        firsts = session[first_of_actor]
+        lasts = session[np.r_[actor_sorted[1:] != actor_sorted[:-1], True]]
+        continued: Dict[int, Dict[str, Any]] = {}
+        for actor, first in zip(sessions["actor"].to_numpy()[firsts], firsts):
+            prior = self.open.pop(actor, None)
+            if prior is None:
+                continue
+            start = sessions.at[first, "session_start"]
+            if pd.notna(start) and start - prior["session_end"] < self.gap:
+                continued[first] = prior
+            else:
+                self.closed_open.append(prior)
+        kept_open = {last for last in lasts if pd.notna(sessions.at[last, "session_end"])}
+        boundary = sorted(set(continued) | kept_open)
+        app_names = np.asarray(applications, dtype=object)
+        app_starts = np.searchsorted(app_session, np.arange(len(starts) + 1))
+        for sid in boundary:
+            partial = sessions.loc[sid].to_dict()
+            partial["entities"] = dict.fromkeys(names[entity_runs[entity_starts[sid]:entity_starts[sid + 1]]])
+            partial["applications"] = set(app_names[app_runs[app_starts[sid]:app_starts[sid + 1]]])
+            if sid in continued:
+                partial = merge_change_sessions(continued[sid], partial)
+            if sid in kept_open:
+                self.open[partial["actor"]] = partial
+            else:
+                self.closed_open.append(partial)
+        self.closed.append(sessions.drop(index=boundary))
+
+        horizon = ts.max()
+        for actor, partial in list(self.open.items()):
+            if pd.notna(horizon) and partial["session_end"] + self.gap <= horizon:
+                self.closed_open.append(self.open.pop(actor))
+
+    def finish(self) -> pd.DataFrame:
+        self.closed_open.extend(self.open.values())
+        self.open = {}
+        frames = [frame for frame in self.closed if not frame.empty]
+        if self.closed_open:
+            partials = pd.DataFrame([
+                {
+                    **{k: v for k, v in partial.items() if k not in ("entities", "applications")},
+                    "distinct_entities": len(partial["entities"]),
+                    "distinct_applications": len(partial["applications"]),
+                    "affected_entities": ";".join(list(partial["entities"])[:CHANGE_SESSION_MAX_ENTITIES]),
+                }
+                for partial in self.closed_open
+            ])
+            frames.append(partials.astype({"session_start": self.ts_dtype, "session_end": self.ts_dtype}))
+        if not frames:
+            return pd.DataFrame(columns=CHANGE_SESSION_COLUMNS)
+        sessions = pd.concat(frames, ignore_index=True)
+        sessions["duration_minutes"] = (sessions["session_end"] - sessions["session_start"]).dt.total_seconds() / 60
+        sessions = sessions.sort_values(by=["session_start", "actor", "first_row"], kind="mergesort", ignore_index=True)
+        sessions["session_id"] = range(1, len(sessions) + 1)
+        return sessions[CHANGE_SESSION_COLUMNS]
+
+
+def merge_change_sessions(prior: Dict[str, Any], later: Dict[str, Any]) -> Dict[str, Any]:
+    prior["entities"].update(later["entities"])
+    prior["applications"].update(later["applications"])
+    if pd.isna(prior["actor_label"]):
+        prior["actor_label"] = later["actor_label"]
+    if pd.isna(prior["max_risk_score"]) or later["max_risk_score"] > prior["max_risk_score"]:
+        prior["max_risk_score"] = later["max_risk_score"]
+    prior["session_end"] = later["session_end"]
+    prior["change_count"] += later["change_count"]
+    return prior
+
+
+def build_change_sessions(changes: pd.DataFrame, gap_minutes: float) -> pd.DataFrame:
+    builder = ChangeSessionBuilder(gap_minutes)
+    if not changes.empty:
+        builder.add(change_session_inputs(changes))
+    return builder.finish()
+
+
 def format_dt_for_report(ts: Optional[pd.Timestamp], tz: str) -> str:
     if ts is None or pd.isna(ts):
         return "unknown"
@@ -793,13 +2284,128 @@ def format_dt_for_report(ts: Optional[pd.Timestamp], tz: str) -> str:
     return ts.tz_convert(tzinfo).strftime("%Y-%m-%d %H:%M:%S %Z")
 
 
-def build_report(df: pd.DataFrame, changes: pd.DataFrame, out_dir: str, tz: str, top_n: int) -> None:
-    total_events = len(df)
-    total_changes = len(changes)
-    orgs = sorted({x for x in df.get("organization_name", pd.Series()).dropna().unique()})
-    apps = sorted({x for x in df.get("application_name", pd.Series()).dropna().unique()})
-    start = df["event_timestamp_utc"].min()
-    end = df["event_timestamp_utc"].max()
+def empty_report_aggregates(top_n: int) -> ReportAggregates:
+    return ReportAggregates(
+        top_n=top_n,
+        total_events=0,
+        total_changes=0,
+        export_count=0,
+        impersonation_count=0,
+        orgs=set(),
+        apps=set(),
+        start=None,
+        end=None,
+        top_changes=pd.DataFrame(),
+        high_risk=pd.DataFrame(),
+        by_app=pd.DataFrame(columns=["application_name", "change_count", "max_risk"]),
+        by_user=pd.DataFrame(columns=["user_email", "change_count", "max_risk"]),
+        exports=pd.DataFrame(),
+        impersonations=pd.DataFrame(),
+    )
+
+
+def sensitive_events(df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    impersonation_mask = df.get("event_type", pd.Series(dtype=object, index=df.index)).str.contains(
+        "Impersonation", case=False, na=False
+    )
+    return df[df["category"] == "export"], df[impersonation_mask]
+
+
+def compute_report_aggregates(df: pd.DataFrame, changes: pd.DataFrame, top_n: int) -> ReportAggregates:
+    if df.empty:
+        return empty_report_aggregates(top_n)
+    exports, impersonations = sensitive_events(df)
+    aggs = empty_report_aggregates(top_n)
+    aggs.total_events = len(df)
+    aggs.total_changes = len(changes)
+    aggs.export_count = len(exports)
+    aggs.impersonation_count = len(impersonations)
+    aggs.orgs = {x for x in df.get("organization_name", pd.Series(dtype=object)).dropna().unique()}
+    aggs.apps = {x for x in df.get("application_name", pd.Series(dtype=object)).dropna().unique()}
+    aggs.start = df["event_timestamp_utc"].min()
+    aggs.end = df["event_timestamp_utc"].max()
+    aggs.exports = exports.sort_values(by=["event_timestamp_utc"], kind="mergesort").head(top_n)
+    aggs.impersonations = impersonations.sort_values(by=["event_timestamp_utc"], kind="mergesort").head(top_n)
+    if not changes.empty:
+        # Stable sorts keep ties in time order, so merging per-batch heads gives the same rows.
+        aggs.top_changes = changes.sort_values(
+            by=["risk_score", "event_timestamp_utc"], ascending=[False, False], kind="mergesort"
+        ).head(top_n)
+        high_risk = changes[(changes["severity"] == "CRITICAL") | (changes["risk_score"] >= 80)]
+        aggs.high_risk = high_risk.sort_values(by=["risk_score"], ascending=False, kind="mergesort").head(top_n)
+        aggs.by_app = changes.groupby("application_name").agg(
+            change_count=("event_id", "count"),
+            max_risk=("risk_score", "max"),
+        ).reset_index()
+        aggs.by_user = changes.groupby("user_email").agg(
+            change_count=("event_id", "count"),
+            max_risk=("risk_score", "max"),
+        ).reset_index()
+    return aggs
+
+
+def _merge_extreme(a: Optional[pd.Timestamp], b: Optional[pd.Timestamp], pick: Any) -> Optional[pd.Timestamp]:
+    if a is None or pd.isna(a):
+        return b
+    if b is None or pd.isna(b):
+        return a
+    return pick(a, b)
+
+
+def _merge_group_counts(a: pd.DataFrame, b: pd.DataFrame, key: str) -> pd.DataFrame:
+    parts = [p for p in (a, b) if not p.empty]
+    if not parts:
+        return a
+    if len(parts) == 1:
+        return parts[0]
+    return pd.concat(parts, ignore_index=True).groupby(key).agg(
+        change_count=("change_count", "sum"),
+        max_risk=("max_risk", "max"),
+    ).reset_index()
+
+
+def _merge_top_rows(a: pd.DataFrame, b: pd.DataFrame, by: List[str], ascending: List[bool], top_n: int) -> pd.DataFrame:
+    parts = [p for p in (a, b) if not p.empty]
+    if not parts:
+        return a
+    if len(parts) == 1:
+        return parts[0]
+    merged = pd.concat(parts, ignore_index=True)
+    return merged.sort_values(by=by, ascending=ascending, kind="mergesort").head(top_n)
+
+
+def merge_report_aggregates(a: Optional[ReportAggregates], b: ReportAggregates) -> ReportAggregates:
+    if a is None:
+        return b
+    top_n = a.top_n
+    return ReportAggregates(
+        top_n=top_n,
+        total_events=a.total_events + b.total_events,
+        total_changes=a.total_changes + b.total_changes,
+        export_count=a.export_count + b.export_count,
+        impersonation_count=a.impersonation_count + b.impersonation_count,
+        orgs=a.orgs | b.orgs,
+        apps=a.apps | b.apps,
+        start=_merge_extreme(a.start, b.start, min),
+        end=_merge_extreme(a.end, b.end, max),
+        top_changes=_merge_top_rows(
+            a.top_changes, b.top_changes, ["risk_score", "event_timestamp_utc"], [False, False], top_n
+        ),
+        high_risk=_merge_top_rows(a.high_risk, b.high_risk, ["risk_score"], [False], top_n),
+        by_app=_merge_group_counts(a.by_app, b.by_app, "application_name"),
+        by_user=_merge_group_counts(a.by_user, b.by_user, "user_email"),
+        exports=_merge_top_rows(a.exports, b.exports, ["event_timestamp_utc"], [True], top_n),
+        impersonations=_merge_top_rows(a.impersonations, b.impersonations, ["event_timestamp_utc"], [True], top_n),
+    )
+
+
+def render_report_summary(aggs: ReportAggregates, tz: str) -> List[str]:
+    total_events = aggs.total_events
+    total_changes = aggs.total_changes
+    orgs = sorted(aggs.orgs)
+    apps = sorted(aggs.apps)
+    start = aggs.start
+    end = aggs.end
 
     report_lines: List[str] = []
     report_lines.append("# Pigment Audit Change Report")
@@ -811,10 +2417,8 @@ def build_report(df: pd.DataFrame, changes: pd.DataFrame, out_dir: str, tz: str,
         f"{total_events} events, {total_changes} changes."
     )
 
-    if not changes.empty:
-        top_change = changes.sort_values(
-            by=["risk_score", "event_timestamp_utc"], ascending=[False, False]
-        ).iloc[0]
+    if total_changes:
+        top_change = aggs.top_changes.iloc[0]
         entity_label = top_change.get("entity_name") or top_change.get("meta_name") or "unknown"
         app_label = top_change.get("application_name") or "unknown"
         when = format_dt_for_report(top_change.get("event_timestamp_utc"), tz)
@@ -823,40 +2427,26 @@ def build_report(df: pd.DataFrame, changes: pd.DataFrame, out_dir: str, tz: str,
             f"({app_label}) at {when}, risk={top_change.get('risk_score')}."
         )
 
-        app_counts = (
-            changes.groupby("application_name")["event_id"]
-            .count()
-            .sort_values(ascending=False)
-            .head(2)
-        )
+        app_counts = aggs.by_app.sort_values(by="change_count", ascending=False).head(2)
         if not app_counts.empty:
             summary_lines.append(
                 "- Most active apps: "
-                + ", ".join([f"{idx} ({val})" for idx, val in app_counts.items()])
+                + ", ".join([f"{row.application_name} ({row.change_count})" for row in app_counts.itertuples()])
                 + "."
             )
 
-        user_counts = (
-            changes.groupby("user_email")["event_id"]
-            .count()
-            .sort_values(ascending=False)
-            .head(2)
-        )
+        user_counts = aggs.by_user.sort_values(by="change_count", ascending=False).head(2)
         if not user_counts.empty:
             summary_lines.append(
                 "- Most active users: "
-                + ", ".join([f"{idx or 'unknown'} ({val})" for idx, val in user_counts.items()])
+                + ", ".join([f"{row.user_email or 'unknown'} ({row.change_count})" for row in user_counts.itertuples()])
                 + "."
             )
     else:
         summary_lines.append("- No change events detected in the selected window.")
 
-    export_count = int((df["category"] == "export").sum()) if "category" in df.columns else 0
-    impersonation_count = int(
-        df.get("event_type", pd.Series()).str.contains("Impersonation", case=False, na=False).sum()
-    )
     summary_lines.append(
-        f"- Sensitive activity: {export_count} exports, {impersonation_count} impersonation events."
+        f"- Sensitive activity: {aggs.export_count} exports, {aggs.impersonation_count} impersonation events."
     )
 
     report_lines.extend(summary_lines)
@@ -867,14 +2457,18 @@ def build_report(df: pd.DataFrame, changes: pd.DataFrame, out_dir: str, tz: str,
     report_lines.append(f"- Applications: {', '.join(apps) if apps else 'unknown'}")
     report_lines.append(f"- Total events: {total_events}")
     report_lines.append(f"- Total change events: {total_changes}")
+    return report_lines
+
 
+def render_report(aggs: ReportAggregates, tz: str, top_n: int) -> List[str]:
+    total_changes = aggs.total_changes
+    report_lines = render_report_summary(aggs, tz)
     report_lines.append("")
     report_lines.append("## Top Changes (by risk score)")
-    if changes.empty:
+    if not total_changes:
         report_lines.append("- No change events found.")
     else:
-        top_changes = changes.sort_values(by=["risk_score", "event_timestamp_utc"], ascending=[False, False]).head(top_n)
-        for _, row in top_changes.iterrows():
+        for _, row in aggs.top_changes.head(top_n).iterrows():
             when = format_dt_for_report(row.get("event_timestamp_utc"), tz)
             report_lines.append(
                 f"- {when} | {row.get('severity')} | {row.get('event_type')} | "
@@ -885,13 +2479,10 @@ def build_report(df: pd.DataFrame, changes: pd.DataFrame, out_dir: str, tz: str,
 
     report_lines.append("")
     report_lines.append("## Changes by Application")
-    if changes.empty:
+    if not total_changes:
         report_lines.append("- No change events found.")
     else:
-        by_app = changes.groupby("application_name").agg(
-            change_count=("event_id", "count"),
-            max_risk=("risk_score", "max"),
-        ).reset_index().sort_values(by=["max_risk", "change_count"], ascending=False).head(top_n)
+        by_app = aggs.by_app.sort_values(by=["max_risk", "change_count"], ascending=False).head(top_n)
         for _, row in by_app.iterrows():
             report_lines.append(
                 f"- {row.get('application_name')}: changes={row.get('change_count')}, max_risk={row.get('max_risk')}"
@@ -899,25 +2490,38 @@ def build_report(df: pd.DataFrame, changes: pd.DataFrame, out_dir: str, tz: str,
 
     report_lines.append("")
     report_lines.append("## Changes by User")
-    if changes.empty:
+    if not total_changes:
         report_lines.append("- No change events found.")
     else:
-        by_user = changes.groupby("user_email").agg(
-            change_count=("event_id", "count"),
-            max_risk=("risk_score", "max"),
-        ).reset_index().sort_values(by=["max_risk", "change_count"], ascending=False).head(top_n)
+        by_user = aggs.by_user.sort_values(by=["max_risk", "change_count"], ascending=False).head(top_n)
         for _, row in by_user.iterrows():
             report_lines.append(
                 f"- {row.get('user_email') or 'unknown'}: changes={row.get('change_count')}, max_risk={row.get('max_risk')}"
             )
 
+    if aggs.sessions is not None:
+        report_lines.append("")
+        report_lines.append("## Change Sessions (bursts)")
+        if aggs.sessions.empty:
+            report_lines.append("- No change sessions found.")
+        else:
+            top_sessions = aggs.sessions.sort_values(
+                by=["max_risk_score", "change_count"], ascending=False, kind="mergesort"
+            ).head(top_n)
+            for _, row in top_sessions.iterrows():
+                report_lines.append(
+                    f"- {format_dt_for_report(row.get('session_start'), tz)} to "
+                    f"{format_dt_for_report(row.get('session_end'), tz)} | {row.get('actor')} | "
+                    f"changes={row.get('change_count')} | entities={row.get('distinct_entities')} | "
+                    f"max_risk={row.get('max_risk_score')} | {row.get('affected_entities')}"
+                )
+
     report_lines.append("")
     report_lines.append("## High-Risk Items")
-    high_risk = changes[(changes["severity"] == "CRITICAL") | (changes["risk_score"] >= 80)]
-    if high_risk.empty:
+    if aggs.high_risk.empty:
         report_lines.append("- No high-risk items detected.")
     else:
-        for _, row in high_risk.sort_values(by=["risk_score"], ascending=False).head(top_n).iterrows():
+        for _, row in aggs.high_risk.head(top_n).iterrows():
             when = format_dt_for_report(row.get("event_timestamp_utc"), tz)
             report_lines.append(
                 f"- {when} | {row.get('event_type')} | {row.get('entity_name') or row.get('meta_name')} | "
@@ -926,32 +2530,37 @@ def build_report(df: pd.DataFrame, changes: pd.DataFrame, out_dir: str, tz: str,
 
     report_lines.append("")
     report_lines.append("## Exports and Impersonations")
-    exports = df[df["category"] == "export"]
-    impersonations = df[df["event_type"].str.contains("Impersonation", case=False, na=False)]
-    if exports.empty and impersonations.empty:
+    if aggs.exports.empty and aggs.impersonations.empty:
         report_lines.append("- None detected.")
     else:
-        for _, row in exports.head(top_n).iterrows():
+        for _, row in aggs.exports.head(top_n).iterrows():
             when = format_dt_for_report(row.get("event_timestamp_utc"), tz)
             report_lines.append(
                 f"- Export | {when} | {row.get('entity_name') or row.get('meta_name')} | {row.get('user_email')}"
             )
-        for _, row in impersonations.head(top_n).iterrows():
+        for _, row in aggs.impersonations.head(top_n).iterrows():
             when = format_dt_for_report(row.get("event_timestamp_utc"), tz)
             report_lines.append(
                 f"- Impersonation | {when} | {row.get('user_email') or row.get('actor_label')}"
             )
 
-    report_lines.append("")
-    report_lines.append("## Next Checks")
-    report_lines.append("- Validate critical deletions and security changes for intent and approvals.")
-    report_lines.append("- Review formula or metric updates with high blast radius for regressions.")
-    report_lines.append("- Confirm data exports were authorized and expected.")
-    report_lines.append("- Audit impersonation sessions for scope and duration.")
+    report_lines.extend(REPORT_NEXT_CHECKS)
+    return report_lines
+
+
+def write_text_atomic(path: str, text: str) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
 
+
+def write_report(report_lines: List[str], out_dir: str, with_html: bool = True) -> None:
+    os.makedirs(out_dir, exist_ok=True)
     report_path = os.path.join(out_dir, "report.md")
-    with open(report_path, "w", encoding="utf-8") as f:
-        f.write("\n".join(report_lines))
+    write_text_atomic(report_path, "\n".join(report_lines))
+    if not with_html:
+        return
 
     try:
         from jinja2 import Template  # type: ignore
@@ -981,27 +2590,2468 @@ def build_report(df: pd.DataFrame, changes: pd.DataFrame, out_dir: str, tz: str,
         )
         html_body = "".join([f"<p>{line}</p>" for line in report_lines])
         html_out = html_template.render(body=html_body)
-        with open(os.path.join(out_dir, "report.html"), "w", encoding="utf-8") as f:
-            f.write(html_out)
+        write_text_atomic(os.path.join(out_dir, "report.html"), html_out)
     except Exception:
         logging.info("jinja2 not available; skipping HTML report")
 
 
+REPORT_VIEWER_HTML = """<!DOCTYPE html>
+<html>
+<head>
+  <meta charset="utf-8" />
+  <title>Pigment Audit Change Report</title>
+  <style>
+    body { font-family: Arial, sans-serif; margin: 24px; }
+    h1, h2 { color: #2b2b2b; }
+    ul { line-height: 1.4; }
+    summary h2 { display: inline; }
+    table { border-collapse: collapse; font-size: 13px; margin: 8px 0; }
+    th, td { border: 1px solid #ddd; padding: 3px 6px; text-align: left; vertical-align: top; }
+    th { background: #f3f3f3; }
+    .pager button { margin-right: 6px; }
+  </style>
+</head>
+<body>
+  <h1>Pigment Audit Change Report</h1>
+  __SUMMARY__
+  <div id="tables"></div>
+  __CHECKS__
+  <script>
+  // Detail tables live in paginated shards next to this file. Each shard is a script that calls
+  // reportShard(), so pages load on demand from disk without a server (fetch is blocked on file://).
+  var MANIFEST = __MANIFEST__;
+  var shards = {};
+  var waiting = {};
+  function esc(v) {
+    return v === null ? "" : String(v).replace(/[&<>"]/g, function (c) {
+      return {"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"}[c];
+    });
+  }
+  function reportShard(table, page, rows) {
+    var key = table + "/" + page;
+    shards[key] = rows;
+    var done = waiting[key];
+    delete waiting[key];
+    if (done) done(rows);
+  }
+  function loadShard(table, page, done) {
+    var key = table + "/" + page;
+    if (shards[key]) return done(shards[key]);
+    var pending = waiting[key];
+    waiting[key] = done;
+    if (pending) return;
+    var script = document.createElement("script");
+    script.src = MANIFEST.shard_dir + "/" + table + "-" + String(page).padStart(5, "0") + ".js";
+    document.body.appendChild(script);
+  }
+  function showPage(section, info, page) {
+    loadShard(info.name, page, function (rows) {
+      var out = "<table><tr>" + info.columns.map(function (c) { return "<th>" + esc(c) + "</th>"; }).join("") + "</tr>";
+      rows.forEach(function (row) {
+        out += "<tr>" + row.map(function (v) { return "<td>" + esc(v) + "</td>"; }).join("") + "</tr>";
+      });
+      section.querySelector(".rows").innerHTML = out + "</table>";
+      section.querySelector(".page").textContent = "page " + page + " of " + info.shards;
+      section.dataset.page = page;
+    });
+  }
+  MANIFEST.tables.forEach(function (info, i) {
+    var section = document.createElement("details");
+    section.innerHTML = "<summary><h2>" + esc(info.title) + "</h2> (" + info.rows + " rows)</summary>" +
+      "<div class='pager'><button class='prev'>&larr;</button><button class='next'>&rarr;</button>" +
+      "<span class='page'></span></div><div class='rows'></div>";
+    function turn(step) {
+      var page = Number(section.dataset.page || 1) + step;
+      if (page >= 1 && page <= info.shards) showPage(section, info, page);
+    }
+    section.querySelector(".prev").onclick = function () { turn(-1); };
+    section.querySelector(".next").onclick = function () { turn(1); };
+    section.addEventListener("toggle", function () {
+      if (section.open && !section.dataset.page && info.shards) showPage(section, info, 1);
+    });
+    document.getElementById("tables").appendChild(section);
+    if (i === 0) section.open = true;
+  });
+  </script>
+</body>
+</html>
+"""
+
+
+def report_lines_html(lines: List[str]) -> str:
+    parts: List[str] = []
+    in_list = False
+    for line in lines:
+        if line.startswith("- "):
+            if not in_list:
+                parts.append("<ul>")
+                in_list = True
+            parts.append(f"<li>{html.escape(line[2:])}</li>")
+            continue
+        if in_list:
+            parts.append("</ul>")
+            in_list = False
+        if line.startswith("## "):
+            parts.append(f"<h2>{html.escape(line[3:])}</h2>")
+        elif line and not line.startswith("# "):
+            parts.append(f"<p>{html.escape(line)}</p>")
+    if in_list:
+        parts.append("</ul>")
+    return "\n".join(parts)
+
+
+def format_dt_series(values: pd.Series, tz: str) -> pd.Series:
+    zone = "UTC"
+    if ZoneInfo is not None:
+        try:
+            ZoneInfo(tz)
+            zone = tz
+        except Exception:
+            pass
+    return values.dt.tz_convert(zone).dt.strftime("%Y-%m-%d %H:%M:%S %Z").fillna("unknown")
+
+
+def _coalesce(frame: pd.DataFrame, columns: List[str]) -> pd.Series:
+    out = pd.Series(None, index=frame.index, dtype=object)
+    for col in columns:
+        if col in frame.columns:
+            out = out.where(out.notna() & (out != ""), frame[col])
+    return out
+
+
+def report_shard_frame(table: str, frame: pd.DataFrame, tz: str) -> pd.DataFrame:
+    if table == "change_sessions":
+        view = pd.DataFrame({
+            "start": format_dt_series(frame["session_start"], tz),
+            "end": format_dt_series(frame["session_end"], tz),
+            "max_risk": frame["max_risk_score"],
+        })
+        for col in ("actor", "change_count", "distinct_entities", "affected_entities"):
+            view[col] = frame[col]
+    elif table in {"changes_by_app", "changes_by_user"}:
+        view = frame.rename(columns={"application_name": "application", "user_email": "user"})
+    else:
+        view = pd.DataFrame({
+            "time": format_dt_series(frame["event_timestamp_utc"], tz),
+            "entity": _coalesce(frame, ["entity_name", "meta_name"]),
+            "application": frame.get("application_name"),
+            "user": _coalesce(frame, ["user_email", "actor_label"]),
+        })
+        for col in ("severity", "event_type", "risk_score", "risk_reasons"):
+            if col in frame.columns:
+                view[col] = frame[col]
+    return view.reindex(columns=REPORT_SHARD_TABLES[table][1])
+
+
+class ReportShardWriter:
+    # Buffers rows until a page is full, then writes it as one compact JSON shard; memory stays at
+    # about one page regardless of the table size.
+    def __init__(self, shard_dir: str, table: str, tz: str, shard_rows: int) -> None:
+        self.shard_dir = shard_dir
+        self.table = table
+        self.tz = tz
+        self.shard_rows = max(1, shard_rows)
+        self.rows = 0
+        self.shards = 0
+        self._pending: List[pd.DataFrame] = []
+        self._pending_rows = 0
+
+    def write(self, frame: pd.DataFrame) -> None:
+        if frame.empty:
+            return
+        self._pending.append(frame)
+        self._pending_rows += len(frame)
+        if self._pending_rows >= self.shard_rows:
+            self._flush(final=False)
+
+    def _flush(self, final: bool) -> None:
+        pending = pd.concat(self._pending, ignore_index=True) if len(self._pending) > 1 else self._pending[0]
+        full = len(pending) if final else len(pending) - len(pending) % self.shard_rows
+        for start in range(0, full, self.shard_rows):
+            self._write_shard(pending.iloc[start:start + self.shard_rows])
+        rest = pending.iloc[full:]
+        self._pending = [rest] if not rest.empty else []
+        self._pending_rows = len(rest)
+
+    def _write_shard(self, frame: pd.DataFrame) -> None:
+        self.shards += 1
+        self.rows += len(frame)
+        rows = report_shard_frame(self.table, frame, self.tz).to_json(orient="values")
+        path = os.path.join(self.shard_dir, f"{self.table}-{self.shards:05d}.js")
+        write_text_atomic(path, f"reportShard({json.dumps(self.table)}, {self.shards}, {rows});\n")
+
+    def close(self) -> Dict[str, Any]:
+        if self._pending:
+            self._flush(final=True)
+        title, columns = REPORT_SHARD_TABLES[self.table]
+        return {"name": self.table, "title": title, "columns": columns, "rows": self.rows, "shards": self.shards}
+
+
+def open_report_shards(out_dir: str) -> str:
+    shard_dir = os.path.join(out_dir, REPORT_SHARD_DIR)
+    shutil.rmtree(shard_dir, ignore_errors=True)
+    os.makedirs(shard_dir)
+    return shard_dir
+
+
+def write_report_shards(
+    shard_dir: str,
+    tz: str,
+    shard_rows: int,
+    tables: Dict[str, Iterable[pd.DataFrame]],
+) -> Dict[str, Dict[str, Any]]:
+    manifest: Dict[str, Dict[str, Any]] = {}
+    for table, frames in tables.items():
+        writer = ReportShardWriter(shard_dir, table, tz, shard_rows)
+        for frame in frames:
+            writer.write(frame)
+        manifest[table] = writer.close()
+    return manifest
+
+
+def ranked_by_risk(changes: pd.DataFrame) -> pd.DataFrame:
+    # Highest risk first, newest first within a score; the keys are ascending so sorted runs of
+    # these rows can go through external_merge.
+    ranked = changes.reindex(columns=REPORT_SHARD_SOURCE_COLUMNS)
+    ranked["__neg_risk"] = -pd.to_numeric(changes["risk_score"], errors="coerce").fillna(0)
+    ranked["__neg_ts"] = -changes["event_timestamp_utc"].fillna(MIN_SORT_TS).astype("int64")
+    return ranked.sort_values(by=RISK_ORDER, kind="mergesort")
+
+
+def ranked_sessions(sessions: pd.DataFrame) -> pd.DataFrame:
+    return sessions.sort_values(by=["max_risk_score", "change_count"], ascending=False, kind="mergesort")
+
+
+def grouped_report_tables(aggs: ReportAggregates) -> Dict[str, Iterable[pd.DataFrame]]:
+    order = ["max_risk", "change_count"]
+    return {
+        "changes_by_app": [aggs.by_app.sort_values(by=order, ascending=False, kind="mergesort")],
+        "changes_by_user": [aggs.by_user.sort_values(by=order, ascending=False, kind="mergesort")],
+    }
+
+
+def write_report_viewer(aggs: ReportAggregates, manifest: Dict[str, Dict[str, Any]], out_dir: str, tz: str) -> None:
+    tables = [manifest[name] for name in REPORT_SHARD_TABLES if name in manifest]
+    payload = json.dumps({"shard_dir": REPORT_SHARD_DIR, "tables": tables}).replace("</", "<\\/")
+    page = (
+        REPORT_VIEWER_HTML.replace("__SUMMARY__", report_lines_html(render_report_summary(aggs, tz)))
+        .replace("__CHECKS__", report_lines_html(REPORT_NEXT_CHECKS))
+        .replace("__MANIFEST__", payload)
+    )
+    write_text_atomic(os.path.join(out_dir, "report.html"), page)
+
+
+def build_report(
+    df: pd.DataFrame,
+    changes: pd.DataFrame,
+    out_dir: str,
+    tz: str,
+    top_n: int,
+    sessions: Optional[pd.DataFrame] = None,
+    shard_rows: Optional[int] = None,
+) -> None:
+    aggs = compute_report_aggregates(df, changes, top_n)
+    aggs.sessions = sessions
+    write_report(render_report(aggs, tz, top_n), out_dir, with_html=not shard_rows)
+    if not shard_rows:
+        return
+    tables: Dict[str, Iterable[pd.DataFrame]] = {"changes_by_risk": [ranked_by_risk(changes)] if not changes.empty else []}
+    tables.update(grouped_report_tables(aggs))
+    if sessions is not None:
+        tables["change_sessions"] = [ranked_sessions(sessions)]
+    if not df.empty:
+        exports, impersonations = sensitive_events(df)
+        tables["exports"] = [exports.sort_values(by=["event_timestamp_utc"], kind="mergesort")]
+        tables["impersonations"] = [impersonations.sort_values(by=["event_timestamp_utc"], kind="mergesort")]
+    manifest = write_report_shards(open_report_shards(out_dir), tz, shard_rows, tables)
+    write_report_viewer(aggs, manifest, out_dir, tz)
+
+
 def write_df(df: pd.DataFrame, out_dir: str, name: str, fmt: str) -> str:
     os.makedirs(out_dir, exist_ok=True)
     if fmt == "parquet":
         try:
             import pyarrow  # noqa: F401
             path = os.path.join(out_dir, f"{name}.parquet")
-            df.to_parquet(path, index=False)
+            df.to_parquet(f"{path}.tmp", index=False)
+            os.replace(f"{path}.tmp", path)
             return path
         except Exception:
             logging.warning("pyarrow not available; falling back to CSV for %s", name)
     path = os.path.join(out_dir, f"{name}.csv")
-    df.to_csv(path, index=False)
+    df.to_csv(f"{path}.tmp", index=False)
+    os.replace(f"{path}.tmp", path)
     return path
 
 
+class TableStreamWriter:
+    def __init__(self, out_dir: str, name: str, fmt: str) -> None:
+        os.makedirs(out_dir, exist_ok=True)
+        self.out_dir = out_dir
+        self.name = name
+        self.fmt = fmt
+        self.path: Optional[str] = None
+        self.columns: Optional[List[str]] = None
+        self._parquet_writer: Any = None
+        self._parquet_schema: Any = None
+        if fmt == "parquet":
+            try:
+                import pyarrow  # noqa: F401
+            except Exception:
+                logging.warning("pyarrow not available; falling back to CSV for %s", name)
+                self.fmt = "csv"
+
+    def write(self, df: pd.DataFrame) -> None:
+        if self.columns is None:
+            self.columns = list(df.columns)
+        elif list(df.columns) != self.columns:
+            dropped = [c for c in df.columns if c not in self.columns]
+            if dropped:
+                logging.warning("Dropping columns not present in %s header: %s", self.name, ", ".join(dropped))
+            df = df.reindex(columns=self.columns)
+        if self.fmt == "parquet":
+            import pyarrow as pa  # type: ignore
+            import pyarrow.parquet as pq  # type: ignore
+
+            if self._parquet_writer is None:
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                self._parquet_schema = table.schema
+                self.path = os.path.join(self.out_dir, f"{self.name}.parquet")
+                self._parquet_writer = pq.ParquetWriter(self.path, self._parquet_schema)
+            else:
+                table = pa.Table.from_pandas(df, schema=self._parquet_schema, preserve_index=False)
+            self._parquet_writer.write_table(table)
+            return
+        if self.path is None:
+            self.path = os.path.join(self.out_dir, f"{self.name}.csv")
+            df.to_csv(self.path, index=False)
+        else:
+            df.to_csv(self.path, index=False, header=False, mode="a")
+
+    def close(self, empty: Optional[pd.DataFrame] = None) -> str:
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+        if self.path is None:
+            self.path = write_df(empty if empty is not None else pd.DataFrame(), self.out_dir, self.name, self.fmt)
+        return self.path
+
+
+class PayloadStore:
+    # payload_json values keyed by the SHA-256 of their text, each compressed on its own (zstd, zlib without
+    # zstandard) so any one can be read back without the rest. Frames are appended to a spill file as they
+    # arrive and only their index is kept; after spill_to() the index and the referenced keys also go to
+    # sorted runs, so memory stays bounded in out-of-core mode. With a trained dictionary the first
+    # PAYLOAD_DICT_SAMPLES distinct payloads are held raw until there are enough to train it.
+    def __init__(self, dictionary: bool = False) -> None:
+        try:
+            import zstandard  # noqa: F401
+            self.codec = "zstd"
+        except Exception:
+            logging.warning("zstandard not available; compressing payloads with zlib")
+            self.codec = "zlib"
+        self.train = dictionary and self.codec == "zstd"
+        # key -> (offset in the spill file, compressed length, raw size)
+        self.index: Dict[str, Tuple[int, int, int]] = {}
+        self.refs: Set[str] = set()
+        self.pending: Dict[str, bytes] = {}
+        self.dict_data: Any = None
+        self.spill_dir: Optional[str] = None
+        self.block_rows = 0
+        self.index_runs: List[List[str]] = []
+        self.ref_runs: List[List[str]] = []
+        self._frames: Any = None
+        self._spilled = 0
+        self._compressor: Any = None
+
+    def spill_to(self, spill_dir: str, block_rows: int) -> None:
+        self.spill_dir = spill_dir
+        self.block_rows = block_rows
+
+    def add(self, values: Iterable[Any]) -> List[str]:
+        keys: List[str] = []
+        for text in values:
+            raw = str(text).encode("utf-8")
+            keys.append(hashlib.sha256(raw).hexdigest())
+            self.put(keys[-1], raw)
+        return keys
+
+    def put(self, key: str, raw: bytes) -> None:
+        # With spilled runs this only skips keys of the current run; the merge in write() drops the rest.
+        if key in self.index or key in self.pending:
+            return
+        if self.train and self.dict_data is None:
+            self.pending[key] = raw
+            if len(self.pending) >= PAYLOAD_DICT_SAMPLES:
+                self._train()
+            return
+        self._append(key, raw)
+
+    def reference(self, keys: pd.Series) -> None:
+        # Keys the written events point at; write() keeps only these payloads.
+        keys = keys.dropna()
+        if self.spill_dir is None:
+            self.refs.update(keys)
+            return
+        refs = pd.DataFrame({"payload_hash": np.sort(keys.unique().astype(object))})
+        self.ref_runs.append(write_sorted_run(refs, self.spill_dir, self.block_rows))
+
+    def _train(self) -> None:
+        import zstandard
+
+        try:
+            self.dict_data = zstandard.train_dictionary(PAYLOAD_DICT_SIZE, list(self.pending.values()))
+        except zstandard.ZstdError:
+            logging.info("Too few distinct payloads to train a zstd dictionary; compressing without one")
+            self.train = False
+        pending, self.pending = self.pending, {}
+        for key, raw in pending.items():
+            self._append(key, raw)
+
+    def _compress(self, raw: bytes) -> bytes:
+        if self.codec == "zlib":
+            return zlib.compress(raw)
+        if self._compressor is None:
+            import zstandard
+
+            self._compressor = zstandard.ZstdCompressor(dict_data=self.dict_data)
+        return self._compressor.compress(raw)
+
+    def _append(self, key: str, raw: bytes) -> None:
+        if self._frames is None:
+            self._frames = tempfile.TemporaryFile(prefix="payloads-", dir=self.spill_dir)
+        frame = self._compress(raw)
+        self._frames.write(frame)
+        self.index[key] = (self._spilled, len(frame), len(raw))
+        self._spilled += len(frame)
+        if self.spill_dir is not None and len(self.index) >= self.block_rows:
+            self._spill_index()
+
+    def _index_frame(self) -> pd.DataFrame:
+        keys = sorted(self.index)
+        entries = [self.index[k] for k in keys]
+        return pd.DataFrame({
+            "payload_hash": pd.Series(keys, dtype=object),
+            "offset": pd.Series([e[0] for e in entries], dtype="int64"),
+            "length": pd.Series([e[1] for e in entries], dtype="int64"),
+            "size": pd.Series([e[2] for e in entries], dtype="int64"),
+        })
+
+    def _spill_index(self) -> None:
+        self.index_runs.append(write_sorted_run(self._index_frame(), self.spill_dir, self.block_rows))
+        self.index = {}
+
+    def _referenced(self) -> Iterator[pd.DataFrame]:
+        # Index rows of the referenced payloads in key order, one key once.
+        if self.spill_dir is None:
+            index = self._index_frame()
+            yield index[index["payload_hash"].isin(self.refs)]
+            return
+        if self.index:
+            self._spill_index()
+        keys = ["payload_hash"]
+        index = external_merge(self.index_runs, keys, keys, self.spill_dir, self.block_rows, dedupe_on="payload_hash")
+        refs = external_merge(self.ref_runs, keys, keys, self.spill_dir, self.block_rows, dedupe_on="payload_hash")
+        # Both streams are sorted, so only the referenced keys up to the current index batch are held.
+        held = pd.Series([], dtype=object)
+        for batch in index:
+            last = batch["payload_hash"].iloc[-1]
+            while held.empty or held.iloc[-1] < last:
+                more = next(refs, None)
+                if more is None:
+                    break
+                held = pd.concat([held, more["payload_hash"]], ignore_index=True)
+            yield batch[batch["payload_hash"].isin(held[held <= last])]
+            held = held[held > last]
+
+    def write(self, out_dir: str) -> str:
+        # Only payloads referenced by the written events are kept; duplicates and filtered rows are dropped.
+        if self.pending:
+            self._train()
+        store_dir = os.path.join(out_dir, PAYLOAD_STORE_DIR)
+        os.makedirs(store_dir, exist_ok=True)
+        index_writer = TableStreamWriter(store_dir, "index", "csv")
+        payloads = 0
+        raw_size = 0
+        offset = 0
+        with open(os.path.join(store_dir, "payloads.bin.tmp"), "wb") as f:
+            for batch in self._referenced():
+                if batch.empty:
+                    continue
+                offsets: List[int] = []
+                for start, length in zip(batch["offset"].tolist(), batch["length"].tolist()):
+                    self._frames.seek(start)
+                    f.write(self._frames.read(length))
+                    offsets.append(offset)
+                    offset += length
+                index_writer.write(pd.DataFrame({
+                    "payload_hash": batch["payload_hash"].to_numpy(),
+                    "offset": offsets,
+                    "length": batch["length"].to_numpy(),
+                    "size": batch["size"].to_numpy(),
+                }))
+                payloads += len(batch)
+                raw_size += int(batch["size"].sum())
+        os.replace(os.path.join(store_dir, "payloads.bin.tmp"), os.path.join(store_dir, "payloads.bin"))
+        index_writer.close(pd.DataFrame(columns=["payload_hash", "offset", "length", "size"]))
+        if self._frames is not None:
+            self._frames.close()
+            self._frames = None
+        manifest = {"codec": self.codec, "hash": "sha256", "payloads": payloads, "dictionary": None}
+        if self.dict_data is not None:
+            manifest["dictionary"] = "dictionary.zstd"
+            with open(os.path.join(store_dir, "dictionary.zstd"), "wb") as f:
+                offset += f.write(self.dict_data.as_bytes())
+        write_text_atomic(os.path.join(store_dir, "manifest.json"), json.dumps(manifest, indent=2))
+        logging.info(
+            "Stored %s distinct payloads (%.1f MB raw, %.1f MB compressed) in %s",
+            payloads,
+            raw_size / (1024 * 1024),
+            offset / (1024 * 1024),
+            store_dir,
+        )
+        return store_dir
+
+
+def rehydrate_payloads(hashes: Iterable[Optional[str]], store_dir: str) -> List[Optional[str]]:
+    with open(os.path.join(store_dir, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    index = pd.read_csv(os.path.join(store_dir, "index.csv"), dtype={"payload_hash": str}).set_index("payload_hash")
+    if manifest["codec"] == "zstd":
+        import zstandard
+
+        dict_data = None
+        if manifest.get("dictionary"):
+            with open(os.path.join(store_dir, manifest["dictionary"]), "rb") as f:
+                dict_data = zstandard.ZstdCompressionDict(f.read())
+        decompress = zstandard.ZstdDecompressor(dict_data=dict_data).decompress
+    else:
+        decompress = zlib.decompress
+
+    found: Dict[str, str] = {}
+    out: List[Optional[str]] = []
+    with open(os.path.join(store_dir, "payloads.bin"), "rb") as f:
+        for key in hashes:
+            if not isinstance(key, str):
+                out.append(None)
+                continue
+            if key not in found:
+                if key not in index.index:
+                    raise KeyError(f"payload {key} not in {store_dir}")
+                f.seek(int(index.at[key, "offset"]))
+                found[key] = decompress(f.read(int(index.at[key, "length"]))).decode("utf-8")
+            out.append(found[key])
+    return out
+
+
+@dataclass
+class RateBaselines:
+    # dimension -> key -> category -> [ewma mean, ewma variance, days of history, last day folded in]
+    stats: Dict[str, Dict[str, Dict[str, List[float]]]] = field(default_factory=dict)
+    # Last complete day folded into the baselines; events up to it were counted by an earlier run.
+    through: Optional[int] = None
+    half_life_days: float = RATE_HALF_LIFE_DAYS
+    # Flags raised on folded days (day -> [dimension, key, category, text]), replayed when a later run
+    # covers those days again; kept for RATE_FLAG_RETENTION_DAYS.
+    flags: Dict[int, List[List[str]]] = field(default_factory=dict)
+    # The last run's final day, which may be partial: its counts ([dimension, key, category, count])
+    # wait here until a later run's data goes past it, and are then folded in.
+    pending_day: Optional[int] = None
+    pending: List[List[Any]] = field(default_factory=list)
+
+    @property
+    def alpha(self) -> float:
+        return 1.0 - 0.5 ** (1.0 / self.half_life_days)
+
+
+def epoch_days(ts: pd.Series) -> pd.Series:
+    return ((ts - EPOCH_UTC) // pd.Timedelta(days=1)).astype("Int64")
+
+
+def day_label(day: int) -> str:
+    return (EPOCH_UTC + pd.Timedelta(days=int(day))).strftime("%Y-%m-%d")
+
+
+def label_day(label: str) -> int:
+    return (pd.Timestamp(label, tz="UTC") - EPOCH_UTC).days
+
+
+def load_rate_baselines(path: str) -> RateBaselines:
+    if not os.path.exists(path):
+        logging.info("No rate baselines at %s; starting fresh", path)
+        return RateBaselines()
+    with open(path, encoding="utf-8") as f:
+        state = json.load(f)
+    stats = {
+        dimension: {
+            key: {cat: [mean, var, days, label_day(last)] for cat, (mean, var, days, last) in cats.items()}
+            for key, cats in keys.items()
+        }
+        for dimension, keys in state.get("baselines", {}).items()
+    }
+    through = label_day(state["through"]) if state.get("through") else None
+    flags = {label_day(day): day_flags for day, day_flags in state.get("flags", {}).items()}
+    pending = state.get("pending") or {}
+    return RateBaselines(
+        stats,
+        through,
+        float(state.get("half_life_days", RATE_HALF_LIFE_DAYS)),
+        flags,
+        label_day(pending["day"]) if pending.get("day") else None,
+        pending.get("counts", []),
+    )
+
+
+def save_rate_baselines(path: str, baselines: RateBaselines) -> None:
+    state = {
+        "half_life_days": baselines.half_life_days,
+        "through": day_label(baselines.through) if baselines.through is not None else None,
+        "baselines": {
+            dimension: {
+                key: {cat: [mean, var, int(days), day_label(last)] for cat, (mean, var, days, last) in cats.items()}
+                for key, cats in keys.items()
+            }
+            for dimension, keys in baselines.stats.items()
+        },
+        "flags": {day_label(day): day_flags for day, day_flags in sorted(baselines.flags.items())},
+        "pending": (
+            {"day": day_label(baselines.pending_day), "counts": baselines.pending}
+            if baselines.pending_day is not None
+            else None
+        ),
+    }
+    parent = os.path.dirname(path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    write_text_atomic(path, json.dumps(state, indent=1, sort_keys=True))
+
+
+def daily_rate_counts(df: pd.DataFrame) -> pd.DataFrame:
+    # Events per (dimension, key, category, UTC day); undated events and missing keys are not counted.
+    day = epoch_days(df["event_timestamp_utc"])
+    parts = []
+    for dimension, column in RATE_DIMENSIONS.items():
+        keyed = pd.DataFrame({"key": df[column], "category": df["category"], "day": day}).dropna()
+        counts = keyed.groupby(["key", "category", "day"], sort=False).size().rename("count").reset_index()
+        counts.insert(0, "dimension", dimension)
+        parts.append(counts)
+    return pd.concat(parts, ignore_index=True)
+
+
+def ewma_skip_days(entry: List[float], days: int, alpha: float) -> None:
+    # Closed form of `days` zero-count updates, so idle keys cost nothing until they are seen again.
+    if days <= 0:
+        return
+    keep = (1.0 - alpha) ** days
+    entry[1] = keep * (entry[1] + entry[0] ** 2 * (1.0 - keep))
+    entry[0] *= keep
+    entry[2] += days
+
+
+def ewma_add_day(entry: List[float], count: int, alpha: float) -> None:
+    diff = count - entry[0]
+    incr = alpha * diff
+    entry[0] += incr
+    entry[1] = (1.0 - alpha) * (entry[1] + diff * incr)
+    entry[2] += 1
+
+
+def update_rate_baselines(baselines: RateBaselines, counts: pd.DataFrame) -> pd.DataFrame:
+    # Scores each new day's counts against the baseline as of the day before, then folds complete days in.
+    # Days already folded in by an earlier run are not counted again, so overlapping exports are not
+    # counted twice; their flags are replayed from the state. The run's last day may be partial: it is
+    # scored and kept as the pending day, merged (per-key maximum, so a re-export of the same events is
+    # not counted twice) with this run's rows for it, and folded in once a later run goes past it.
+    flags: List[Tuple[str, str, str, int, str]] = []
+    if counts.empty:
+        return pd.DataFrame(flags, columns=["dimension", "key", "category", "day", "rate_anomaly"])
+    counts = counts.astype({"day": "int64", "count": "int64"})
+    if baselines.pending_day is not None:
+        pending = pd.DataFrame(baselines.pending, columns=["dimension", "key", "category", "count"])
+        pending.insert(3, "day", baselines.pending_day)
+        counts = (
+            pd.concat([counts, pending.astype({"day": "int64", "count": "int64"})], ignore_index=True)
+            .groupby(["dimension", "key", "category", "day"], sort=False)["count"]
+            .max()
+            .reset_index()
+        )
+    last_day = int(counts["day"].max())
+    last_complete = last_day - 1
+    if baselines.through is not None:
+        folded = counts["day"] <= baselines.through
+        if folded.any():
+            skipped = counts[folded].groupby("dimension", sort=False)["count"].sum()
+            logging.info(
+                "Rate baselines already cover days through %s; not re-counting %s events on those days "
+                "(late events there are not added) and replaying their stored flags",
+                day_label(baselines.through),
+                " and ".join(f"{int(n)} {dimension}" for dimension, n in skipped.items()),
+            )
+            for day in counts.loc[folded, "day"].unique().tolist():
+                flags.extend((dim, key, cat, day, text) for dim, key, cat, text in baselines.flags.get(day, []))
+        counts = counts[~folded]
+    alpha = baselines.alpha
+    counts = counts.sort_values(["day", "dimension", "key", "category"], kind="mergesort")
+    for dimension, key, category, day, count in counts.itertuples(index=False, name=None):
+        entry = baselines.stats.get(dimension, {}).get(key, {}).get(category)
+        if entry is None:
+            if day <= last_complete:
+                baselines.stats.setdefault(dimension, {}).setdefault(key, {})[category] = [float(count), 0.0, 1, day]
+            continue
+        current = list(entry)
+        ewma_skip_days(current, day - int(current[3]) - 1, alpha)
+        mean, std = current[0], max(current[1], current[0], 1.0) ** 0.5
+        warm = current[2] >= RATE_MIN_HISTORY_DAYS
+        if warm and count >= RATE_ANOMALY_MIN_COUNT and count - mean >= RATE_ANOMALY_Z * std:
+            text = f"{dimension} {category} {count}/day vs {mean:.1f}±{std:.1f}"
+            flags.append((dimension, key, category, day, text))
+            if day <= last_complete:
+                baselines.flags.setdefault(day, []).append([dimension, key, category, text])
+        if day <= last_complete:
+            ewma_add_day(current, count, alpha)
+            current[3] = day
+            baselines.stats[dimension][key][category] = current
+    if baselines.through is None or last_complete > baselines.through:
+        baselines.through = last_complete
+    if last_day > baselines.through:
+        baselines.pending_day = last_day
+        baselines.pending = [
+            [dimension, key, category, int(count)]
+            for dimension, key, category, day, count in counts.itertuples(index=False, name=None)
+            if day == last_day
+        ]
+    baselines.flags = {
+        day: day_flags for day, day_flags in baselines.flags.items()
+        if day > baselines.through - RATE_FLAG_RETENTION_DAYS
+    }
+    return pd.DataFrame(flags, columns=["dimension", "key", "category", "day", "rate_anomaly"])
+
+
+def rate_anomaly_column(df: pd.DataFrame, flags: pd.DataFrame) -> pd.Series:
+    day = epoch_days(df["event_timestamp_utc"])
+    out = pd.Series(None, index=df.index, dtype=object)
+    for dimension, column in RATE_DIMENSIONS.items():
+        keys = pd.DataFrame({"key": df[column], "category": df["category"], "day": day})
+        found = flags.loc[flags["dimension"] == dimension, ["key", "category", "day", "rate_anomaly"]]
+        text = keys.merge(found.astype({"day": "Int64"}), how="left", on=["key", "category", "day"])["rate_anomaly"]
+        text = pd.Series(text.to_numpy(dtype=object), index=df.index)
+        out = out.where(text.isna(), out + "; " + text).fillna(text)
+    return out.astype(object).where(out.notna(), None)
+
+
+def parse_memory_limit(value: str) -> int:
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([kmgt]?)(?:i?b)?\s*", value, re.IGNORECASE)
+    if not match:
+        raise argparse.ArgumentTypeError(f"invalid memory limit: {value!r} (expected e.g. 512M or 4G)")
+    units = {"": 1024**2, "k": 1024, "m": 1024**2, "g": 1024**3, "t": 1024**4}
+    return int(float(match.group(1)) * units[match.group(2).lower()])
+
+
+def estimate_out_of_core_rows(path: str, memory_limit: int) -> int:
+    sample = pd.read_csv(path, dtype=str, nrows=2000, low_memory=False)
+    if sample.empty:
+        return OUT_OF_CORE_MIN_ROWS
+    bytes_per_row = process_chunk(sample, 0).memory_usage(deep=True).sum() / len(sample)
+    return max(OUT_OF_CORE_MIN_ROWS, int(memory_limit / (bytes_per_row * OUT_OF_CORE_OVERHEAD)))
+
+
+def add_sort_timestamp(df: pd.DataFrame) -> pd.DataFrame:
+    df["__sort_ts"] = df["event_timestamp_utc"].fillna(MAX_SORT_TS)
+    return df
+
+
+def write_sorted_run(df: pd.DataFrame, spill_dir: str, block_rows: int) -> List[str]:
+    paths: List[str] = []
+    for start in range(0, len(df), block_rows):
+        fd, path = tempfile.mkstemp(prefix="run-", suffix=".pkl", dir=spill_dir)
+        os.close(fd)
+        df.iloc[start:start + block_rows].to_pickle(path)
+        paths.append(path)
+    return paths
+
+
+def rebatch(frames: Iterable[pd.DataFrame], min_rows: int) -> Iterator[pd.DataFrame]:
+    pending: List[pd.DataFrame] = []
+    pending_rows = 0
+    for frame in frames:
+        if frame.empty:
+            continue
+        pending.append(frame)
+        pending_rows += len(frame)
+        if pending_rows >= min_rows:
+            yield pd.concat(pending, ignore_index=True) if len(pending) > 1 else pending[0]
+            pending = []
+            pending_rows = 0
+    if pending:
+        yield pd.concat(pending, ignore_index=True) if len(pending) > 1 else pending[0]
+
+
+def _rows_at_or_below(df: pd.DataFrame, keys: List[str], bound: Tuple[Any, ...]) -> pd.Series:
+    below = pd.Series(False, index=df.index)
+    equal = pd.Series(True, index=df.index)
+    for key, value in zip(keys, bound):
+        col = df[key]
+        below |= equal & (col < value)
+        equal &= col == value
+    return below | equal
+
+
+def merge_sorted_runs(
+    runs: List[List[str]],
+    keys: List[str],
+    order: List[str],
+    dedupe_on: Optional[str] = None,
+) -> Iterator[pd.DataFrame]:
+    # Each run is a list of pickled blocks sorted by ``keys`` with unique keys per run.
+    # Rows up to the smallest buffered tail key are final, so they can be emitted as one batch.
+    pending = [list(run) for run in runs]
+
+    def next_block(i: int) -> Optional[pd.DataFrame]:
+        while pending[i]:
+            path = pending[i].pop(0)
+            block = pd.read_pickle(path)
+            os.remove(path)
+            if not block.empty:
+                return block
+        return None
+
+    buffers = [next_block(i) for i in range(len(pending))]
+    while True:
+        active = [i for i, buf in enumerate(buffers) if buf is not None]
+        if not active:
+            return
+        bound = min(tuple(buffers[i][k].iloc[-1] for k in keys) for i in active)
+        parts: List[pd.DataFrame] = []
+        for i in active:
+            buf = buffers[i]
+            mask = _rows_at_or_below(buf, keys, bound)
+            parts.append(buf[mask])
+            rest = buf[~mask]
+            buffers[i] = rest if not rest.empty else next_block(i)
+        batch = pd.concat(parts, ignore_index=True).sort_values(by=order, kind="mergesort")
+        if dedupe_on:
+            batch = batch.drop_duplicates(subset=[dedupe_on], keep="last")
+        yield batch
+
+
+def external_merge(
+    runs: List[List[str]],
+    keys: List[str],
+    order: List[str],
+    spill_dir: str,
+    block_rows: int,
+    dedupe_on: Optional[str] = None,
+) -> Iterator[pd.DataFrame]:
+    while len(runs) > OUT_OF_CORE_MERGE_FAN_IN:
+        logging.info("Merging %s runs (fan-in %s)", len(runs), OUT_OF_CORE_MERGE_FAN_IN)
+        merged: List[List[str]] = []
+        for start in range(0, len(runs), OUT_OF_CORE_MERGE_FAN_IN):
+            group = runs[start:start + OUT_OF_CORE_MERGE_FAN_IN]
+            paths: List[str] = []
+            for batch in rebatch(merge_sorted_runs(group, keys, order, dedupe_on), block_rows):
+                paths.extend(write_sorted_run(batch, spill_dir, block_rows))
+            merged.append(paths)
+        runs = merged
+    yield from merge_sorted_runs(runs, keys, order, dedupe_on)
+
+
+def run_out_of_core(
+    args: argparse.Namespace,
+    meta_ctx: Optional[MetadataContext],
+    diff_ctx: Optional[DiffContext],
+    payload_store: Optional[PayloadStore] = None,
+) -> int:
+    chunk_rows = args.chunk_rows or estimate_out_of_core_rows(args.audit, args.memory_limit)
+    block_rows = max(OUT_OF_CORE_MIN_ROWS // 10, chunk_rows // OUT_OF_CORE_MERGE_FAN_IN)
+    logging.info(
+        "Out-of-core mode: %s rows per chunk, %s rows per spilled block (memory limit %.0f MB)",
+        chunk_rows,
+        block_rows,
+        args.memory_limit / (1024 * 1024),
+    )
+    os.makedirs(args.out, exist_ok=True)
+    with tempfile.TemporaryDirectory(prefix="audit-spill-", dir=args.spill_dir) as spill_dir:
+        if payload_store is not None:
+            payload_store.spill_to(spill_dir, block_rows)
+        id_runs: List[List[str]] = []
+        offset = 0
+        for chunk in pd.read_csv(args.audit, dtype=str, chunksize=chunk_rows, low_memory=False):
+            processed = add_sort_timestamp(process_chunk(chunk, offset, payload_store))
+            processed = processed.sort_values(by=DEDUPE_ORDER, kind="mergesort")
+            processed = processed.drop_duplicates(subset=["event_id"], keep="last")
+            id_runs.append(write_sorted_run(processed, spill_dir, block_rows))
+            offset += len(chunk)
+        logging.info("Spilled %s rows into %s sorted runs", offset, len(id_runs))
+
+        time_runs: List[List[str]] = []
+        deduped = external_merge(id_runs, ["event_id"], DEDUPE_ORDER, spill_dir, block_rows, dedupe_on="event_id")
+        for block in rebatch(deduped, chunk_rows):
+            block = apply_filters(block, args)
+            if block.empty:
+                continue
+            block = enrich_with_metadata(block, meta_ctx, diff_ctx)
+            block = block.sort_values(by=TIME_ORDER, kind="mergesort")
+            time_runs.append(write_sorted_run(block, spill_dir, block_rows))
+
+        events_writer = TableStreamWriter(args.out, "events_enriched", args.format)
+        changes_writer = TableStreamWriter(args.out, "changes_timeline", args.format)
+        summary_partial: Optional[EntitySummaryPartial] = None
+        report_aggs: Optional[ReportAggregates] = None
+        # Batches arrive in time order, so exports/impersonations shard directly; the by-risk table
+        # needs its own sorted runs and a second external merge.
+        shard_dir = open_report_shards(args.out) if args.html_shards else None
+        # The merged batches are in time order, which is what the session builder consumes.
+        session_builder = ChangeSessionBuilder(args.session_gap)
+        risk_runs: List[List[str]] = []
+        sensitive_writers: Dict[str, ReportShardWriter] = {}
+        if shard_dir:
+            for name in ("exports", "impersonations"):
+                sensitive_writers[name] = ReportShardWriter(shard_dir, name, args.timezone, args.shard_rows)
+        for batch in rebatch(external_merge(time_runs, TIME_ORDER, TIME_ORDER, spill_dir, block_rows), block_rows):
+            batch = batch.drop(columns=["__sort_ts"])
+            changes = build_changes_timeline(batch)
+            events_writer.write(batch)
+            if not changes.empty:
+                changes_writer.write(changes)
+                session_builder.add(change_session_inputs(changes))
+            if payload_store is not None:
+                payload_store.reference(batch["payload_hash"])
+            summary_partial = merge_entity_summary_partials(summary_partial, entity_summary_partial(changes))
+            report_aggs = merge_report_aggregates(report_aggs, compute_report_aggregates(batch, changes, args.top))
+            if shard_dir:
+                exports, impersonations = sensitive_events(batch)
+                sensitive_writers["exports"].write(exports)
+                sensitive_writers["impersonations"].write(impersonations)
+                if not changes.empty:
+                    risk_runs.append(write_sorted_run(ranked_by_risk(changes), spill_dir, block_rows))
+        events_writer.close()
+        changes_writer.close()
+
+        aggs = report_aggs or empty_report_aggregates(args.top)
+        aggs.sessions = session_builder.finish()
+        if shard_dir:
+            ranked = external_merge(risk_runs, RISK_ORDER, RISK_ORDER, spill_dir, block_rows)
+            manifest = write_report_shards(shard_dir, args.timezone, args.shard_rows, {"changes_by_risk": ranked})
+            manifest.update(write_report_shards(shard_dir, args.timezone, args.shard_rows, grouped_report_tables(aggs)))
+            manifest.update(write_report_shards(
+                shard_dir, args.timezone, args.shard_rows, {"change_sessions": [ranked_sessions(aggs.sessions)]}
+            ))
+            for name, writer in sensitive_writers.items():
+                manifest[name] = writer.close()
+        if payload_store is not None:
+            payload_store.write(args.out)
+
+    write_df(finalize_entity_summary(summary_partial), args.out, "entity_change_summary", args.format)
+    write_df(aggs.sessions, args.out, "change_sessions", args.format)
+    write_report(render_report(aggs, args.timezone, args.top), args.out, with_html=not shard_dir)
+    if shard_dir:
+        write_report_viewer(aggs, manifest, args.out, args.timezone)
+    logging.info("Done. Outputs written to %s", args.out)
+    return 0
+
+
+def hash_values(values: pd.Series) -> np.ndarray:
+    return pd.util.hash_array(values.astype(str).to_numpy(dtype=object))
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    # Split into 32-bit halves so the float conversion used by frexp stays exact.
+    high = (values >> np.uint64(32)).astype(np.float64)
+    low = (values & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    return np.where(high > 0, 32 + np.frexp(high)[1], np.frexp(low)[1])
+
+
+class CountMinSketch:
+    def __init__(self, width: int = SKETCH_CM_WIDTH, depth: int = SKETCH_CM_DEPTH) -> None:
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.total = 0
+
+    def _columns(self, hashes: np.ndarray) -> np.ndarray:
+        # Double hashing: row d uses h1 + d * h2, derived from one 64-bit hash.
+        h1 = hashes & np.uint64(0xFFFFFFFF)
+        h2 = (hashes >> np.uint64(32)) | np.uint64(1)
+        rows = np.arange(self.depth, dtype=np.uint64)[:, None]
+        return ((h1[None, :] + rows * h2[None, :]) % np.uint64(self.width)).astype(np.intp)
+
+    def add(self, hashes: np.ndarray, counts: np.ndarray) -> None:
+        columns = self._columns(hashes)
+        for row in range(self.depth):
+            self.table[row] += np.bincount(columns[row], weights=counts, minlength=self.width).astype(np.int64)
+        self.total += int(counts.sum())
+
+    def estimate(self, hashes: np.ndarray) -> np.ndarray:
+        columns = self._columns(hashes)
+        return self.table[np.arange(self.depth)[:, None], columns].min(axis=0)
+
+    def merge(self, other: "CountMinSketch") -> "CountMinSketch":
+        merged = CountMinSketch(self.width, self.depth)
+        merged.table = self.table + other.table
+        merged.total = self.total + other.total
+        return merged
+
+    def error_bound(self) -> Tuple[float, float]:
+        return np.e / self.width * self.total, 1 - np.exp(-self.depth)
+
+
+class SpaceSaving:
+    def __init__(self, capacity: int = SKETCH_CAPACITY) -> None:
+        self.capacity = capacity
+        self.counts = pd.Series(dtype="int64")
+        self.errors = pd.Series(dtype="int64")
+        # Upper bound on the count of any key that is not monitored.
+        self.floor = 0
+        self.total = 0
+
+    @classmethod
+    def from_counts(cls, counts: pd.Series, capacity: int = SKETCH_CAPACITY) -> "SpaceSaving":
+        sketch = cls(capacity)
+        counts = counts.sort_index().astype("int64")
+        sketch.total = int(counts.sum())
+        sketch._truncate(counts, pd.Series(0, index=counts.index, dtype="int64"), 0)
+        return sketch
+
+    def _truncate(self, counts: pd.Series, errors: pd.Series, floor: int) -> None:
+        order = counts.sort_values(ascending=False, kind="mergesort")
+        kept = order.index[: self.capacity]
+        if len(order) > self.capacity:
+            floor = max(floor, int(order.iloc[self.capacity]))
+        self.counts = counts.loc[kept]
+        self.errors = errors.loc[kept]
+        self.floor = floor
+
+    def merge(self, other: "SpaceSaving") -> "SpaceSaving":
+        # A key missing from one side may still have up to that side's floor there, so it is
+        # counted at the floor and the floor is added to its error.
+        merged = SpaceSaving(self.capacity)
+        keys = self.counts.index.union(other.counts.index)
+        counts = self.counts.reindex(keys, fill_value=self.floor) + other.counts.reindex(keys, fill_value=other.floor)
+        errors = self.errors.reindex(keys, fill_value=self.floor) + other.errors.reindex(keys, fill_value=other.floor)
+        merged.total = self.total + other.total
+        merged._truncate(counts, errors, self.floor + other.floor)
+        return merged
+
+
+class HyperLogLog:
+    def __init__(self, precision: int = SKETCH_HLL_PRECISION) -> None:
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add(self, hashes: np.ndarray) -> None:
+        if not len(hashes):
+            return
+        width = 64 - self.precision
+        index = (hashes >> np.uint64(width)).astype(np.intp)
+        rank = width - _bit_length(hashes & np.uint64((1 << width) - 1)) + 1
+        best = pd.Series(rank.astype(np.uint8)).groupby(index).max()
+        positions = best.index.to_numpy()
+        self.registers[positions] = np.maximum(self.registers[positions], best.to_numpy())
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        merged = HyperLogLog(self.precision)
+        merged.registers = np.maximum(self.registers, other.registers)
+        return merged
+
+    def estimate(self) -> float:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / float(np.sum(np.exp2(-self.registers.astype(np.float64))))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            return m * float(np.log(m / zeros))
+        return raw
+
+    def relative_error(self) -> float:
+        return 1.04 / np.sqrt(len(self.registers))
+
+
+def empty_streaming_summary(capacity: int = SKETCH_CAPACITY) -> StreamingSummary:
+    return StreamingSummary(
+        rows=0,
+        changes=0,
+        export_count=0,
+        impersonation_count=0,
+        start=None,
+        end=None,
+        severity_counts={},
+        heavy_hitters={name: SpaceSaving(capacity) for name in SKETCH_DIMENSIONS},
+        frequencies={name: CountMinSketch() for name in SKETCH_DIMENSIONS},
+        distinct={name: HyperLogLog() for name in SKETCH_DISTINCT_COLUMNS},
+    )
+
+
+def streaming_summary_chunk(chunk: pd.DataFrame, row_offset: int, args: argparse.Namespace) -> StreamingSummary:
+    df = apply_filters(process_chunk(chunk, row_offset), args)
+    summary = empty_streaming_summary(args.sketch_capacity)
+    if df.empty:
+        return summary
+    changes = df[df["is_change_event"] == True]  # noqa: E712
+    summary.rows = len(df)
+    summary.changes = len(changes)
+    summary.export_count = int((df["category"] == "export").sum())
+    summary.impersonation_count = int(df["event_type"].str.contains("Impersonation", case=False, na=False).sum())
+    summary.start = df["event_timestamp_utc"].min()
+    summary.end = df["event_timestamp_utc"].max()
+    summary.severity_counts = {str(k): int(v) for k, v in df["severity"].value_counts().items()}
+    for name, column in SKETCH_DIMENSIONS.items():
+        counts = changes[column].dropna().astype(str).value_counts(sort=False)
+        summary.heavy_hitters[name] = SpaceSaving.from_counts(counts, args.sketch_capacity)
+        summary.frequencies[name].add(hash_values(counts.index.to_series()), counts.to_numpy())
+    for name, column in SKETCH_DISTINCT_COLUMNS.items():
+        values = (changes if name == "changed entities" else df)[column].dropna()
+        summary.distinct[name].add(hash_values(values))
+    return summary
+
+
+def merge_streaming_summaries(a: Optional[StreamingSummary], b: StreamingSummary) -> StreamingSummary:
+    if a is None:
+        return b
+    severity_counts = dict(a.severity_counts)
+    for key, value in b.severity_counts.items():
+        severity_counts[key] = severity_counts.get(key, 0) + value
+    return StreamingSummary(
+        rows=a.rows + b.rows,
+        changes=a.changes + b.changes,
+        export_count=a.export_count + b.export_count,
+        impersonation_count=a.impersonation_count + b.impersonation_count,
+        start=_merge_extreme(a.start, b.start, min),
+        end=_merge_extreme(a.end, b.end, max),
+        severity_counts=severity_counts,
+        heavy_hitters={k: a.heavy_hitters[k].merge(b.heavy_hitters[k]) for k in a.heavy_hitters},
+        frequencies={k: a.frequencies[k].merge(b.frequencies[k]) for k in a.frequencies},
+        distinct={k: a.distinct[k].merge(b.distinct[k]) for k in a.distinct},
+    )
+
+
+def iter_streaming_summaries(args: argparse.Namespace) -> Iterator[StreamingSummary]:
+    chunk_rows = args.chunk_rows or 200_000
+    reader = pd.read_csv(args.audit, dtype=str, chunksize=chunk_rows, low_memory=False)
+    if args.workers <= 1:
+        offset = 0
+        for chunk in reader:
+            yield streaming_summary_chunk(chunk, offset, args)
+            offset += len(chunk)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    # At most two chunks per worker are in flight, and results are consumed in submission
+    # order, so memory stays bounded and the merged sketches are deterministic.
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        pending: deque = deque()
+        offset = 0
+        for chunk in reader:
+            pending.append(pool.submit(streaming_summary_chunk, chunk, offset, args))
+            offset += len(chunk)
+            if len(pending) >= 2 * args.workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def heavy_hitter_table(summary: StreamingSummary) -> pd.DataFrame:
+    frames: List[pd.DataFrame] = []
+    for name, sketch in summary.heavy_hitters.items():
+        if sketch.counts.empty:
+            continue
+        keys = sketch.counts.index.to_series()
+        cm_upper = summary.frequencies[name].estimate(hash_values(keys))
+        frames.append(pd.DataFrame({
+            "dimension": name,
+            "key": keys.to_numpy(),
+            "count_estimate": np.minimum(sketch.counts.to_numpy(), cm_upper),
+            "count_lower": (sketch.counts - sketch.errors).to_numpy(),
+        }))
+    if not frames:
+        return pd.DataFrame(columns=["dimension", "key", "count_estimate", "count_lower"])
+    return pd.concat(frames, ignore_index=True)
+
+
+def render_streaming_report(summary: StreamingSummary, tz: str, top_n: int) -> List[str]:
+    hitters = heavy_hitter_table(summary)
+    distinct = {name: hll.estimate() for name, hll in summary.distinct.items()}
+    hll_error = next(iter(summary.distinct.values())).relative_error()
+
+    report_lines: List[str] = []
+    report_lines.append("# Pigment Audit Triage Report (streaming summary)")
+    report_lines.append("")
+    report_lines.append(
+        "_First-pass summary built from fixed-size sketches before dedupe and enrichment. Counts are over raw "
+        "filtered rows (duplicate event_ids included) and carry the error bounds listed below; no risk scores._"
+    )
+    report_lines.append("")
+    report_lines.append("## Executive Summary")
+    report_lines.append(
+        f"- Period analyzed: {format_dt_for_report(summary.start, tz)} to {format_dt_for_report(summary.end, tz)}; "
+        f"{summary.rows} rows (~{distinct['events']:.0f} distinct events), {summary.changes} change rows."
+    )
+    for name, label in [("application", "apps"), ("user", "users")]:
+        top = hitters[hitters["dimension"] == name].head(2)
+        if not top.empty:
+            report_lines.append(
+                f"- Most active {label}: "
+                + ", ".join([f"{row.key} (~{row.count_estimate})" for row in top.itertuples()])
+                + "."
+            )
+    report_lines.append(
+        f"- Sensitive activity: {summary.export_count} export rows, {summary.impersonation_count} impersonation rows."
+    )
+
+    report_lines.append("")
+    report_lines.append("## Overview")
+    for name, value in distinct.items():
+        report_lines.append(f"- Distinct {name}: ~{value:.0f}")
+    for severity in sorted(summary.severity_counts, key=lambda s: SEVERITY_RANK.get(s, -1), reverse=True):
+        report_lines.append(f"- {severity} rows: {summary.severity_counts[severity]}")
+
+    for name, title, column in [
+        ("application", "Changes by Application (approximate)", "application_name"),
+        ("user", "Changes by User (approximate)", "user_email"),
+    ]:
+        report_lines.append("")
+        report_lines.append(f"## {title}")
+        rows = hitters[hitters["dimension"] == name].head(top_n)
+        if rows.empty:
+            report_lines.append("- No change events found.")
+        for row in rows.itertuples():
+            report_lines.append(f"- {row.key}: changes~{row.count_estimate} (at least {row.count_lower})")
+
+    report_lines.append("")
+    report_lines.append("## Error Bounds")
+    for name, sketch in summary.heavy_hitters.items():
+        epsilon, confidence = summary.frequencies[name].error_bound()
+        report_lines.append(
+            f"- {name}: Space-Saving with {sketch.capacity} counters over {sketch.total} changes; each listed "
+            f"true count lies between its lower bound and its estimate, and any unlisted {name} has at most "
+            f"{sketch.floor} changes. Count-Min ({summary.frequencies[name].width}x"
+            f"{summary.frequencies[name].depth}) caps each estimate at the true count + {epsilon:.0f} "
+            f"with probability {confidence:.3f}."
+        )
+    report_lines.append(
+        f"- Distinct counts: HyperLogLog with {1 << SKETCH_HLL_PRECISION} registers, standard error "
+        f"{hll_error:.2%} (about 95% of estimates fall within {2 * hll_error:.2%})."
+    )
+    return report_lines
+
+
+def run_streaming_summary(args: argparse.Namespace) -> int:
+    logging.info("Streaming summary: sketching %s with %s worker(s)", args.audit, max(1, args.workers))
+    summary: Optional[StreamingSummary] = None
+    for partial in iter_streaming_summaries(args):
+        summary = merge_streaming_summaries(summary, partial)
+    summary = summary or empty_streaming_summary(args.sketch_capacity)
+    write_df(heavy_hitter_table(summary), args.out, "heavy_hitters", args.format)
+    write_report(render_streaming_report(summary, args.timezone, args.top), args.out)
+    logging.info("Done. Outputs written to %s", args.out)
+    return 0
+
+
+def path_signature(paths: Iterable[Optional[str]]) -> Tuple[Tuple[str, int, int], ...]:
+    entries: List[Tuple[str, int, int]] = []
+    for path in paths:
+        if not path or not os.path.exists(path):
+            continue
+        for fpath in metadata_files(path):
+            st = os.stat(fpath)
+            entries.append((fpath, st.st_mtime_ns, st.st_size))
+    return tuple(entries)
+
+
+def metadata_signature(args: argparse.Namespace) -> Tuple[Tuple[str, int, int], ...]:
+    return path_signature([args.metadata, args.metadata_before, args.metadata_after, *args.metadata_library])
+
+
+def refresh_watch_metadata(state: WatchState, args: argparse.Namespace) -> None:
+    signature = metadata_signature(args)
+    if signature == state.metadata_signature:
+        return
+    # The first poll loads whatever is configured (possibly nothing); only later changes are reloads.
+    if state.metadata_signature is not None:
+        logging.info("Metadata snapshot changed; reloading")
+    state.meta_ctx, state.diff_ctx = load_metadata_contexts(args)
+    state.metadata_signature = signature
+
+
+def find_ready_watch_files(state: WatchState, watch_dir: str) -> List[str]:
+    now = time.time()
+    ready: List[str] = []
+    for fname in sorted(os.listdir(watch_dir)):
+        if not fname.lower().endswith(".csv"):
+            continue
+        path = os.path.join(watch_dir, fname)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            continue
+        signature = (st.st_size, st.st_mtime_ns)
+        if state.seen_files.get(path) == signature:
+            continue
+        # Files still being written are picked up on a later poll.
+        if now - st.st_mtime < WATCH_SETTLE_SECONDS:
+            continue
+        ready.append(path)
+        state.seen_files[path] = signature
+    return ready
+
+
+def ingest_watch_batch(state: WatchState, paths: List[str], args: argparse.Namespace) -> int:
+    frames: List[pd.DataFrame] = []
+    for path in paths:
+        for chunk in pd.read_csv(path, dtype=str, chunksize=args.chunk_rows or 200_000, low_memory=False):
+            frames.append(process_chunk(chunk, state.row_offset))
+            state.row_offset += len(chunk)
+    if not frames:
+        return 0
+    df = dedupe_events(pd.concat(frames, ignore_index=True))
+    stamps = df["event_timestamp_utc"].fillna(MAX_SORT_TS).dt.as_unit("us").astype("int64")
+    ingested = df["event_id"].map(state.event_ids)
+    fresh = ingested.isna()
+    if not fresh.all():
+        # Rows already appended stay as they are, so a later copy cannot replace them (first seen wins);
+        # dedupe_events in a batch run keeps the latest copy instead.
+        newer = int((stamps[~fresh] > ingested[~fresh]).sum())
+        if newer:
+            logging.warning(
+                "%s re-emitted events are newer than their ingested copy; keeping the first copy "
+                "(a batch run over the same files keeps the newest)",
+                newer,
+            )
+        logging.info("Skipping %s events already ingested", int((~fresh).sum()))
+    df = df[fresh]
+    state.event_ids.update(zip(df["event_id"], stamps[fresh]))
+
+    df = apply_filters(df, args)
+    if df.empty:
+        return 0
+    df = enrich_with_metadata(df, state.meta_ctx, state.diff_ctx)
+    df = df.sort_values(by=["event_timestamp_utc", "event_id"], kind="mergesort")
+    changes = build_changes_timeline(df)
+
+    state.events_writer.write(df)
+    if not changes.empty:
+        state.changes_writer.write(changes)
+        state.session_inputs.append(change_session_inputs(changes))
+    state.summary_partial = merge_entity_summary_partials(state.summary_partial, entity_summary_partial(changes))
+    state.report_aggs = merge_report_aggregates(state.report_aggs, compute_report_aggregates(df, changes, args.top))
+    return len(df)
+
+
+def write_watch_outputs(state: WatchState, args: argparse.Namespace) -> None:
+    write_df(finalize_entity_summary(state.summary_partial), args.out, "entity_change_summary", args.format)
+    builder = ChangeSessionBuilder(args.session_gap)
+    if state.session_inputs:
+        inputs = pd.concat(state.session_inputs, ignore_index=True)
+        builder.add(inputs.sort_values(by=["ts", "event_id"], kind="mergesort", ignore_index=True))
+    aggs = state.report_aggs or empty_report_aggregates(args.top)
+    aggs.sessions = builder.finish()
+    write_df(aggs.sessions, args.out, "change_sessions", args.format)
+    write_report(render_report(aggs, args.timezone, args.top), args.out)
+
+
+def run_watch(args: argparse.Namespace, max_polls: Optional[int] = None) -> int:
+    if not os.path.isdir(args.watch):
+        logging.error("--watch expects a directory: %s", args.watch)
+        return 2
+    if args.format == "parquet":
+        logging.warning("Watch mode appends events_enriched/changes_timeline as CSV")
+    state = WatchState(
+        meta_ctx=None,
+        diff_ctx=None,
+        metadata_signature=None,
+        seen_files={},
+        event_ids={},
+        row_offset=0,
+        report_aggs=None,
+        summary_partial=None,
+        session_inputs=[],
+        events_writer=TableStreamWriter(args.out, "events_enriched", "csv"),
+        changes_writer=TableStreamWriter(args.out, "changes_timeline", "csv"),
+    )
+    logging.info("Watching %s every %ss", args.watch, args.watch_interval)
+    polls = 0
+    try:
+        while True:
+            refresh_watch_metadata(state, args)
+            ready = find_ready_watch_files(state, args.watch)
+            if ready:
+                started = time.monotonic()
+                rows = ingest_watch_batch(state, ready, args)
+                write_watch_outputs(state, args)
+                logging.info(
+                    "Ingested %s file(s), %s new events in %.2fs (%s events tracked)",
+                    len(ready),
+                    rows,
+                    time.monotonic() - started,
+                    len(state.event_ids),
+                )
+            polls += 1
+            if max_polls is not None and polls >= max_polls:
+                break
+            time.sleep(args.watch_interval)
+    except KeyboardInterrupt:
+        logging.info("Stopping watch")
+    finally:
+        state.events_writer.close()
+        state.changes_writer.close()
+    return 0
+
+
+def build_event_query_index(df: pd.DataFrame) -> EventQueryIndex:
+    df = df.reset_index(drop=True)
+    sort_ts = df["event_timestamp_utc"].fillna(MAX_SORT_TS)
+    by_time = sort_ts.sort_values(kind="mergesort")
+    by_key: Dict[str, Tuple[pd.Series, pd.Series, pd.Index]] = {}
+    for column in EVENT_QUERY_KEYS:
+        keys = df[column].fillna("").astype(str) if column in df.columns else pd.Series([""] * len(df))
+        order = pd.DataFrame({"key": keys, "ts": sort_ts}).sort_values(by=["key", "ts"], kind="mergesort")
+        by_key[column] = (
+            order["key"].reset_index(drop=True),
+            order["ts"].reset_index(drop=True),
+            order.index,
+        )
+    return EventQueryIndex(
+        events=df,
+        times=by_time.reset_index(drop=True),
+        time_positions=by_time.index,
+        by_key=by_key,
+    )
+
+
+def query_events(
+    index: EventQueryIndex,
+    filters: Dict[str, str],
+    since: Optional[pd.Timestamp],
+    until: Optional[pd.Timestamp],
+) -> pd.DataFrame:
+    # Events without a timestamp sort at MAX_SORT_TS and are only returned by unbounded queries.
+    lo_ts = since if since is not None else MIN_SORT_TS
+    if until is not None:
+        hi_ts = until
+    else:
+        hi_ts = MAX_SORT_TS if since is None else MAX_SORT_TS - pd.Timedelta(microseconds=1)
+    # Use the index of the first filtered key in EVENT_QUERY_KEYS order, narrow by time inside that
+    # key, then filter the remaining rows on any other keys.
+    lead = next((k for k in EVENT_QUERY_KEYS if filters.get(k)), None)
+    if lead:
+        keys, times, positions = index.by_key[lead]
+        value = filters[lead]
+        start = int(keys.searchsorted(value, side="left"))
+        stop = int(keys.searchsorted(value, side="right"))
+        window = times.iloc[start:stop]
+        t_start = start + int(window.searchsorted(lo_ts, side="left"))
+        t_stop = start + int(window.searchsorted(hi_ts, side="right"))
+        rows = index.events.iloc[positions[t_start:t_stop]]
+    else:
+        t_start = int(index.times.searchsorted(lo_ts, side="left"))
+        t_stop = int(index.times.searchsorted(hi_ts, side="right"))
+        rows = index.events.iloc[index.time_positions[t_start:t_stop]]
+    for key in EVENT_QUERY_KEYS:
+        if key != lead and filters.get(key):
+            rows = rows[rows[key] == filters[key]]
+    return rows
+
+
+def entity_blast_radius(entity_id: str, meta: Optional[MetadataContext]) -> Dict[str, Any]:
+    if not meta:
+        return {"entity_id": entity_id, "metadata": None}
+    item = meta.index.get(entity_id)
+    info = {k: v for k, v in (item or {}).items() if k != "raw"}
+    return {
+        "entity_id": entity_id,
+        "metadata": info or None,
+        "dependency_extraction_method": meta.dependency_method.get(entity_id),
+        "direct_dependents_count": len(meta.reverse_deps.get(entity_id, [])),
+        "transitive_dependents_count": compute_transitive_dependents(entity_id, meta.reverse_deps),
+        "boards_using_count": meta.boards_using.get(entity_id),
+        "views_using_count": meta.views_using.get(entity_id),
+        "boards_impacted_transitive": transitive_usage(meta)[0].get(entity_id),
+        "views_impacted_transitive": transitive_usage(meta)[1].get(entity_id),
+    }
+
+
+def _parse_query_time(value: Optional[str]) -> Optional[pd.Timestamp]:
+    if not value:
+        return None
+    ts = pd.to_datetime(value, utc=True)
+    return None if pd.isna(ts) else ts
+
+
+def handle_query_request(
+    path: str,
+    index: EventQueryIndex,
+    meta: Optional[MetadataContext],
+    max_results: int,
+) -> Tuple[int, str]:
+    parsed = urllib.parse.urlsplit(path)
+    params = {k: v[-1] for k, v in urllib.parse.parse_qs(parsed.query).items()}
+    route = parsed.path.rstrip("/") or "/"
+    if route == "/health":
+        return 200, json.dumps({"status": "ok", "events": len(index.events)})
+    if route.startswith("/entities/"):
+        entity_id = urllib.parse.unquote(route[len("/entities/"):])
+        body = entity_blast_radius(entity_id, meta)
+        keys, _, _ = index.by_key["entity_id"]
+        body["event_count"] = int(keys.searchsorted(entity_id, side="right") - keys.searchsorted(entity_id, side="left"))
+        return 200, json.dumps(body, default=str)
+    if route != "/events":
+        return 404, json.dumps({"error": f"unknown route {parsed.path}"})
+    try:
+        since = _parse_query_time(params.get("since"))
+        until = _parse_query_time(params.get("until"))
+        if params.get("hours"):
+            since = pd.Timestamp.now(tz="UTC") - pd.Timedelta(hours=float(params["hours"]))
+        limit = int(params.get("limit", max_results))
+        if limit < 0:
+            raise ValueError(f"limit must be >= 0, got {limit}")
+    except (ValueError, TypeError) as exc:
+        return 400, json.dumps({"error": str(exc)})
+    limit = min(limit, max_results)
+    rows = query_events(index, params, since, until)
+    total = len(rows)
+    rows = rows.tail(limit).iloc[::-1] if params.get("order", "desc") == "desc" else rows.head(limit)
+    columns = [c for c in EVENT_QUERY_COLUMNS if c in rows.columns]
+    records = rows[columns].to_json(orient="records", date_format="iso")
+    return 200, f'{{"count": {total}, "returned": {len(rows)}, "events": {records}}}'
+
+
+async def _serve_connection(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    index: EventQueryIndex,
+    meta: Optional[MetadataContext],
+    max_results: int,
+) -> None:
+    try:
+        request_line = (await reader.readline()).decode("latin-1").strip()
+        while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+            pass
+        parts = request_line.split(" ")
+        if len(parts) < 2 or parts[0] != "GET":
+            status, body = 405, json.dumps({"error": "only GET is supported"})
+        else:
+            try:
+                status, body = handle_query_request(parts[1], index, meta, max_results)
+            except Exception as exc:  # keep serving after a bad query
+                logging.exception("Query failed: %s", request_line)
+                status, body = 500, json.dumps({"error": str(exc)})
+        payload = body.encode("utf-8")
+        reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}.get(status, "Error")
+        writer.write(
+            f"HTTP/1.1 {status} {reason}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            f"Connection: close\r\n\r\n".encode("latin-1")
+            + payload
+        )
+        await writer.drain()
+    finally:
+        writer.close()
+
+
+async def start_query_server(
+    index: EventQueryIndex,
+    meta: Optional[MetadataContext],
+    host: str,
+    port: int,
+    max_results: int = 500,
+) -> asyncio.AbstractServer:
+    return await asyncio.start_server(
+        lambda r, w: _serve_connection(r, w, index, meta, max_results),
+        host,
+        port,
+    )
+
+
+def load_enriched_events(
+    args: argparse.Namespace,
+    meta_ctx: Optional[MetadataContext],
+    diff_ctx: Optional[DiffContext],
+    payload_store: Optional[PayloadStore] = None,
+    rate_baselines: Optional[RateBaselines] = None,
+) -> pd.DataFrame:
+    df = read_audit_csv(args.audit, args.chunk_rows, payload_store)
+    if rate_baselines is not None:
+        # Baselines count every deduped event, whatever the run's filters keep.
+        rate_flags = update_rate_baselines(rate_baselines, daily_rate_counts(df))
+    df = apply_filters(df, args)
+    if rate_baselines is not None:
+        df = df.copy(deep=False)
+        df["rate_anomaly"] = rate_anomaly_column(df, rate_flags)
+    series_entries = discover_metadata_series(args)
+    if series_entries:
+        logging.info("Enriching against %s dated metadata snapshots", len(series_entries))
+        return enrich_with_metadata_series(df, load_metadata_series(series_entries, args.metadata_workers), diff_ctx)
+    return enrich_with_metadata(df, meta_ctx, diff_ctx)
+
+
+def sql_ident(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def sql_text(value: Any) -> Optional[str]:
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return None
+    return str(value)
+
+
+def duckdb_payload_field(path: List[str]) -> str:
+    # JSON scalars rendered as the pandas path stringifies the parsed values (true -> "True").
+    json_path = "$." + ".".join(path)
+    value = f"json_extract_string(__payload, '{json_path}')"
+    return (
+        f"CASE json_type(__payload, '{json_path}') WHEN 'NULL' THEN NULL "
+        f"WHEN 'BOOLEAN' THEN CASE {value} WHEN 'true' THEN 'True' ELSE 'False' END ELSE {value} END"
+    )
+
+
+def duckdb_scan_audit(con: Any, path: str) -> None:
+    import duckdb
+
+    scan = (
+        "CREATE TABLE audit_raw AS SELECT * FROM read_csv(?, header = true, all_varchar = true, nullstr = ?, "
+        "delim = ',', quote = '\"', escape = '\"'{})"
+    )
+    try:
+        con.execute(scan.format(""), [path, AUDIT_NA_VALUES])
+    except duckdb.Error:
+        # Short rows are padded with missing values as pandas does; DuckDB cannot do that in a parallel scan
+        # when quoted fields span lines.
+        logging.info("Audit CSV has short rows; rescanning it serially with null padding")
+        con.execute(scan.format(", null_padding = true, parallel = false"), [path, AUDIT_NA_VALUES])
+
+
+def duckdb_filter_sql(args: argparse.Namespace) -> Tuple[str, List[Any]]:
+    # apply_filters as a WHERE clause.
+    clauses: List[str] = []
+    params: List[Any] = []
+    if args.date_from:
+        clauses.append("__ts >= ?::TIMESTAMPTZ")
+        params.append(pd.to_datetime(args.date_from, utc=True).isoformat())
+    if args.date_to:
+        end = pd.to_datetime(args.date_to, utc=True) + pd.Timedelta(days=1) - pd.Timedelta(seconds=1)
+        clauses.append("__ts <= ?::TIMESTAMPTZ")
+        params.append(end.isoformat())
+    if args.app_id:
+        clauses.append("list_contains(?, application_id)")
+        params.append(list(args.app_id))
+    for column, patterns in (("application_name", args.app_name), ("user_email", args.user_email)):
+        if patterns:
+            clauses.append("(" + " OR ".join(f"regexp_matches({column}, ?, 'i')" for _ in patterns) + ")")
+            params.extend(patterns)
+    if args.event_type:
+        clauses.append("list_contains(?, event_type)")
+        params.append(list(args.event_type))
+    if not args.all_events:
+        allowed = ["change", "auth", "export"]
+        if args.include_access:
+            allowed.append("access")
+        clauses.append("list_contains(?, category)")
+        params.append(allowed)
+    return " AND ".join(f"coalesce({c}, false)" for c in clauses) or "true", params
+
+
+def load_duckdb_tables(
+    args: argparse.Namespace,
+    meta_ctx: Optional[MetadataContext],
+    diff_ctx: Optional[DiffContext],
+    payload_store: Optional[PayloadStore] = None,
+    rate_baselines: Optional[RateBaselines] = None,
+) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    # The pandas pipeline (read_audit_csv .. build_entity_summary) expressed as DuckDB SQL; returns the
+    # enriched events, the changes timeline and the entity summary exactly as the pandas engine builds them.
+    import duckdb
+
+    con = duckdb.connect()
+    con.execute("SET TimeZone = 'UTC'")
+    logging.info("Scanning audit CSV with DuckDB")
+    duckdb_scan_audit(con, args.audit)
+
+    raw_columns = [row[0] for row in con.execute("DESCRIBE audit_raw").fetchall()]
+    columns = raw_columns + [c for c in AUDIT_COLUMNS if c not in raw_columns]
+    inputs = []
+    for col in columns:
+        if col == "event_id":
+            inputs.append(
+                "CASE WHEN event_id IS NULL OR trim(event_id) = '' OR lower(event_id) = 'nan' "
+                "THEN 'missing:' || rowid ELSE event_id END AS event_id"
+            )
+        else:
+            inputs.append(sql_ident(col) if col in raw_columns else f"NULL::VARCHAR AS {sql_ident(col)}")
+    con.execute(f"CREATE VIEW audit_input AS SELECT {', '.join(inputs)}, rowid AS __row_num FROM audit_raw")
+    con.execute(
+        "CREATE VIEW audit_parsed AS SELECT *, try_cast(event_timestamp AS TIMESTAMPTZ) AS __ts, "
+        "CASE WHEN json_valid(payload_json) THEN payload_json::JSON END AS __payload, "
+        "coalesce(NOT regexp_matches(payload_json, '^\\s*$') AND NOT json_valid(payload_json), false) "
+        "AS payload_parse_error FROM audit_input"
+    )
+
+    # dedupe_events: the latest copy of an event wins, an undated copy over any dated one, the later row on
+    # ties. Large files follow read_audit_csv's chunked rule across chunks.
+    chunk_rows = audit_chunk_rows(args.audit, args.chunk_rows)
+    latest = "row_number() OVER (PARTITION BY event_id{} ORDER BY __ts DESC NULLS FIRST, __row_num DESC) = 1"
+    if chunk_rows:
+        con.execute(
+            "CREATE TABLE audit_events AS SELECT * EXCLUDE (__chunk_no) FROM ("
+            f"SELECT * FROM (SELECT *, __row_num // {int(chunk_rows)} AS __chunk_no FROM audit_parsed) "
+            f"QUALIFY {latest.format(', __chunk_no')}) "
+            "QUALIFY row_number() OVER (PARTITION BY event_id ORDER BY __ts DESC NULLS LAST, "
+            "CASE WHEN __ts IS NULL THEN __chunk_no ELSE -__chunk_no END DESC) = 1"
+        )
+    else:
+        con.execute(f"CREATE TABLE audit_events AS SELECT * FROM audit_parsed QUALIFY {latest.format('')}")
+
+    # Categories come from the same rules as the pandas path, evaluated once per distinct event type.
+    types = [row[0] for row in con.execute("SELECT DISTINCT event_type FROM audit_events").fetchall()]
+    con.register("event_types", pd.DataFrame({
+        "event_type": pd.Series(types, dtype=object),
+        "category": pd.Series([categorize_event(t) for t in types], dtype=object),
+        "is_change_event": pd.Series([is_change_event(t) for t in types], dtype=bool),
+        "severity": pd.Series([base_severity(t) for t in types], dtype=object),
+    }))
+    payload_fields = ", ".join(f"{duckdb_payload_field(path)} AS {col}" for col, path in PAYLOAD_FIELDS.items())
+    where, params = duckdb_filter_sql(args)
+    con.execute(
+        "CREATE TABLE audit_categorized AS WITH flattened AS ("
+        f"SELECT * EXCLUDE (__payload), {payload_fields}, "
+        "CASE WHEN regexp_matches(actor_type, '^\\s*\\+?0*1\\s*$') THEN 'user' "
+        "WHEN regexp_matches(actor_type, '^\\s*\\+?0*2\\s*$') THEN 'service' ELSE 'unknown' END AS actor_label "
+        "FROM audit_events), categorized AS ("
+        "SELECT f.*, coalesce(f.payload_entity_application_id, f.entity_application_id) AS application_id, "
+        "coalesce(f.payload_entity_application_name, f.entity_application_name) AS application_name, "
+        "t.category, t.is_change_event, t.severity "
+        "FROM flattened f JOIN event_types t ON f.event_type IS NOT DISTINCT FROM t.event_type::VARCHAR) "
+        "SELECT * FROM categorized"
+    )
+    if rate_baselines is not None:
+        # Daily counts come from SQL; the baselines themselves are updated and scored in Python.
+        day = "epoch_us(__ts) // 86400000000"
+        counts = con.execute(" UNION ALL ".join(
+            f"SELECT '{dimension}' AS dimension, {column} AS key, category, {day} AS day, count(*) AS count "
+            f"FROM audit_categorized WHERE {column} IS NOT NULL AND __ts IS NOT NULL GROUP BY ALL"
+            for dimension, column in RATE_DIMENSIONS.items()
+        )).df()
+        con.register("rate_flags", update_rate_baselines(rate_baselines, counts).astype({"day": "int64"}))
+        joins = " ".join(
+            f"LEFT JOIN rate_flags r{i} ON r{i}.dimension::VARCHAR = '{dimension}' AND r{i}.key::VARCHAR = c.{column} "
+            f"AND r{i}.category::VARCHAR = c.category AND r{i}.day = {day.replace('__ts', 'c.__ts')}"
+            for i, (dimension, column) in enumerate(RATE_DIMENSIONS.items())
+        )
+        texts = ", ".join(f"r{i}.rate_anomaly::VARCHAR" for i in range(len(RATE_DIMENSIONS)))
+        source = f"(SELECT c.*, nullif(concat_ws('; ', {texts}), '') AS rate_anomaly FROM audit_categorized c {joins})"
+    else:
+        source = "audit_categorized"
+    con.execute(f"CREATE TABLE events AS SELECT * FROM {source} WHERE {where}", params)
+
+    # Metadata is looked up once per distinct entity and joined back; risk and the summary read typed copies.
+    entity_ids = con.execute("SELECT DISTINCT entity_id FROM events").fetchall()
+    entity_ids = pd.Series([row[0] for row in entity_ids], dtype=object)
+    meta_columns = entity_metadata_columns(entity_ids, meta_ctx, diff_ctx)
+    entity_meta = pd.DataFrame({
+        "entity_id": entity_ids,
+        "__meta_pos": np.arange(len(entity_ids), dtype=np.int64),
+        "__meta_name": meta_columns["meta_name"].map(sql_text).astype(object),
+        "__meta_entity_type": meta_columns["meta_entity_type"].map(sql_text).astype(object),
+        "__data_type": meta_columns["meta_data_type"].map(safe_str).astype(object),
+        "__security_block": meta_columns["meta_is_security_block"].map(lambda v: v is True).astype(bool),
+    })
+    for col in METADATA_COUNT_COLUMNS:
+        entity_meta[col] = pd.to_numeric(meta_columns[col]).astype("Int64")
+    con.register("entity_meta", entity_meta)
+    # Columns holding only missing values register untyped, so the join casts them.
+    typed_meta = ", ".join(
+        [f"m.{col}::VARCHAR AS {col}" for col in ["__meta_name", "__meta_entity_type"]]
+        + [f"m.{col}::BIGINT AS {col}" for col in METADATA_COUNT_COLUMNS]
+    )
+    con.execute(
+        "CREATE TABLE enriched AS WITH joined AS ("
+        f"SELECT e.*, m.__meta_pos, m.__security_block, {typed_meta}, lower(coalesce(e.event_type, '')) AS __et, "
+        "coalesce(regexp_matches(lower(m.__data_type::VARCHAR), 'number|currency|percentage|rate|kpi'), false) "
+        "AS __fundamental, "
+        f"{'rate_anomaly IS NOT NULL' if rate_baselines is not None else 'false'} AS __rate_flag, "
+        "coalesce(m.direct_dependents_count, 0) AS __direct, "
+        "coalesce(m.transitive_dependents_count, 0) AS __transitive, "
+        "coalesce(m.boards_using_count, 0) AS __boards, coalesce(m.views_using_count, 0) AS __views, "
+        "coalesce(m.boards_impacted_transitive, 0) AS __boards_transitive, "
+        "coalesce(m.views_impacted_transitive, 0) AS __views_transitive "
+        "FROM events e JOIN entity_meta m ON e.entity_id IS NOT DISTINCT FROM m.entity_id::VARCHAR) "
+        f"SELECT *, row_number() OVER (ORDER BY __ts NULLS LAST, event_id) - 1 AS __pos, {DUCKDB_RISK_SQL} "
+        "FROM joined"
+    )
+
+    outputs = [sql_ident(c) for c in columns]
+    if payload_store is not None:
+        # Payload text goes from DuckDB straight into the store; the frame carries the hash in its place.
+        result = con.execute(
+            "SELECT DISTINCT sha256(payload_json), payload_json FROM enriched WHERE payload_json IS NOT NULL"
+        )
+        while True:
+            rows = result.fetchmany(PAYLOAD_FETCH_ROWS)
+            if not rows:
+                break
+            for key, text in rows:
+                payload_store.put(key, text.encode("utf-8"))
+        outputs[columns.index("payload_json")] = "sha256(payload_json) AS payload_hash"
+    derived = list(PAYLOAD_FIELDS) + [
+        "actor_label", "application_id", "application_name", "category", "is_change_event", "severity",
+    ] + (["rate_anomaly"] if rate_baselines is not None else [])
+    df = con.execute(
+        f"SELECT {', '.join(outputs)}, __row_num, "
+        "__ts AT TIME ZONE 'UTC' AS event_timestamp_utc, "
+        "strftime(__ts, '%Y-%m-%dT%H:%M:%S.%fZ') AS event_timestamp_iso, payload_parse_error, "
+        f"{', '.join(derived)}, __meta_pos, risk_score, risk_reasons FROM enriched ORDER BY __pos"
+    ).df()
+    df["event_timestamp_utc"] = df["event_timestamp_utc"].dt.tz_localize("UTC")
+    meta_rows = meta_columns.take(df.pop("__meta_pos").to_numpy()).set_index(df.index)
+    risk = df[["risk_score", "risk_reasons"]]
+    df = pd.concat([df.drop(columns=["risk_score", "risk_reasons"]), meta_rows, risk], axis=1)
+
+    # build_changes_timeline: the change events, already in time order.
+    change_pos = con.execute("SELECT __pos FROM enriched WHERE is_change_event ORDER BY __pos").fetchnumpy()["__pos"]
+    changes = df.iloc[change_pos]
+
+    summary = con.execute(duckdb_entity_summary_sql()).df()
+    con.close()
+    if summary.empty:
+        return df, changes, pd.DataFrame()
+    for col in ["first_seen", "last_seen"]:
+        summary[col] = summary[col].dt.tz_localize("UTC")
+    for col in METADATA_COUNT_COLUMNS:
+        # groupby max keeps the events column's dtype.
+        if df[col].dtype != object:
+            summary[col] = summary[col].astype(df[col].dtype)
+    return df, changes, summary
+
+
+def duckdb_entity_summary_sql() -> str:
+    # build_entity_summary over the enriched table; value counts break ties by first appearance.
+    keys = ", ".join(ENTITY_SUMMARY_KEYS)
+    ranks = " ".join(f"WHEN '{k}' THEN {v}" for k, v in SEVERITY_RANK.items())
+    severity_rank = f"CASE severity {ranks} ELSE 0 END"
+    counts = ", ".join(f"max({col}) AS {col}" for col in METADATA_COUNT_COLUMNS)
+
+    def first(col: str) -> str:
+        return f"first({col} ORDER BY __pos) FILTER (WHERE {col} IS NOT NULL)"
+
+    def value_counts(col: str) -> str:
+        return (
+            f"SELECT {keys}, '{col}' AS field, {col} AS value, count(*) AS n, min(__pos) AS first_pos "
+            f"FROM changes WHERE {col} IS NOT NULL GROUP BY ALL"
+        )
+
+    return f"""
+WITH changes AS (
+    SELECT
+        coalesce(application_id, 'unknown') AS application_id_norm,
+        coalesce(entity_type, __meta_entity_type, 'unknown') AS entity_type_norm,
+        coalesce(entity_id, 'unknown') AS entity_id_norm,
+        *
+    FROM enriched
+    WHERE is_change_event
+),
+ranked AS (
+    SELECT *, row_number() OVER (PARTITION BY {keys}, field ORDER BY n DESC, first_pos) AS rank
+    FROM ({value_counts('event_type')} UNION ALL {value_counts('user_email')})
+),
+joined_counts AS (
+    SELECT
+        {keys},
+        string_agg(value || '=' || n, ';' ORDER BY rank) FILTER (WHERE field = 'event_type') AS event_types,
+        string_agg(value || '=' || n, ';' ORDER BY rank) FILTER (WHERE field = 'user_email' AND rank <= 5) AS top_users
+    FROM ranked
+    GROUP BY ALL
+),
+grouped AS (
+    SELECT
+        {keys},
+        {first('application_name')} AS application_name,
+        {first('entity_name')} AS entity_name,
+        {first('__meta_name')} AS meta_name,
+        min(__ts) AT TIME ZONE 'UTC' AS first_seen,
+        max(__ts) AT TIME ZONE 'UTC' AS last_seen,
+        arg_max(severity, {severity_rank}) AS highest_severity,
+        max(risk_score) AS max_risk_score,
+        {counts}
+    FROM changes
+    GROUP BY ALL
+)
+SELECT
+    {keys}, application_name, entity_name, meta_name, first_seen, last_seen,
+    coalesce(event_types, '') AS event_types, coalesce(top_users, '') AS top_users,
+    highest_severity, max_risk_score, {', '.join(METADATA_COUNT_COLUMNS)}
+FROM grouped LEFT JOIN joined_counts USING ({keys})
+ORDER BY {keys}
+"""
+
+
+def serve_main(argv: List[str]) -> int:
+    args = parse_serve_args(argv)
+    setup_logging(args.verbose)
+    if not args.audit:
+        logging.error("serve requires --audit")
+        return 2
+    meta_ctx, diff_ctx = load_metadata_contexts(args)
+    df = load_enriched_events(args, meta_ctx, diff_ctx)
+    started = time.monotonic()
+    index = build_event_query_index(df)
+    logging.info("Indexed %s events in %.2fs", len(df), time.monotonic() - started)
+
+    async def serve_forever() -> None:
+        server = await start_query_server(index, meta_ctx, args.host, args.port, args.max_results)
+        bound = ", ".join(f"{sock.getsockname()[0]}:{sock.getsockname()[1]}" for sock in server.sockets)
+        logging.info("Serving audit queries on %s", bound)
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(serve_forever())
+    except KeyboardInterrupt:
+        logging.info("Stopping server")
+    return 0
+
+
+def parse_impact_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="pigment_audit_change_inspector.py impact",
+        description="Estimate the blast radius of editing a set of entities.",
+    )
+    parser.add_argument("entity_ids", nargs="*", help="Entity ids to assess")
+    parser.add_argument("--ids-file", help="File with one entity id per line")
+    parser.add_argument("--metadata", required=True, help="Path to metadata snapshot (file or directory)")
+    parser.add_argument("--depth", type=int, default=None, help="Limit transitive dependents to this many hops")
+    parser.add_argument(
+        "--metadata-workers",
+        type=int,
+        default=None,
+        help="Processes for parsing/normalizing metadata files (default: CPU count; 1 disables)",
+    )
+    parser.add_argument("--out", default="./out", help="Output directory")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv", help="Output format for tables")
+    parser.add_argument("--verbose", action="store_true", help="Verbose logging")
+    return parser.parse_args(argv)
+
+
+def read_id_file(path: str) -> List[str]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+def impact_main(argv: List[str]) -> int:
+    args = parse_impact_args(argv)
+    setup_logging(args.verbose)
+    entity_ids = list(args.entity_ids)
+    if args.ids_file:
+        entity_ids.extend(read_id_file(args.ids_file))
+    if not entity_ids:
+        logging.error("impact needs entity ids (arguments or --ids-file)")
+        return 2
+    meta = derive_metadata_context(load_metadata_index([args.metadata], args.metadata_workers))
+    started = time.monotonic()
+    impact = compute_impact(entity_ids, meta, args.depth)
+    logging.info("Computed impact for %s entities in %.2fs", len(impact), time.monotonic() - started)
+    unknown = int((~impact["known_in_metadata"]).sum())
+    if unknown:
+        logging.warning("%s entity ids were not found in the metadata snapshot", unknown)
+    path = write_df(impact, args.out, "impact", args.format)
+    logging.info("Impact written to %s", path)
+    return 0
+
+
+def parse_rehydrate_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="pigment_audit_change_inspector.py rehydrate",
+        description="Read payloads back from a --payload-store side table.",
+    )
+    parser.add_argument("hashes", nargs="*", help="Payload hashes to print")
+    parser.add_argument("--store", required=True, help="payload_store directory written by --payload-store")
+    parser.add_argument("--table", help="Output table with a payload_hash column to restore payload_json into")
+    parser.add_argument("--out", default="./out", help="Output directory for the restored --table")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv", help="Output format for tables")
+    parser.add_argument("--verbose", action="store_true", help="Verbose logging")
+    return parser.parse_args(argv)
+
+
+def rehydrate_main(argv: List[str]) -> int:
+    args = parse_rehydrate_args(argv)
+    setup_logging(args.verbose)
+    if not args.hashes and not args.table:
+        logging.error("rehydrate needs payload hashes or --table")
+        return 2
+    for payload in rehydrate_payloads(args.hashes, args.store):
+        print(payload)
+    if args.table:
+        name, ext = os.path.splitext(os.path.basename(args.table))
+        if ext == ".parquet":
+            df = pd.read_parquet(args.table)
+        else:
+            df = pd.read_csv(args.table, dtype=str, keep_default_na=False, na_values=[""])
+        if "payload_hash" not in df.columns:
+            logging.error("%s has no payload_hash column", args.table)
+            return 2
+        pos = list(df.columns).index("payload_hash")
+        df.insert(pos, "payload_json", rehydrate_payloads(df.pop("payload_hash"), args.store))
+        path = write_df(df, args.out, name, args.format)
+        logging.info("Restored payloads written to %s", path)
+    return 0
+
+
+class FetchError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(f"HTTP {status}: {message}")
+        self.status = status
+
+
+class AsyncHTTPConnectionPool:
+    def __init__(self, base_url: str, size: int, timeout: float, headers: Dict[str, str]) -> None:
+        parsed = urllib.parse.urlsplit(base_url)
+        self.scheme = parsed.scheme or "http"
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or (443 if self.scheme == "https" else 80)
+        self.prefix = parsed.path.rstrip("/")
+        self.timeout = timeout
+        self.headers = headers
+        self._slots: "asyncio.Queue[Optional[Tuple[asyncio.StreamReader, asyncio.StreamWriter]]]" = asyncio.Queue()
+        for _ in range(size):
+            self._slots.put_nowait(None)
+
+    async def _connect(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        ssl_ctx = ssl.create_default_context() if self.scheme == "https" else None
+        return await asyncio.wait_for(asyncio.open_connection(self.host, self.port, ssl=ssl_ctx), self.timeout)
+
+    async def _request(
+        self,
+        conn: Tuple[asyncio.StreamReader, asyncio.StreamWriter],
+        path: str,
+    ) -> Tuple[int, Dict[str, str], bytes, bool]:
+        reader, writer = conn
+        lines = [f"GET {self.prefix}{path} HTTP/1.1", f"Host: {self.host}", "Connection: keep-alive"]
+        lines.extend(f"{k}: {v}" for k, v in self.headers.items())
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        await writer.drain()
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError("connection closed by server")
+        status = int(status_line.split()[1])
+        headers: Dict[str, str] = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            key, _, value = line.partition(":")
+            headers[key.strip().lower()] = value.strip()
+        keep_alive = headers.get("connection", "").lower() != "close"
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            parts: List[bytes] = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0].strip() or b"0", 16)
+                if size == 0:
+                    await reader.readline()
+                    break
+                parts.append(await reader.readexactly(size))
+                await reader.readline()
+            body = b"".join(parts)
+        elif "content-length" in headers:
+            body = await reader.readexactly(int(headers["content-length"]))
+        else:
+            body = await reader.read()
+            keep_alive = False
+        return status, headers, body, keep_alive
+
+    async def get(self, path: str) -> Tuple[int, Dict[str, str], bytes]:
+        conn = await self._slots.get()
+        try:
+            if conn is None:
+                conn = await self._connect()
+            status, headers, body, keep_alive = await asyncio.wait_for(self._request(conn, path), self.timeout)
+            if not keep_alive:
+                conn[1].close()
+                conn = None
+            return status, headers, body
+        except BaseException:
+            if conn is not None:
+                conn[1].close()
+                conn = None
+            raise
+        finally:
+            self._slots.put_nowait(conn)
+
+    async def close(self) -> None:
+        while not self._slots.empty():
+            conn = self._slots.get_nowait()
+            if conn is not None:
+                conn[1].close()
+
+
+class FormulaCache:
+    def __init__(self, cache_dir: Optional[str]) -> None:
+        self.cache_dir = cache_dir
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir or "", hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, key: str) -> Any:
+        if not self.cache_dir:
+            return None
+        try:
+            return load_json_file(self._path(key))
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, value: Any) -> None:
+        if self.cache_dir:
+            write_text_atomic(self._path(key), json.dumps(value))
+
+
+async def fetch_json_with_retries(
+    pool: AsyncHTTPConnectionPool,
+    path: str,
+    retries: int,
+    backoff: float,
+) -> Any:
+    for attempt in range(retries + 1):
+        retry_after: Optional[float] = None
+        try:
+            status, headers, body = await pool.get(path)
+        except (OSError, ConnectionError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as exc:
+            if attempt == retries:
+                raise
+            logging.debug("Request %s failed (%s); retrying", path, exc)
+        else:
+            if status == 200:
+                return json.loads(body) if body.strip() else None
+            if status not in FETCH_RETRYABLE_STATUS or attempt == retries:
+                raise FetchError(status, body[:200].decode("utf-8", "replace"))
+            if headers.get("retry-after", "").isdigit():
+                retry_after = float(headers["retry-after"])
+        delay = retry_after if retry_after is not None else backoff * (2 ** attempt) * (0.5 + random.random())
+        await asyncio.sleep(delay)
+    return None
+
+
+def collect_audit_entities(path: str, chunk_rows: int = 200_000) -> pd.DataFrame:
+    wanted = {"entity_id", "entity_name", "entity_type", "entity_application_id", "entity_application_name", "event_timestamp"}
+    frames: List[pd.DataFrame] = []
+    for chunk in pd.read_csv(path, dtype=str, usecols=lambda c: c in wanted, chunksize=chunk_rows, low_memory=False):
+        for col in wanted:
+            if col not in chunk.columns:
+                chunk[col] = None
+        chunk = chunk[chunk["entity_id"].notna() & (chunk["entity_id"].str.strip() != "")]
+        chunk["event_timestamp_utc"] = parse_timestamp_series(chunk["event_timestamp"])
+        frames.append(chunk.sort_values(by="event_timestamp_utc", kind="mergesort").drop_duplicates("entity_id", keep="last"))
+    if not frames:
+        return pd.DataFrame(columns=sorted(wanted) + ["event_timestamp_utc"])
+    entities = pd.concat(frames, ignore_index=True).sort_values(by="event_timestamp_utc", kind="mergesort")
+    return entities.drop_duplicates("entity_id", keep="last").reset_index(drop=True)
+
+
+async def fetch_formula_metadata(
+    entities: pd.DataFrame,
+    args: argparse.Namespace,
+    token: str,
+) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    pool = AsyncHTTPConnectionPool(
+        args.base_url,
+        size=args.concurrency,
+        timeout=args.timeout,
+        headers={"Authorization": f"Bearer {token}", "Accept": "application/json"},
+    )
+    cache = FormulaCache(args.cache_dir)
+    stats = {"fetched": 0, "cached": 0, "failed": 0}
+    org_q = urllib.parse.quote(args.org_id)
+
+    async def cached_fetch(kind: str, entity_id: str, version: str, path: str) -> Any:
+        key = f"{kind}|{args.org_id}|{entity_id}|{version}"
+        hit = cache.get(key)
+        if hit is not None:
+            stats["cached"] += 1
+            return hit["response"]
+        response = await fetch_json_with_retries(pool, path, args.retries, args.backoff)
+        cache.put(key, {"response": response})
+        stats["fetched"] += 1
+        return response
+
+    async def resolve(row: Any) -> Dict[str, Any]:
+        entity_id = str(row.entity_id)
+        ts = row.event_timestamp_utc
+        version = ts.isoformat() if not pd.isna(ts) else "unknown"
+        item: Dict[str, Any] = {
+            "id": entity_id,
+            "name": safe_str(row.entity_name),
+            "entityType": safe_str(row.entity_type),
+            "applicationId": safe_str(row.entity_application_id),
+            "applicationName": safe_str(row.entity_application_name),
+        }
+        id_q = urllib.parse.quote(entity_id)
+        try:
+            audits = await cached_fetch(
+                "formulas",
+                entity_id,
+                version,
+                f"/api/workspace/internals/formula/FindFormulasBySearchId?organizationId={org_q}&searchId={id_q}",
+            )
+            raw = [a.get("rawFormula") for a in (audits or []) if isinstance(a, dict) and a.get("rawFormula")]
+            if raw:
+                item["formula"] = "\n".join(dict.fromkeys(raw))
+            if args.with_groups and item["applicationId"]:
+                app_q = urllib.parse.quote(item["applicationId"])
+                item["formulaGroups"] = await cached_fetch(
+                    "groups", entity_id, version, f"/api/workspace/{app_q}/metric/GetFormulaGroups/{id_q}"
+                )
+        except Exception as exc:
+            stats["failed"] += 1
+            logging.debug("Failed to resolve %s: %s", entity_id, exc)
+        return item
+
+    try:
+        items = await asyncio.gather(*(resolve(row) for row in entities.itertuples(index=False)))
+    finally:
+        await pool.close()
+    return list(items), stats
+
+
+def parse_fetch_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="pigment_audit_change_inspector.py fetch-metadata",
+        description="Fetch formulas for entities seen in an audit log into a metadata snapshot.",
+    )
+    parser.add_argument("--audit", required=True, help="Path to audit CSV export")
+    parser.add_argument("--org-id", required=True, help="Organization id used by the formula endpoints")
+    parser.add_argument("--base-url", default="https://staging.pigment.app", help="Workspace base URL")
+    parser.add_argument("--token-env", default="TOKEN", help="Environment variable holding the bearer token")
+    parser.add_argument("--out", default="./metadata/metrics.json", help="Output metadata collection file")
+    parser.add_argument("--cache-dir", default="./.formula_cache", help="On-disk response cache ('' disables)")
+    parser.add_argument("--concurrency", type=int, default=32, help="Maximum concurrent requests / pooled connections")
+    parser.add_argument("--retries", type=int, default=4, help="Retries for transient failures")
+    parser.add_argument("--backoff", type=float, default=0.5, help="Base backoff in seconds")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument("--with-groups", action="store_true", help="Also fetch formula groups per metric")
+    parser.add_argument("--verbose", action="store_true", help="Verbose logging")
+    return parser.parse_args(argv)
+
+
+def fetch_metadata_main(argv: List[str]) -> int:
+    args = parse_fetch_args(argv)
+    setup_logging(args.verbose)
+    token = os.environ.get(args.token_env)
+    if not token:
+        logging.error("Bearer token missing: set %s", args.token_env)
+        return 2
+    entities = collect_audit_entities(args.audit)
+    logging.info("Resolving formulas for %s entities", len(entities))
+    started = time.monotonic()
+    items, stats = asyncio.run(fetch_formula_metadata(entities, args, token))
+    logging.info(
+        "Resolved %s entities in %.1fs (%s fetched, %s cached, %s failed)",
+        len(items),
+        time.monotonic() - started,
+        stats["fetched"],
+        stats["cached"],
+        stats["failed"],
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    write_text_atomic(args.out, json.dumps({"metrics": items}, indent=2))
+    logging.info("Metadata written to %s", args.out)
+    return 0
+
+
+def parse_batch_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="pigment_audit_change_inspector.py batch",
+        description="Run the inspector for every organization in a manifest over one worker pool.",
+    )
+    parser.add_argument("--manifest", required=True, help="JSON manifest of organizations")
+    parser.add_argument("--out", default="./out", help="Directory for batch_summary and default org outputs")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument(
+        "--memory-budget",
+        type=parse_memory_limit,
+        default=None,
+        help="Only start an organization while the estimated memory of running ones fits (e.g. 16G)",
+    )
+    parser.add_argument("--verbose", action="store_true", help="Verbose logging")
+    return parser.parse_args(argv)
+
+
+def load_batch_manifest(path: str, out_dir: str) -> List[Dict[str, Any]]:
+    # Unknown keys and empty org lists are errors, so a typo cannot turn a nightly batch into a no-op.
+    data = load_json_file(path)
+    defaults: Dict[str, Any] = {}
+    entries = data
+    if isinstance(data, dict):
+        unknown = sorted(set(data) - BATCH_MANIFEST_KEYS)
+        if unknown:
+            raise ValueError(f"unknown manifest keys {unknown} (expected {sorted(BATCH_MANIFEST_KEYS)})")
+        defaults = data.get("defaults") or {}
+        entries = data.get("orgs")
+    if not isinstance(entries, list) or not entries:
+        raise ValueError("manifest lists no organizations (expected a non-empty list or an 'orgs' list)")
+    for where, entry in [("defaults", defaults), *((f"entry {i + 1}", e) for i, e in enumerate(entries))]:
+        if not isinstance(entry, dict):
+            raise ValueError(f"manifest {where} is not an object")
+        unknown = sorted(set(entry) - BATCH_ENTRY_KEYS)
+        if unknown:
+            raise ValueError(f"unknown keys {unknown} in manifest {where}")
+    base_dir = os.path.dirname(os.path.abspath(path))
+
+    def resolve(value: Optional[str]) -> Optional[str]:
+        return os.path.join(base_dir, value) if value else None
+
+    orgs: List[Dict[str, Any]] = []
+    for i, entry in enumerate(entries):
+        merged = {**defaults, **entry}
+        name = str(merged.get("name") or f"org{i + 1}")
+        library = merged.get("library") or []
+        audit = resolve(merged.get("audit"))
+        if not audit:
+            raise ValueError(f"Manifest entry {name!r} has no audit path")
+        orgs.append({
+            "position": i,
+            "name": name,
+            "audit": audit,
+            "metadata": resolve(merged.get("metadata")),
+            "metadata_before": resolve(merged.get("metadata_before")),
+            "metadata_after": resolve(merged.get("metadata_after")),
+            "library": [resolve(p) for p in ([library] if isinstance(library, str) else library)],
+            "out": resolve(entry.get("out")) or os.path.join(out_dir, name),
+            "args": [*defaults.get("args", []), *entry.get("args", [])],
+            "estimated_bytes": os.path.getsize(audit) * BATCH_MEMORY_FACTOR if os.path.exists(audit) else 0,
+        })
+    return orgs
+
+
+def batch_org_argv(org: Dict[str, Any], metadata_workers: Optional[int] = None) -> List[str]:
+    argv = ["--audit", org["audit"], "--out", org["out"]]
+    if metadata_workers:
+        argv += ["--metadata-workers", str(metadata_workers)]
+    for key in ["metadata", "metadata_before", "metadata_after"]:
+        if org[key]:
+            argv += [f"--{key.replace('_', '-')}", org[key]]
+    for path in org["library"]:
+        argv += ["--metadata-library", path]
+    return argv + org["args"]
+
+
+def batch_result(
+    org: Dict[str, Any],
+    exit_code: int,
+    error: str,
+    wall_seconds: Optional[float],
+    cpu_seconds: Optional[float],
+) -> Dict[str, Any]:
+    return {
+        "name": org["name"],
+        "status": "ok" if exit_code == 0 else "failed",
+        "exit_code": exit_code,
+        "wall_seconds": wall_seconds,
+        "cpu_seconds": cpu_seconds,
+        "audit": org["audit"],
+        "out": org["out"],
+        "error": error,
+    }
+
+
+def run_batch_org(org: Dict[str, Any], metadata_workers: Optional[int] = None) -> Dict[str, Any]:
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+    error = ""
+    try:
+        exit_code = run_inspection(parse_args(batch_org_argv(org, metadata_workers)))
+    except SystemExit as exc:
+        exit_code = exc.code if isinstance(exc.code, int) else 2
+        error = "invalid arguments"
+    except Exception as exc:
+        logging.exception("Organization %s failed", org["name"])
+        exit_code = 1
+        error = f"{type(exc).__name__}: {exc}"
+    wall_seconds = round(time.perf_counter() - started, 3)
+    return batch_result(org, exit_code, error, wall_seconds, round(time.process_time() - cpu_started, 3))
+
+
+def next_batch_org(queue: deque, in_flight: int, budget: Optional[int], idle: bool) -> Optional[Dict[str, Any]]:
+    # Largest estimate first (queue is pre-sorted); an idle pool always takes the head so an
+    # organization larger than the whole budget still runs, alone.
+    for i, org in enumerate(queue):
+        if idle or budget is None or in_flight + org["estimated_bytes"] <= budget:
+            del queue[i]
+            return org
+    return None
+
+
+def run_batch(orgs: List[Dict[str, Any]], workers: int, budget: Optional[int]) -> List[Dict[str, Any]]:
+    queue = deque(sorted(orgs, key=lambda org: org["estimated_bytes"], reverse=True))
+    # Build library contexts shared by several organizations once, before the pool forks, so
+    # every worker starts with them in its cache.
+    library_users: Dict[Tuple[str, ...], int] = {}
+    for org in orgs:
+        if org["library"]:
+            key = tuple(org["library"])
+            library_users[key] = library_users.get(key, 0) + 1
+    for paths, users in library_users.items():
+        if users > 1:
+            load_library_context(list(paths))
+
+    results: Dict[int, Dict[str, Any]] = {}
+    if workers <= 1:
+        for org in queue:
+            results[org["position"]] = run_batch_org(org)
+        return [results[i] for i in sorted(results)]
+
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=fork_context()) as pool:
+        pending: Dict[Any, Dict[str, Any]] = {}
+        in_flight = 0
+        while queue or pending:
+            while queue and len(pending) < workers:
+                org = next_batch_org(queue, in_flight, budget, idle=not pending)
+                if org is None:
+                    break
+                # Organizations already run in parallel, so each loads its metadata on one core.
+                pending[pool.submit(run_batch_org, org, 1)] = org
+                in_flight += org["estimated_bytes"]
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                org = pending.pop(future)
+                in_flight -= org["estimated_bytes"]
+                try:
+                    results[org["position"]] = future.result()
+                except Exception as exc:
+                    logging.error("Worker for %s died: %s", org["name"], exc)
+                    results[org["position"]] = batch_result(org, 1, repr(exc), None, None)
+    return [results[i] for i in sorted(results)]
+
+
+def batch_main(argv: List[str]) -> int:
+    args = parse_batch_args(argv)
+    setup_logging(args.verbose)
+    try:
+        orgs = load_batch_manifest(args.manifest, args.out)
+    except (OSError, ValueError) as exc:
+        logging.error("Cannot read manifest %s: %s", args.manifest, exc)
+        return 2
+    workers = max(1, min(args.workers or os.cpu_count() or 1, len(orgs)))
+    logging.info("Batch: %s organizations over %s worker(s)", len(orgs), workers)
+    started = time.perf_counter()
+    results = run_batch(orgs, workers, args.memory_budget)
+    wall = time.perf_counter() - started
+
+    summary = pd.DataFrame(results, columns=BATCH_SUMMARY_COLUMNS)
+    write_df(summary, args.out, "batch_summary", "csv")
+    cpu = summary["cpu_seconds"].sum()
+    failed = int((summary["status"] != "ok").sum())
+    logging.info(
+        "Batch done in %.1fs wall, %.1fs worker CPU (%.0f%% of %s workers); %s ok, %s failed",
+        wall,
+        cpu,
+        100 * cpu / (wall * workers) if wall else 0,
+        workers,
+        len(summary) - failed,
+        failed,
+    )
+    return 1 if failed else 0
+
+
 def run_smoke_test() -> int:
     logging.info("Running smoke test")
     sample_events = pd.DataFrame([
@@ -1069,43 +5119,148 @@ def run_smoke_test() -> int:
     return 0
 
 
-def main(argv: Optional[List[str]] = None) -> int:
-    args = parse_args(argv)
-    setup_logging(args.verbose)
+def load_library_context(paths: List[str], workers: Optional[int] = None) -> Optional[MetadataContext]:
+    if not paths:
+        return None
+    signature = path_signature(paths)
+    ctx = LIBRARY_CONTEXT_CACHE.get(signature)
+    if ctx is None:
+        ctx = derive_metadata_context(load_metadata_index(paths, workers))
+        LIBRARY_CONTEXT_CACHE[signature] = ctx
+        logging.info("Built library metadata context from %s (%s entities)", ", ".join(paths), len(ctx.index))
+    return ctx
 
-    if args.smoke_test:
-        return run_smoke_test()
 
-    if not args.audit:
-        logging.error("--audit is required unless --smoke-test is used")
-        return 2
+def layer_metadata_context(base: Optional[MetadataContext], index: Dict[str, Dict[str, Any]]) -> MetadataContext:
+    # Organization entities are applied as a delta on top of the shared library context, so only
+    # what they touch is re-derived and the cached library context is never mutated.
+    if base is None:
+        return derive_metadata_context(index)
+    return apply_metadata_delta(base, MetadataDelta(upserts=index, removed=[]))
 
-    df = read_audit_csv(args.audit, args.chunk_rows)
-    df = apply_filters(df, args)
 
+def load_metadata_contexts(args: argparse.Namespace) -> Tuple[Optional[MetadataContext], Optional[DiffContext]]:
+    base = load_library_context(args.metadata_library, args.metadata_workers)
     meta_ctx = None
     diff_ctx = None
     if args.metadata:
-        collections = load_metadata(args.metadata)
-        meta_ctx = build_metadata_context(collections)
+        meta_ctx = layer_metadata_context(base, load_metadata_index([args.metadata], args.metadata_workers))
     if args.metadata_before and args.metadata_after:
-        before = build_metadata_context(load_metadata(args.metadata_before))
-        after = build_metadata_context(load_metadata(args.metadata_after))
-        diff_ctx = build_diff_context(before, after)
+        before = layer_metadata_context(base, load_metadata_index([args.metadata_before], args.metadata_workers))
+        after_index = load_metadata_index([args.metadata_after], args.metadata_workers)
+        if base is not None:
+            after_index = {**base.index, **after_index}
+        delta, _ = compute_metadata_delta(metadata_fingerprints(before.index), after_index)
+        logging.info("Metadata delta: %s changed/added, %s removed entities", len(delta.upserts), len(delta.removed))
+        after = apply_metadata_delta(before, delta)
+        diff_ctx = build_diff_context(before, after, [*delta.upserts, *delta.removed])
         if not meta_ctx:
             meta_ctx = after
+    return meta_ctx or base, diff_ctx
 
-    df = enrich_with_metadata(df, meta_ctx, diff_ctx)
 
-    changes = build_changes_timeline(df)
-    summary = build_entity_summary(df)
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    commands = {
+        "serve": serve_main,
+        "impact": impact_main,
+        "fetch-metadata": fetch_metadata_main,
+        "quick": quick_main,
+        "batch": batch_main,
+        "rehydrate": rehydrate_main,
+    }
+    if argv and argv[0] in commands:
+        return commands[argv[0]](argv[1:])
 
-    df = df.sort_values(by=["event_timestamp_utc", "event_id"], kind="mergesort")
+    args = parse_args(argv)
+    setup_logging(args.verbose)
+
+    if args.smoke_test:
+        return run_smoke_test()
+    return run_inspection(args)
+
+
+def run_inspection(args: argparse.Namespace) -> int:
+    if args.html_shards and (args.watch or args.streaming_summary):
+        logging.error("--html-shards is not supported with --watch or --streaming-summary")
+        return 2
+
+    if args.engine == "duckdb" and (
+        args.watch or args.memory_limit or args.streaming_summary or args.metadata_series or args.metadata_at
+    ):
+        logging.error(
+            "--engine duckdb is not supported with --watch, --memory-limit, --streaming-summary "
+            "or --metadata-series/--metadata-at"
+        )
+        return 2
+
+    if args.payload_store and (args.watch or args.streaming_summary):
+        logging.error("--payload-store is not supported with --watch or --streaming-summary")
+        return 2
+
+    if args.rate_baselines and (args.watch or args.memory_limit or args.streaming_summary):
+        logging.error("--rate-baselines is not supported with --watch, --memory-limit or --streaming-summary")
+        return 2
+
+    if args.streaming_summary:
+        if args.watch or args.memory_limit:
+            logging.error("--streaming-summary is not supported with --watch or --memory-limit")
+            return 2
+        if not args.audit:
+            logging.error("--audit is required for --streaming-summary")
+            return 2
+        return run_streaming_summary(args)
+
+    if (args.watch or args.memory_limit) and (args.metadata_series or args.metadata_at):
+        logging.error("--metadata-series/--metadata-at are not supported with --watch or --memory-limit")
+        return 2
+
+    if args.metadata_library and (args.metadata_series or args.metadata_at):
+        logging.error("--metadata-library is not supported with --metadata-series/--metadata-at")
+        return 2
+
+    if args.watch:
+        return run_watch(args)
+
+    if not args.audit:
+        logging.error("--audit is required unless --smoke-test or --watch is used")
+        return 2
+
+    meta_ctx, diff_ctx = load_metadata_contexts(args)
+
+    payload_store = PayloadStore(args.payload_dictionary) if args.payload_store else None
+    rate_baselines = load_rate_baselines(args.rate_baselines) if args.rate_baselines else None
+    if args.memory_limit:
+        return run_out_of_core(args, meta_ctx, diff_ctx, payload_store)
+
+    if args.engine == "duckdb":
+        try:
+            import duckdb  # noqa: F401
+        except Exception:
+            logging.warning("duckdb not available; falling back to the pandas engine")
+            args.engine = "pandas"
+
+    if args.engine == "duckdb":
+        df, changes, summary = load_duckdb_tables(args, meta_ctx, diff_ctx, payload_store, rate_baselines)
+    else:
+        df = load_enriched_events(args, meta_ctx, diff_ctx, payload_store, rate_baselines)
+        changes = build_changes_timeline(df)
+        summary = build_entity_summary(df)
+        df = df.sort_values(by=["event_timestamp_utc", "event_id"], kind="mergesort")
+    sessions = build_change_sessions(changes, args.session_gap)
 
     write_df(df, args.out, "events_enriched", args.format)
     write_df(changes, args.out, "changes_timeline", args.format)
     write_df(summary, args.out, "entity_change_summary", args.format)
-    build_report(df, changes, args.out, args.timezone, args.top)
+    write_df(sessions, args.out, "change_sessions", args.format)
+    if payload_store is not None:
+        payload_store.reference(df["payload_hash"])
+        payload_store.write(args.out)
+    if rate_baselines is not None:
+        save_rate_baselines(args.rate_baselines, rate_baselines)
+    build_report(
+        df, changes, args.out, args.timezone, args.top, sessions, args.shard_rows if args.html_shards else None
+    )
 
     logging.info("Done. Outputs written to %s", args.out)
     return 0
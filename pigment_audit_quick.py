@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Pandas-free quick triage scan for Pigment audit CSV exports.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+SEVERITY_RANK = {"LOW": 0, "MEDIUM": 1, "HIGH": 2, "CRITICAL": 3}
+QUICK_COLUMNS = [
+    "event_timestamp",
+    "event_type",
+    "user_email",
+    "entity_type",
+    "entity_name",
+    "entity_application_name",
+]
+QUICK_READ_BUFFER = 1 << 20
+UTC_SUFFIXES = ("Z", " UTC", "+00:00")
+
+
+def categorize_event(event_type: Optional[str]) -> str:
+    if not event_type:
+        return "other"
+    t = event_type.lower()
+    if "accessed" in t:
+        return "access"
+    if "login" in t or "impersonation" in t:
+        return "auth"
+    if "export" in t:
+        return "export"
+    if any(k in t for k in ["created", "updated", "deleted", "datachanged", "security", "permission", "accessright", "formula", "role", "rights"]):
+        return "change"
+    return "other"
+
+
+def is_change_event(event_type: Optional[str]) -> bool:
+    if not event_type:
+        return False
+    t = event_type.lower()
+    return any(k in t for k in ["created", "updated", "deleted", "datachanged", "security", "permission", "accessright", "formula", "role", "rights"])
+
+
+def base_severity(event_type: Optional[str]) -> str:
+    if not event_type:
+        return "LOW"
+    t = event_type.lower()
+    if any(k in t for k in ["impersonation", "permission", "accessright", "security", "deleted"]):
+        return "CRITICAL"
+    if any(k in t for k in ["metricupdated", "metriccreated", "metricdeleted", "dimensionupdated", "dimensioncreated", "dimensiondeleted", "formula", "boardupdated", "boardcreated", "viewupdated", "viewcreated", "tableupdated", "tablecreated"]):
+        return "HIGH"
+    if any(k in t for k in ["datachanged", "export"]):
+        return "MEDIUM"
+    if "accessed" in t or "login" in t:
+        return "LOW"
+    if is_change_event(event_type):
+        return "MEDIUM"
+    return "LOW"
+
+
+def parse_quick_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="pigment_audit_change_inspector.py quick",
+        description="Stream an audit CSV without pandas and list high-severity events.",
+    )
+    parser.add_argument("--audit", required=True, help="Path to audit CSV export")
+    parser.add_argument("--from", dest="date_from", help="Start date YYYY-MM-DD")
+    parser.add_argument("--to", dest="date_to", help="End date YYYY-MM-DD")
+    parser.add_argument("--user-email", action="append", default=[], help="Filter by user email substring")
+    parser.add_argument("--event-type", action="append", default=[], help="Filter by event type")
+    parser.add_argument("--include-access", action="store_true", help="Include access events")
+    parser.add_argument("--all-events", action="store_true", help="Do not filter out any events")
+    parser.add_argument(
+        "--min-severity",
+        choices=list(SEVERITY_RANK),
+        default="HIGH",
+        help="Lowest severity printed as a matching event",
+    )
+    parser.add_argument("--limit", type=int, default=50, help="Maximum matching events printed")
+    return parser.parse_args(argv)
+
+
+def utc_day(value: str) -> Optional[str]:
+    # Exports stamp times in UTC, so the calendar day is a prefix; other offsets are converted.
+    if value.endswith(UTC_SUFFIXES) and value[4:5] == "-" and value[7:8] == "-":
+        return value[:10]
+    try:
+        parsed = datetime.fromisoformat(value.strip())
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc)
+    return parsed.date().isoformat()
+
+
+def utc_timestamp(value: str) -> Optional[datetime]:
+    value = value.strip()
+    if value.endswith(" UTC"):
+        value = value[:-4]
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def date_bounds(
+    date_from: Optional[str], date_to: Optional[str]
+) -> Tuple[Optional[datetime], Optional[datetime]]:
+    # The bounds apply_filters uses: --from as given, --to plus one day less one second.
+    bounds: List[Optional[datetime]] = []
+    for flag, value in (("--from", date_from), ("--to", date_to)):
+        parsed = utc_timestamp(value) if value else None
+        if value and parsed is None:
+            raise ValueError(f"invalid {flag} date: {value!r}")
+        bounds.append(parsed)
+    start, end = bounds
+    if end is not None:
+        end += timedelta(days=1, seconds=-1)
+    return start, end
+
+
+def column_getter(header: List[str], name: str) -> Callable[[List[str]], str]:
+    if name not in header:
+        return lambda row: ""
+    index = header.index(name)
+    return lambda row: row[index] if index < len(row) else ""
+
+
+def iter_leading_fields(lines: Iterable[str], width: int) -> Iterator[List[str]]:
+    # Only the first `width` columns are read. Rows whose leading columns are unquoted are split
+    # directly; the rest (quoted names, multi-line records) go through the csv module.
+    pending = ""
+    for line in lines:
+        if pending:
+            line, pending = pending + line, ""
+        if line.count('"') % 2:
+            pending = line
+            continue
+        fields = line.split(",", width)
+        if len(fields) > width:
+            leading = len(line) - len(fields[-1])
+        else:
+            fields[-1] = fields[-1].rstrip("\r\n")
+            leading = len(line)
+        if line.find('"', 0, leading) != -1:
+            fields = next(csv.reader([line]))
+        if fields != [""]:
+            yield fields
+    if pending:
+        yield next(csv.reader([pending]))
+
+
+def quick_scan(args: argparse.Namespace, out=sys.stdout) -> Dict[str, Dict[str, int]]:
+    allowed = {"change", "auth", "export"}
+    if args.include_access:
+        allowed.add("access")
+    event_types = set(args.event_type)
+    emails = [e.lower() for e in args.user_email]
+    min_rank = SEVERITY_RANK[args.min_severity]
+    start, end = date_bounds(args.date_from, args.date_to)
+    # Days strictly inside the bounds are decided from the day alone; only boundary days parse the time.
+    day_from = start.date().isoformat() if start else None
+    day_to = end.date().isoformat() if end else None
+
+    # Category and severity depend only on event_type, which has few distinct values.
+    classified: Dict[str, Tuple[str, str, bool]] = {}
+    counts: Dict[str, Dict[str, int]] = {"severity": {}, "category": {}, "event_type": {}}
+    scanned = 0
+    printed = 0
+    with open(args.audit, newline="", encoding="utf-8-sig", buffering=QUICK_READ_BUFFER) as f:
+        header_line = f.readline()
+        header = next(csv.reader([header_line])) if header_line else []
+        getters = {name: column_getter(header, name) for name in QUICK_COLUMNS}
+        get_type = getters["event_type"]
+        get_ts = getters["event_timestamp"]
+        get_email = getters["user_email"]
+        width = max([header.index(c) + 1 for c in QUICK_COLUMNS if c in header], default=0)
+        for row in iter_leading_fields(f, width):
+            scanned += 1
+            event_type = get_type(row)
+            info = classified.get(event_type)
+            if info is None:
+                category = categorize_event(event_type)
+                severity = base_severity(event_type)
+                keep = args.all_events or category in allowed
+                info = classified[event_type] = (category, severity, keep)
+            category, severity, keep = info
+            if not keep or (event_types and event_type not in event_types):
+                continue
+            if emails:
+                email = get_email(row).lower()
+                if not any(e in email for e in emails):
+                    continue
+            if start or end:
+                day = utc_day(get_ts(row))
+                if day is None or (day_from and day < day_from) or (day_to and day > day_to):
+                    continue
+                if day == day_from or day == day_to:
+                    ts = utc_timestamp(get_ts(row))
+                    if ts is None or (start and ts < start) or (end and ts > end):
+                        continue
+            for key, value in (("severity", severity), ("category", category), ("event_type", event_type)):
+                bucket = counts[key]
+                bucket[value] = bucket.get(value, 0) + 1
+            if SEVERITY_RANK[severity] >= min_rank and printed < args.limit:
+                printed += 1
+                fields = [get_ts(row), severity, event_type] + [getters[c](row) for c in QUICK_COLUMNS[2:]]
+                out.write("\t".join(" ".join(value.split()) or "-" for value in fields) + "\n")
+
+    matched = sum(counts["severity"].values())
+    at_or_above = sum(v for k, v in counts["severity"].items() if SEVERITY_RANK[k] >= min_rank)
+    out.write(f"\n{scanned} rows scanned, {matched} matched filters, {at_or_above} at {args.min_severity} or above")
+    out.write(f" ({printed} shown)\n" if at_or_above > printed else "\n")
+    for key in ["severity", "category", "event_type"]:
+        ordered = sorted(counts[key].items(), key=lambda kv: (-kv[1], kv[0]))
+        out.write(f"{key}: " + (", ".join(f"{k or 'unknown'}={v}" for k, v in ordered) or "none") + "\n")
+    return counts
+
+
+def quick_main(argv: List[str]) -> int:
+    args = parse_quick_args(argv)
+    try:
+        date_bounds(args.date_from, args.date_to)
+    except ValueError as exc:
+        sys.stderr.write(f"{exc}\n")
+        return 2
+    try:
+        quick_scan(args)
+    except FileNotFoundError:
+        sys.stderr.write(f"Audit file not found: {args.audit}\n")
+        return 2
+    except BrokenPipeError:
+        # Output piped into head/less that exited early; silence the flush at interpreter exit.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(quick_main(sys.argv[1:]))
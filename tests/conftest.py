@@ -0,0 +1,119 @@
+import csv
+import json
+import os
+import random
+import sys
+from typing import Callable
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+AUDIT_HEADER = [
+    "event_id",
+    "event_timestamp",
+    "event_type",
+    "organization_name",
+    "actor_type",
+    "user_email",
+    "entity_type",
+    "entity_id",
+    "entity_name",
+    "entity_application_id",
+    "entity_application_name",
+    "payload_json",
+]
+EVENT_TYPES = [
+    "MetricUpdated",
+    "MetricCreated",
+    "MetricDeleted",
+    "BlockAccessed",
+    "DataExported",
+    "UserLogin",
+    "ImpersonationStarted",
+    "FormulaUpdated",
+    "BoardUpdated",
+    "AccessRightsUpdated",
+    "ListDataChanged",
+]
+
+
+def write_audit_export(
+    path: str,
+    rows: int,
+    seed: int = 1,
+    days: int = 28,
+    unique_payloads: bool = False,
+    burst: int = 0,
+) -> str:
+    # Synthetic export: ~10% re-emitted event_ids, a few undated rows and malformed payloads, and
+    # optionally `burst` extra changes by one actor on one day.
+    rng = random.Random(seed)
+    apps = [(f"app-{i}", f"App{i}") for i in range(5)]
+    entities = [f"ent-{i:04d}" for i in range(300)]
+    users = [f"user{i}@ex.com" for i in range(20)] + [""]
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(AUDIT_HEADER)
+        for i in range(rows + burst):
+            app_id, app_name = rng.choice(apps)
+            entity = rng.choice(entities)
+            if i < rows:
+                event_id = str(rng.randint(0, int(rows * 0.9)))
+                ts = (
+                    f"2025-12-{rng.randint(1, days):02d} {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:"
+                    f"{rng.randint(0, 59):02d}.{rng.randint(0, 999):03d} UTC"
+                )
+                if rng.random() < 0.01:
+                    ts = ""
+                event_type, user = rng.choice(EVENT_TYPES), rng.choice(users)
+            else:
+                event_id, event_type, user = f"burst-{i}", "MetricUpdated", "user3@ex.com"
+                ts = f"2025-12-{days - 5:02d} 10:{i % 60:02d}:{i % 59:02d}.000 UTC"
+            payload = {"entity": {"application": {"id": app_id, "name": app_name}, "id": entity, "entityType": "Metric"}}
+            payload["type"] = "x"
+            if unique_payloads:
+                payload["nonce"] = i
+            text = json.dumps(payload) if rng.random() >= 0.01 else "{bad"
+            writer.writerow([
+                event_id, ts, event_type, "Org", rng.choice(["1", "2"]), user, "Metric", entity,
+                f"M{entity[-4:]}", app_id, app_name, text,
+            ])
+    return path
+
+
+def write_metadata_snapshot(path: str, seed: int = 1) -> str:
+    rng = random.Random(seed)
+    entities = [f"ent-{i:04d}" for i in range(300)]
+    metrics = []
+    for j, entity in enumerate(entities):
+        metrics.append({
+            "id": entity,
+            "name": f"M{entity[-4:]}",
+            "applicationId": f"app-{j % 5}",
+            "dataType": rng.choice(["Number", "Text"]),
+            "isSecurityBlock": j % 50 == 0,
+            "referencedBlockIds": rng.sample(entities, 2) if j % 3 == 0 else [],
+        })
+    boards = [
+        {"id": f"board-{b}", "name": f"B{b}", "blocks": [{"blockId": rng.choice(entities), "blockType": "Metric"}]}
+        for b in range(10)
+    ]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"metrics": metrics, "views": [], "boards": boards}, f)
+    return path
+
+
+@pytest.fixture
+def audit_export(tmp_path) -> Callable[..., str]:
+    def make(rows: int, name: str = "audit.csv", **kwargs) -> str:
+        return write_audit_export(str(tmp_path / name), rows, **kwargs)
+
+    return make
+
+
+@pytest.fixture
+def metadata_snapshot(tmp_path) -> str:
+    return write_metadata_snapshot(str(tmp_path / "metadata.json"))
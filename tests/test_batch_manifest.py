@@ -0,0 +1,44 @@
+import json
+
+import pytest
+
+import pigment_audit_change_inspector as inspector
+
+
+def write_manifest(tmp_path, data) -> str:
+    path = tmp_path / "nightly.json"
+    path.write_text(json.dumps(data))
+    return str(path)
+
+
+def test_manifest_entries_resolve_against_the_manifest(tmp_path):
+    path = write_manifest(tmp_path, {
+        "defaults": {"metadata": "shared/", "args": ["--top", "5"]},
+        "orgs": [{"name": "acme", "audit": "acme.csv", "args": ["--all-events"]}, {"audit": "b.csv"}],
+    })
+    orgs = inspector.load_batch_manifest(path, str(tmp_path / "out"))
+    assert [org["name"] for org in orgs] == ["acme", "org2"]
+    assert orgs[0]["audit"] == str(tmp_path / "acme.csv")
+    assert orgs[0]["metadata"] == f"{tmp_path}/shared/"
+    assert orgs[0]["args"] == ["--top", "5", "--all-events"]
+    assert orgs[1]["out"] == str(tmp_path / "out" / "org2")
+
+
+@pytest.mark.parametrize(
+    "data, message",
+    [
+        ({"organizations": [{"audit": "a.csv"}]}, "unknown manifest keys ['organizations']"),
+        ({"orgs": []}, "lists no organizations"),
+        ({"defaults": {}}, "lists no organizations"),
+        ([], "lists no organizations"),
+        ({"orgs": [{"audit": "a.csv", "metdata": "m/"}]}, "unknown keys ['metdata'] in manifest entry 1"),
+        ({"defaults": {"arg": ["--top"]}, "orgs": [{"audit": "a.csv"}]}, "in manifest defaults"),
+        ({"orgs": ["a.csv"]}, "manifest entry 1 is not an object"),
+    ],
+)
+def test_invalid_manifest_is_rejected(tmp_path, data, message):
+    path = write_manifest(tmp_path, data)
+    with pytest.raises(ValueError, match=message.replace("[", r"\[").replace("]", r"\]")):
+        inspector.load_batch_manifest(path, str(tmp_path / "out"))
+    assert inspector.batch_main(["--manifest", path, "--out", str(tmp_path / "out")]) == 2
+    assert not (tmp_path / "out" / "batch_summary.csv").exists()
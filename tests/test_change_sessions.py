@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+import pigment_audit_change_inspector as inspector
+
+
+def changes_frame(rows) -> pd.DataFrame:
+    # rows: (user_email, minute or None, entity_name, application_id, risk_score)
+    frame = pd.DataFrame(rows, columns=["user_email", "minute", "entity_name", "application_id", "risk_score"])
+    base = pd.Timestamp("2025-12-01", tz="UTC")
+    minutes = pd.to_timedelta(frame.pop("minute"), unit="min")
+    frame["event_timestamp_utc"] = (base + minutes).astype("datetime64[us, UTC]")
+    frame["event_id"] = [f"e{i}" for i in range(len(frame))]
+    frame["actor_label"] = "user"
+    frame["meta_name"] = None
+    frame["entity_id"] = "id"
+    return frame.sort_values(by=["event_timestamp_utc", "event_id"], kind="mergesort", ignore_index=True)
+
+
+def test_sessions_split_on_gaps_and_undated_changes():
+    changes = changes_frame([
+        ("a@x", 0, "E1", "app1", 10),
+        ("a@x", 10, "E2", None, 30),
+        ("b@x", 12, "E1", "app2", 5),
+        ("a@x", 25, "E1", "app2", 20),
+        ("a@x", 60, "E3", "app1", 90),
+        ("a@x", None, "E4", "app1", 50),
+        ("a@x", None, "E4", "app1", 40),
+    ])
+    sessions = inspector.build_change_sessions(changes, 30)
+    assert sessions[["actor", "change_count", "distinct_entities", "distinct_applications", "max_risk_score"]].values.tolist() == [
+        ["a@x", 3, 2, 2, 30],
+        ["b@x", 1, 1, 1, 5],
+        ["a@x", 1, 1, 1, 90],
+        ["a@x", 1, 1, 1, 50],
+        ["a@x", 1, 1, 1, 40],
+    ]
+    assert sessions["affected_entities"].tolist()[0] == "E1;E2"
+    assert sessions["duration_minutes"].tolist()[:3] == [25.0, 0.0, 0.0]
+    assert sessions["session_id"].tolist() == [1, 2, 3, 4, 5]
+
+
+def test_affected_entities_are_capped():
+    changes = changes_frame([("a@x", i, f"E{i % 30}", "app1", 1) for i in range(60)])
+    sessions = inspector.build_change_sessions(changes, 30)
+    assert sessions["distinct_entities"].tolist() == [30]
+    assert sessions["affected_entities"].iloc[0].split(";") == [f"E{i}" for i in range(inspector.CHANGE_SESSION_MAX_ENTITIES)]
+
+
+def test_time_ordered_batches_match_one_build():
+    rng = np.random.default_rng(7)
+    rows = [
+        (
+            f"u{rng.integers(0, 6)}@x",
+            None if rng.random() < 0.03 else int(rng.integers(0, 2000)),
+            f"E{rng.integers(0, 40)}",
+            None if rng.random() < 0.1 else f"app{rng.integers(0, 4)}",
+            int(rng.integers(0, 100)),
+        )
+        for _ in range(1500)
+    ]
+    changes = changes_frame(rows)
+    expected = inspector.build_change_sessions(changes, 20)
+    builder = inspector.ChangeSessionBuilder(20)
+    cuts = [0, 1, 200, 201, 700, 1400, len(changes)]
+    for lo, hi in zip(cuts, cuts[1:]):
+        builder.add(inspector.change_session_inputs(changes.iloc[lo:hi]))
+    pd.testing.assert_frame_equal(builder.finish(), expected)
@@ -0,0 +1,46 @@
+import filecmp
+import os
+
+import pandas as pd
+import pytest
+
+import pigment_audit_change_inspector as inspector
+
+pytest.importorskip("duckdb")
+
+# The pandas engine is the reference: --engine duckdb must write byte-identical tables and report.md.
+PARITY_OPTIONS = {
+    "default": [],
+    "chunked": ["--chunk-rows", "700"],
+    "payload_store": ["--payload-store"],
+    "rate_baselines": ["--rate-baselines", "{out}/../{engine}_rates.json"],
+    "metadata_filters": ["--metadata", "{meta}", "--all-events", "--user-email", "user1", "--from", "2025-12-05"],
+}
+
+
+def output_files(out_dir: str):
+    files = []
+    for root, _, names in os.walk(out_dir):
+        files.extend(os.path.relpath(os.path.join(root, name), out_dir) for name in names)
+    return sorted(files)
+
+
+@pytest.mark.parametrize("name", list(PARITY_OPTIONS))
+def test_duckdb_engine_matches_pandas(name, audit_export, metadata_snapshot, tmp_path):
+    audit = audit_export(6000, burst=300)
+    outs = {}
+    for engine in ("pandas", "duckdb"):
+        out = str(tmp_path / engine)
+        options = [opt.format(out=out, engine=engine, meta=metadata_snapshot) for opt in PARITY_OPTIONS[name]]
+        assert inspector.main(["--audit", audit, "--out", out, "--engine", engine] + options) == 0
+        outs[engine] = out
+
+    files = output_files(outs["pandas"])
+    assert "report.md" in files and "events_enriched.csv" in files
+    assert output_files(outs["duckdb"]) == files
+    _, mismatch, errors = filecmp.cmpfiles(outs["pandas"], outs["duckdb"], files, shallow=False)
+    assert (mismatch, errors) == ([], [])
+    if name == "rate_baselines":
+        assert filecmp.cmp(f"{outs['pandas']}_rates.json", f"{outs['duckdb']}_rates.json", shallow=False)
+        events = pd.read_csv(os.path.join(outs["pandas"], "events_enriched.csv"), dtype=str)
+        assert events["rate_anomaly"].notna().any()
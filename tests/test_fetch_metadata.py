@@ -0,0 +1,173 @@
+import asyncio
+import csv
+import json
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import pigment_audit_change_inspector as inspector
+from conftest import AUDIT_HEADER
+
+FORMULAS_PATH = "/api/workspace/internals/formula/FindFormulasBySearchId"
+CONCURRENCY = 4
+BACKOFF = 0.05
+ENTITY_COUNT = 30
+
+
+class StubWorkspace:
+    # Formula endpoint: "ent-flaky" answers 503 twice before succeeding, "ent-missing" is a 404 and
+    # every other id returns audits whose rawFormula repeats.
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests: dict = {}
+        self.tokens: set = set()
+
+    def respond(self, search_id: str):
+        attempts = len(self.requests[search_id])
+        if search_id == "ent-missing":
+            return 404, {"error": "not found"}
+        if search_id == "ent-flaky" and attempts <= 2:
+            return 503, {"error": "busy"}
+        return 200, [{"rawFormula": f"'{search_id}' * 2"}, {"rawFormula": f"'{search_id}' * 2"}, {"rawFormula": "'Base'"}]
+
+
+def make_handler(stub: StubWorkspace):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self) -> None:
+            super().setup()
+            with stub.lock:
+                stub.connections += 1
+
+        def do_GET(self) -> None:
+            url = urllib.parse.urlsplit(self.path)
+            search_id = urllib.parse.parse_qs(url.query).get("searchId", [""])[0]
+            with stub.lock:
+                stub.in_flight += 1
+                stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                stub.requests.setdefault(search_id, []).append(time.monotonic())
+                stub.tokens.add(self.headers.get("Authorization"))
+                status, payload = stub.respond(search_id) if url.path == FORMULAS_PATH else (404, {})
+            time.sleep(0.01)
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            with stub.lock:
+                stub.in_flight -= 1
+
+        def log_message(self, *args) -> None:
+            pass
+
+    return Handler
+
+
+@pytest.fixture
+def workspace():
+    stub = StubWorkspace()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(stub))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield stub, f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def entity_audit(tmp_path) -> str:
+    path = tmp_path / "audit.csv"
+    ids = [f"ent-{i:03d}" for i in range(ENTITY_COUNT - 2)] + ["ent-flaky", "ent-missing"]
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(AUDIT_HEADER)
+        for i, entity in enumerate(ids):
+            writer.writerow([
+                str(i), f"2025-12-01 10:00:{i:02d}.000 UTC", "MetricUpdated", "Org", "1", "user@ex.com",
+                "Metric", entity, f"M{entity}", "app-1", "App1", "{}",
+            ])
+    return str(path)
+
+
+def fetch(audit: str, base_url: str, cache_dir: str):
+    args = inspector.parse_fetch_args([
+        "--audit", audit, "--org-id", "org-1", "--base-url", base_url, "--cache-dir", cache_dir,
+        "--concurrency", str(CONCURRENCY), "--retries", "3", "--backoff", str(BACKOFF), "--timeout", "5",
+    ])
+    entities = inspector.collect_audit_entities(audit)
+    return asyncio.run(inspector.fetch_formula_metadata(entities, args, "secret"))
+
+
+def test_pool_reuses_keep_alive_connections_within_concurrency(workspace, entity_audit, tmp_path):
+    stub, base_url = workspace
+    items, stats = fetch(entity_audit, base_url, str(tmp_path / "cache"))
+    requests = sum(len(times) for times in stub.requests.values())
+    assert len(items) == ENTITY_COUNT
+    assert requests == ENTITY_COUNT + 2
+    assert 1 < stub.max_in_flight <= CONCURRENCY
+    assert stub.connections <= CONCURRENCY
+    assert stub.tokens == {"Bearer secret"}
+
+
+def test_503_is_retried_with_backoff_and_404_counts_as_failed(workspace, entity_audit, tmp_path):
+    stub, base_url = workspace
+    items, stats = fetch(entity_audit, base_url, str(tmp_path / "cache"))
+    by_id = {item["id"]: item for item in items}
+    flaky = stub.requests["ent-flaky"]
+    assert len(flaky) == 3
+    # Jittered exponential backoff: attempt n sleeps at least BACKOFF * 2**n * 0.5.
+    assert flaky[1] - flaky[0] >= BACKOFF * 0.5
+    assert flaky[2] - flaky[1] >= BACKOFF
+    assert by_id["ent-flaky"]["formula"] == "'ent-flaky' * 2\n'Base'"
+    assert len(stub.requests["ent-missing"]) == 1
+    assert "formula" not in by_id["ent-missing"]
+    assert stats == {"fetched": ENTITY_COUNT - 1, "cached": 0, "failed": 1}
+
+
+def test_second_run_is_served_from_cache_except_failures(workspace, entity_audit, tmp_path):
+    stub, base_url = workspace
+    cache_dir = str(tmp_path / "cache")
+    first, _ = fetch(entity_audit, base_url, cache_dir)
+    stub.requests.clear()
+    second, stats = fetch(entity_audit, base_url, cache_dir)
+    assert stats == {"fetched": 0, "cached": ENTITY_COUNT - 1, "failed": 1}
+    assert list(stub.requests) == ["ent-missing"]
+    assert second == first
+
+
+def test_output_is_a_metadata_collection(workspace, entity_audit, tmp_path, monkeypatch):
+    stub, base_url = workspace
+    out = str(tmp_path / "metadata" / "metrics.json")
+    monkeypatch.setenv("PIGMENT_TOKEN", "secret")
+    assert inspector.fetch_metadata_main([
+        "--audit", entity_audit, "--org-id", "org-1", "--base-url", base_url, "--token-env", "PIGMENT_TOKEN",
+        "--out", out, "--cache-dir", "", "--backoff", str(BACKOFF),
+    ]) == 0
+    collections = inspector.load_metadata(out)
+    assert list(collections) == ["metrics"]
+    context = inspector.build_metadata_context(collections)
+    entry = context.index["ent-000"]
+    assert entry["name"] == "Ment-000"
+    assert entry["formula"] == "'ent-000' * 2\n'Base'"
+    assert context.index["ent-missing"]["formula"] is None
+    assert len(context.index) == ENTITY_COUNT
+
+
+def test_missing_token_exits_with_usage_error(entity_audit, tmp_path, monkeypatch):
+    monkeypatch.delenv("PIGMENT_TOKEN", raising=False)
+    out = tmp_path / "metrics.json"
+    assert inspector.fetch_metadata_main([
+        "--audit", entity_audit, "--org-id", "org-1", "--token-env", "PIGMENT_TOKEN", "--out", str(out),
+    ]) == 2
+    assert not out.exists()
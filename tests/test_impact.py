@@ -0,0 +1,60 @@
+import random
+
+import pytest
+
+import pigment_audit_change_inspector as inspector
+
+
+def random_graph(seed: int) -> inspector.MetadataContext:
+    # Explicit references only, with cycles, plus views over some metrics and boards showing metrics and views.
+    rng = random.Random(seed)
+    ids = [f"m{i}" for i in range(40)]
+    metrics = [
+        {"id": entity_id, "name": entity_id, "referencedBlockIds": rng.sample(ids, rng.randint(0, 3))}
+        for entity_id in ids
+    ]
+    views = [{"id": f"v{i}", "underlyingId": rng.choice(ids)} for i in range(8)]
+    boards = [
+        {"id": f"b{i}", "blocks": [{"blockId": rng.choice(ids), "blockType": "Metric"}, {"blockId": rng.choice(views)["id"], "blockType": "View"}]}
+        for i in range(6)
+    ]
+    return inspector.build_metadata_context({"metrics": metrics, "views": views, "boards": boards})
+
+
+def naive_dependents(meta: inspector.MetadataContext, root: str, max_depth):
+    seen = {root}
+    frontier = [root]
+    depth = 0
+    while frontier and (max_depth is None or depth < max_depth):
+        next_frontier = []
+        for node in frontier:
+            for dep in meta.reverse_deps.get(node, []):
+                if dep not in seen:
+                    seen.add(dep)
+                    next_frontier.append(dep)
+        frontier = next_frontier
+        depth += 1
+    seen.discard(root)
+    return seen
+
+
+def split(value: str) -> set:
+    return set(value.split(";")) if value else set()
+
+
+@pytest.mark.parametrize("max_depth", [None, 2])
+@pytest.mark.parametrize("seed", range(20))
+def test_impact_matches_naive_bfs(seed, max_depth):
+    meta = random_graph(seed)
+    roots = [f"m{i}" for i in range(0, 40, 3)] + ["m0", "unknown-id"]
+    impact = inspector.compute_impact(roots, meta, max_depth)
+    assert impact["entity_id"].tolist() == list(dict.fromkeys(roots))
+    for row in impact.to_dict("records"):
+        dependents = naive_dependents(meta, row["entity_id"], max_depth)
+        boards = {b for node in dependents | {row["entity_id"]} for b in meta.boards_by_entity.get(node, [])}
+        views = {v for node in dependents | {row["entity_id"]} for v in meta.views_by_entity.get(node, [])}
+        assert split(row["transitive_dependents"]) == dependents
+        assert row["transitive_dependents_count"] == len(dependents)
+        assert split(row["affected_boards"]) == boards and row["affected_boards_count"] == len(boards)
+        assert split(row["affected_views"]) == views and row["affected_views_count"] == len(views)
+        assert row["known_in_metadata"] == (row["entity_id"] != "unknown-id")
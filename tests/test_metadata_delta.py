@@ -0,0 +1,163 @@
+import copy
+import random
+import uuid
+
+import pytest
+
+import pigment_audit_change_inspector as inspector
+
+PAIRS = 300
+NAMES = ["Revenue", "Cost", "Rev's Margin", "Headcount", "FX Rate", "Plan", "Actuals", "Growth", "Churn", "Seats"]
+PROPERTIES = ["Region", "Owner", "Tier"]
+APPS = ["app-a", "app-b", None]
+
+
+def new_id(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def quoted(name: str) -> str:
+    return "'" + name.replace("'", "''") + "'"
+
+
+def random_formula(rng: random.Random, ids, lists) -> str:
+    # Mixes quoted and bare names, `List.Property` members, raw ids and names nobody carries yet.
+    parts = []
+    for _ in range(rng.randint(0, 3)):
+        pick = rng.random()
+        if pick < 0.4:
+            name = rng.choice(NAMES + ["Missing Block"])
+            parts.append(name if name.isidentifier() and rng.random() < 0.5 else quoted(name))
+        elif pick < 0.6 and lists:
+            parts.append(f"{quoted(rng.choice(lists)['name'])}.{rng.choice(PROPERTIES)}")
+        elif pick < 0.9 and ids:
+            parts.append(rng.choice(ids))
+        else:
+            parts.append(new_id(rng))
+    return " + ".join(parts) or "1"
+
+
+def random_metric(rng: random.Random, ids, lists) -> dict:
+    metric = {"id": new_id(rng), "name": rng.choice(NAMES), "applicationId": rng.choice(APPS)}
+    metric["formula"] = random_formula(rng, ids, lists)
+    if ids and rng.random() < 0.15:
+        metric["referencedBlockIds"] = rng.sample(ids, min(2, len(ids))) + [new_id(rng)]
+    return metric
+
+
+def random_board(rng: random.Random, metrics, views) -> dict:
+    blocks = [{"blockId": m["id"], "blockType": "Metric"} for m in rng.sample(metrics, min(len(metrics), rng.randint(0, 2)))]
+    blocks += [{"blockId": v["id"], "blockType": "View"} for v in rng.sample(views, min(len(views), rng.randint(0, 3)))]
+    rng.shuffle(blocks)
+    return {"id": new_id(rng), "name": f"Board {rng.randint(0, 99)}", "blocks": blocks}
+
+
+def random_snapshot(rng: random.Random) -> dict:
+    lists = [{"id": new_id(rng), "name": name, "applicationId": "app-a"} for name in ("Country", "Employee")]
+    properties = [
+        {"id": new_id(rng), "name": rng.choice(PROPERTIES), "listId": rng.choice(lists)["id"]}
+        for _ in range(rng.randint(1, 5))
+    ]
+    metrics = []
+    for _ in range(rng.randint(8, 25)):
+        metrics.append(random_metric(rng, [m["id"] for m in metrics], lists))
+    views = [{"id": new_id(rng), "name": "View", "underlyingId": rng.choice(metrics)["id"]} for _ in range(rng.randint(0, 6))]
+    boards = [random_board(rng, metrics, views) for _ in range(rng.randint(0, 4))]
+    return {"lists": lists, "properties": properties, "metrics": metrics, "views": views, "boards": boards}
+
+
+def mutate(rng: random.Random, snapshot: dict) -> dict:
+    after = copy.deepcopy(snapshot)
+    metrics = after["metrics"]
+    for metric in list(metrics):
+        pick = rng.random()
+        if pick < 0.1:
+            metrics.remove(metric)
+        elif pick < 0.25:
+            metric["name"] = rng.choice(NAMES)
+        elif pick < 0.35:
+            metric["formula"] = random_formula(rng, [m["id"] for m in metrics], after["lists"])
+        elif pick < 0.4:
+            metric["applicationId"] = rng.choice(APPS)
+    for _ in range(rng.randint(0, 4)):
+        metrics.append(random_metric(rng, [m["id"] for m in metrics], after["lists"]))
+    for prop in list(after["properties"]):
+        pick = rng.random()
+        if pick < 0.15:
+            after["properties"].remove(prop)
+        elif pick < 0.3:
+            prop["name"] = rng.choice(PROPERTIES)
+    if rng.random() < 0.3:
+        after["properties"].append({"id": new_id(rng), "name": rng.choice(PROPERTIES), "listId": rng.choice(after["lists"])["id"]})
+
+    views = after["views"]
+    for view in list(views):
+        pick = rng.random()
+        if pick < 0.15:
+            views.remove(view)
+        elif pick < 0.4:
+            view["underlyingId"] = rng.choice(metrics)["id"] if metrics else new_id(rng)
+    for _ in range(rng.randint(0, 2)):
+        views.append({"id": new_id(rng), "name": "View", "underlyingId": rng.choice(metrics)["id"]})
+    boards = after["boards"]
+    for board in list(boards):
+        pick = rng.random()
+        if pick < 0.15:
+            boards.remove(board)
+        elif pick < 0.45:
+            board["blocks"] = random_board(rng, metrics, views)["blocks"]
+    if rng.random() < 0.3:
+        boards.append(random_board(rng, metrics, views))
+    return after
+
+
+def comparable(ctx: inspector.MetadataContext) -> dict:
+    # Incremental updates append in a different order and drop emptied entries, so compare the
+    # derived maps as sorted lists without empty values.
+    def canonical(value):
+        if isinstance(value, dict):
+            return {k: canonical(v) for k, v in value.items() if v not in ([], {}, None)}
+        if isinstance(value, list):
+            return sorted(value)
+        return value
+
+    fields = [
+        "dependency_method", "reverse_deps", "views_using", "boards_using", "views_by_entity",
+        "boards_by_entity", "dependencies", "unresolved_refs", "waiting_on", "view_underlying",
+        "board_targets", "view_boards", "name_index", "name_refs", "name_referrers",
+    ]
+    out = {name: canonical(getattr(ctx, name)) for name in fields}
+    out["index"] = ctx.index
+    return out
+
+
+def warm_cache(ctx: inspector.MetadataContext) -> None:
+    for entity_id in ctx.index:
+        ctx.transitive_cache[entity_id] = inspector.compute_transitive_dependents(entity_id, ctx.reverse_deps)
+
+
+@pytest.mark.parametrize("seed", range(PAIRS))
+def test_delta_matches_full_rebuild(seed):
+    rng = random.Random(seed)
+    before_snapshot = random_snapshot(rng)
+    after_snapshot = mutate(rng, before_snapshot)
+
+    before = inspector.build_metadata_context(before_snapshot)
+    warm_cache(before)
+    inspector.transitive_usage(before)
+    before_state = copy.deepcopy(comparable(before))
+    before_cache = dict(before.transitive_cache)
+
+    delta, _ = inspector.compute_metadata_delta(
+        inspector.metadata_fingerprints(before.index), inspector.normalize_collections(after_snapshot)
+    )
+    incremental = inspector.apply_metadata_delta(before, delta)
+    full = inspector.build_metadata_context(after_snapshot)
+
+    assert comparable(incremental) == comparable(full)
+    for entity_id, count in incremental.transitive_cache.items():
+        assert count == inspector.compute_transitive_dependents(entity_id, full.reverse_deps), entity_id
+    assert inspector.transitive_usage(incremental) == inspector.transitive_usage(full)
+    # The source context is left as it was.
+    assert comparable(before) == before_state
+    assert before.transitive_cache == before_cache
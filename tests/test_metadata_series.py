@@ -0,0 +1,58 @@
+import json
+import os
+
+import pandas as pd
+
+import pigment_audit_change_inspector as inspector
+from conftest import write_metadata_snapshot
+
+SNAPSHOT_DATES = ["2025-12-05", "2025-12-12", "2025-12-20"]
+
+
+def write_series(series_dir: str) -> dict:
+    # Each snapshot has different references, data types and boards; the second drops twenty
+    # metrics and the third renames some of them.
+    os.makedirs(series_dir)
+    paths = {}
+    for seed, date in enumerate(SNAPSHOT_DATES, start=1):
+        path = write_metadata_snapshot(os.path.join(series_dir, f"{date}.json"), seed=seed)
+        with open(path, encoding="utf-8") as f:
+            snapshot = json.load(f)
+        if seed == 2:
+            snapshot["metrics"] = snapshot["metrics"][20:]
+        if seed == 3:
+            for metric in snapshot["metrics"][::7]:
+                metric["name"] += " (renamed)"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f)
+        paths[date] = path
+    return paths
+
+
+def enriched(out: str) -> pd.DataFrame:
+    return pd.read_csv(os.path.join(out, "events_enriched.csv"), dtype=str).set_index("event_id")
+
+
+def test_series_rows_match_single_snapshot_runs(audit_export, tmp_path):
+    audit = audit_export(4000)
+    paths = write_series(str(tmp_path / "series"))
+    series_out = str(tmp_path / "series_out")
+    assert inspector.main(["--audit", audit, "--out", series_out, "--metadata-series", str(tmp_path / "series"), "--all-events"]) == 0
+    series = enriched(series_out)
+    assert set(series["metadata_snapshot"]) == set(SNAPSHOT_DATES)
+
+    # Snapshot in effect at each event: the latest one dated at or before it, the earliest one for
+    # events before the series starts, the latest one for undated events.
+    stamps = pd.to_datetime(series["event_timestamp_utc"], utc=True, format="mixed")
+    expected = pd.Series(SNAPSHOT_DATES[0], index=series.index)
+    for date in SNAPSHOT_DATES[1:]:
+        expected[stamps >= pd.Timestamp(date, tz="UTC")] = date
+    expected[stamps.isna()] = SNAPSHOT_DATES[-1]
+    pd.testing.assert_series_equal(series["metadata_snapshot"], expected, check_names=False)
+
+    for date, path in paths.items():
+        single_out = str(tmp_path / f"single_{date}")
+        assert inspector.main(["--audit", audit, "--out", single_out, "--metadata", path, "--all-events"]) == 0
+        single = enriched(single_out)
+        rows = series[series["metadata_snapshot"] == date].drop(columns=["metadata_snapshot"])
+        pd.testing.assert_frame_equal(rows, single.loc[rows.index, rows.columns])
@@ -0,0 +1,34 @@
+import pytest
+
+import pigment_audit_change_inspector as inspector
+
+
+@pytest.mark.parametrize("formula, refs", [
+    ("'Quoted''s Name'.'Prop'", [("Quoted's Name", "Prop")]),
+    ("'Quoted''s Name' . 'Prop''s'", [("Quoted's Name", "Prop's")]),
+    ("List.Property", [("List", "Property")]),
+    ("Revenue * 'FX Rate'", [("Revenue", None), ("FX Rate", None)]),
+    ("SUM(Revenue, Country.Region) + IF(x, 1)", [("Revenue", None), ("Country", "Region"), ("x", None)]),
+    ("'Revenue' // Cost\n/* Margin */ \"Plan\" + 12.5 + Revenue", [("Revenue", None)]),
+    ("3a2f1c9e-1b2c-4d3e-8f90-1234567890ab + 1e3", []),
+])
+def test_formula_references(formula, refs):
+    assert inspector.formula_references(formula) == refs
+
+
+def test_list_property_resolves_under_its_list_only():
+    ctx = inspector.build_metadata_context({
+        "lists": [{"id": "list-country", "name": "Country", "applicationId": "app-1"}],
+        "properties": [{"id": "prop-region", "name": "Region", "listId": "list-country"}],
+        "metrics": [
+            {"id": "m-region", "name": "Region", "applicationId": "app-1"},
+            {"id": "m-quoted", "name": "Quoted's Name", "applicationId": "app-1"},
+            {"id": "m-by-property", "applicationId": "app-1", "formula": "Revenue[BY: Country.Region]"},
+            {"id": "m-by-quoted", "applicationId": "app-1", "formula": "'quoted''s name' * 2"},
+            {"id": "m-bare", "applicationId": "app-1", "formula": "Region + 1"},
+        ],
+    })
+    assert ctx.dependencies["m-by-property"] == ["list-country", "prop-region"]
+    assert ctx.dependencies["m-by-quoted"] == ["m-quoted"]
+    assert ctx.dependencies["m-bare"] == ["m-region"]
+    assert ctx.dependency_method["m-by-property"] == "name"
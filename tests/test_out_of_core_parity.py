@@ -0,0 +1,48 @@
+import filecmp
+import logging
+
+import pytest
+
+import pigment_audit_change_inspector as inspector
+from conftest import write_audit_export, write_metadata_snapshot
+from test_duckdb_parity import output_files
+
+# The in-memory run is the reference: --memory-limit must write byte-identical tables and report.md.
+# 20k rows under a 20M budget spill about ten sorted runs; 700-row chunks need a second merge pass.
+# Options are (both runs, out-of-core run only): the chunked in-memory reader dedupes undated copies
+# differently across chunks, so --chunk-rows is only given to the out-of-core run.
+MEMORY_LIMIT = "20M"
+PARITY_OPTIONS = {
+    "spilled_runs": ([], []),
+    "multi_pass_merge": ([], ["--chunk-rows", "700"]),
+    "payload_store": (["--payload-store"], []),
+    "metadata_filters": (["--all-events", "--user-email", "user1", "--from", "2025-12-05"], []),
+}
+
+
+@pytest.fixture(scope="module")
+def export(tmp_path_factory):
+    tmp = tmp_path_factory.mktemp("ooc")
+    return write_audit_export(str(tmp / "audit.csv"), 20_000, burst=300), write_metadata_snapshot(str(tmp / "metadata.json"))
+
+
+@pytest.mark.parametrize("name", list(PARITY_OPTIONS))
+def test_out_of_core_matches_in_memory(name, export, tmp_path, caplog):
+    audit, metadata = export
+    options, out_of_core_options = PARITY_OPTIONS[name]
+    common = ["--audit", audit, "--metadata", metadata] + options
+    in_memory = str(tmp_path / "in_memory")
+    out_of_core = str(tmp_path / "out_of_core")
+    assert inspector.main(common + ["--out", in_memory]) == 0
+    with caplog.at_level(logging.INFO):
+        assert inspector.main(common + out_of_core_options + ["--out", out_of_core, "--memory-limit", MEMORY_LIMIT]) == 0
+    spilled = [r.args for r in caplog.records if r.msg == "Spilled %s rows into %s sorted runs"]
+    assert len(spilled) == 1 and spilled[0][1] >= 5
+    if name == "multi_pass_merge":
+        assert any(r.msg.startswith("Merging %s runs") for r in caplog.records)
+
+    files = output_files(in_memory)
+    assert {"report.md", "events_enriched.csv", "changes_timeline.csv"} <= set(files)
+    assert output_files(out_of_core) == files
+    _, mismatch, errors = filecmp.cmpfiles(in_memory, out_of_core, files, shallow=False)
+    assert (mismatch, errors) == ([], [])
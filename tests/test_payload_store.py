@@ -0,0 +1,76 @@
+import hashlib
+import json
+import os
+import subprocess
+import sys
+
+import pandas as pd
+
+import pigment_audit_change_inspector as inspector
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Peak RSS may grow by at most this much (MB) when a spilled store takes 5x the distinct payloads;
+# keeping the frames in memory costs ~300 B per payload, i.e. ~50 MB here. Merges hold one block per
+# run (fan-in 16), so small blocks keep that part of the peak well under the threshold.
+SPILLED_STORE_GROWTH_MB = 10
+SPILLED_STORE_BLOCK_ROWS = 500
+
+SPILLED_STORE_SCRIPT = """
+import resource, sys, tempfile
+import pandas as pd
+import pigment_audit_change_inspector as inspector
+
+rows, block_rows = int(sys.argv[1]), int(sys.argv[2])
+store = inspector.PayloadStore()
+with tempfile.TemporaryDirectory() as tmp:
+    store.spill_to(tmp, block_rows)
+    for start in range(0, rows, 10_000):
+        texts = ['{"entity": {"id": "e%d"}, "note": "%s"}' % (i, "x" * 200) for i in range(start, min(rows, start + 10_000))]
+        keys = store.add(texts)
+        store.reference(pd.Series(keys[::2]))
+    store_dir = store.write(tmp)
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024
+    with open(store_dir + "/index.csv") as f:
+        stored = sum(1 for _ in f) - 1
+print(peak_mb, stored)
+"""
+
+
+def run_spilled_store(rows: int):
+    result = subprocess.run(
+        [sys.executable, "-c", SPILLED_STORE_SCRIPT, str(rows), str(SPILLED_STORE_BLOCK_ROWS)],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    peak_mb, stored = result.stdout.split()
+    return int(peak_mb), int(stored)
+
+
+def test_spilled_store_memory_does_not_grow_with_payloads():
+    small_mb, small_stored = run_spilled_store(40_000)
+    large_mb, large_stored = run_spilled_store(200_000)
+    assert (small_stored, large_stored) == (20_000, 100_000)
+    assert large_mb - small_mb < SPILLED_STORE_GROWTH_MB, (small_mb, large_mb)
+
+
+def test_out_of_core_payload_store_rehydrates_to_plain_run(audit_export, tmp_path):
+    audit = audit_export(3000, unique_payloads=True)
+    common = ["--audit", audit, "--memory-limit", "64M", "--chunk-rows", "500", "--all-events"]
+    assert inspector.main(common + ["--out", str(tmp_path / "plain")]) == 0
+    assert inspector.main(common + ["--out", str(tmp_path / "stored"), "--payload-store"]) == 0
+
+    plain = pd.read_csv(tmp_path / "plain" / "events_enriched.csv", dtype=str)
+    stored = pd.read_csv(tmp_path / "stored" / "events_enriched.csv", dtype=str)
+    store_dir = str(tmp_path / "stored" / inspector.PAYLOAD_STORE_DIR)
+    index = pd.read_csv(os.path.join(store_dir, "index.csv"))
+    assert index["payload_hash"].is_unique
+    assert set(index["payload_hash"]) == set(stored["payload_hash"].dropna())
+    restored = inspector.rehydrate_payloads(stored["payload_hash"], store_dir)
+    assert [p if isinstance(p, str) else None for p in plain["payload_json"]] == restored
+    with open(os.path.join(store_dir, "manifest.json")) as f:
+        assert json.load(f)["hash"] == "sha256"
+    text, key = plain["payload_json"].iloc[0], stored["payload_hash"].iloc[0]
+    assert key == hashlib.sha256(text.encode("utf-8")).hexdigest()
@@ -0,0 +1,45 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Peak RSS of the in-memory run above the post-import baseline, as a multiple of the deduplicated
+# frame's memory_usage(deep=True). The copy-free pipeline measures ~1.2x on the benchmark export;
+# the copying one measured ~2.2x.
+PEAK_RSS_FRAME_MULTIPLE = 1.6
+BENCHMARK_ROWS = 100_000
+
+PIPELINE_RSS_SCRIPT = """
+import resource, sys
+import pigment_audit_change_inspector as inspector
+
+def current_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+
+audit, out, meta = sys.argv[1:4]
+baseline = current_mb()
+assert inspector.main(["--audit", audit, "--out", out, "--metadata", meta]) == 0
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+frame = inspector.read_audit_csv(audit).memory_usage(deep=True).sum() / (1024 * 1024)
+print(baseline, peak, frame)
+"""
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/status"), reason="reads the post-import RSS from /proc")
+def test_peak_rss_stays_under_frame_multiple(audit_export, metadata_snapshot, tmp_path):
+    audit = audit_export(BENCHMARK_ROWS)
+    result = subprocess.run(
+        [sys.executable, "-c", PIPELINE_RSS_SCRIPT, audit, str(tmp_path / "out"), metadata_snapshot],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    baseline_mb, peak_mb, frame_mb = map(float, result.stdout.split())
+    assert peak_mb - baseline_mb < PEAK_RSS_FRAME_MULTIPLE * frame_mb, (baseline_mb, peak_mb, frame_mb)
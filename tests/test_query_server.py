@@ -0,0 +1,90 @@
+import asyncio
+import json
+
+import pytest
+
+import pigment_audit_change_inspector as inspector
+from conftest import write_audit_export, write_metadata_snapshot
+
+MAX_RESULTS = 50
+
+
+@pytest.fixture(scope="module")
+def served(tmp_path_factory):
+    tmp = tmp_path_factory.mktemp("serve")
+    audit = write_audit_export(str(tmp / "audit.csv"), 2000)
+    metadata = write_metadata_snapshot(str(tmp / "metadata.json"))
+    args = inspector.parse_serve_args(["--audit", audit, "--metadata", metadata])
+    meta_ctx, diff_ctx = inspector.load_metadata_contexts(args)
+    df = inspector.load_enriched_events(args, meta_ctx, diff_ctx)
+    return inspector.build_event_query_index(df), meta_ctx
+
+
+def query(served, *paths):
+    # Starts the server on a free port, sends one GET per path and returns (status, json body) pairs.
+    index, meta = served
+
+    async def get(port, path):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode("latin-1"))
+        await writer.drain()
+        head, _, body = (await reader.read()).partition(b"\r\n\r\n")
+        writer.close()
+        return int(head.split()[1]), json.loads(body)
+
+    async def run():
+        server = await inspector.start_query_server(index, meta, "127.0.0.1", 0, MAX_RESULTS)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            return [await get(port, path) for path in paths]
+
+    return asyncio.run(run())
+
+
+def test_events_by_entity_and_user(served):
+    events = served[0].events
+    entity = events["entity_id"].value_counts().index[0]
+    user = events.loc[events["entity_id"] == entity, "user_email"].dropna().iloc[0]
+    (status, body), (_, both) = query(
+        served,
+        f"/events?entity_id={entity}&order=asc&limit=1000",
+        f"/events?entity_id={entity}&user_email={user}",
+    )
+    assert status == 200
+    expected = events[events["entity_id"] == entity]
+    assert body["count"] == len(expected)
+    assert body["returned"] == min(len(expected), MAX_RESULTS)
+    assert {e["entity_id"] for e in body["events"]} == {entity}
+    stamps = [e["event_timestamp_utc"] for e in body["events"] if e["event_timestamp_utc"]]
+    assert stamps == sorted(stamps)
+    assert both["count"] == int(((events["entity_id"] == entity) & (events["user_email"] == user)).sum())
+    assert {(e["entity_id"], e["user_email"]) for e in both["events"]} == {(entity, user)}
+
+
+def test_limit_is_clamped_to_max_results(served):
+    total = len(served[0].events)
+    (_, default), (_, huge), (_, zero), (status, negative) = query(
+        served, "/events", "/events?limit=100000", "/events?limit=0", "/events?limit=-3"
+    )
+    assert (default["count"], default["returned"]) == (total, MAX_RESULTS)
+    assert (huge["count"], huge["returned"]) == (total, MAX_RESULTS)
+    assert (zero["returned"], zero["events"]) == (0, [])
+    assert status == 400 and "limit" in negative["error"]
+
+
+def test_entity_blast_radius(served):
+    index, meta = served
+    (status, body), = query(served, "/entities/ent-0003")
+    assert status == 200
+    assert body["metadata"]["name"] == "M0003"
+    assert body["event_count"] == int((index.events["entity_id"] == "ent-0003").sum())
+    assert body["direct_dependents_count"] == len(meta.reverse_deps.get("ent-0003", []))
+
+
+def test_errors_and_health(served):
+    (missing, _), (bad_time, error), (bad_limit, _), (health, body) = query(
+        served, "/nope", "/events?since=not-a-date", "/events?limit=ten", "/health"
+    )
+    assert (missing, bad_time, bad_limit, health) == (404, 400, 400, 200)
+    assert "error" in error
+    assert body == {"status": "ok", "events": len(served[0].events)}
@@ -0,0 +1,85 @@
+import logging
+
+import pandas as pd
+
+import pigment_audit_change_inspector as inspector
+
+START_DAY = 20_400
+
+
+def day_counts(*days_and_counts, key: str = "svc") -> pd.DataFrame:
+    return pd.DataFrame(
+        [("actor", key, "change", START_DAY + day, count) for day, count in days_and_counts],
+        columns=["dimension", "key", "category", "day", "count"],
+    )
+
+
+def run(path: str, counts: pd.DataFrame) -> pd.DataFrame:
+    # One run: load the state file, update it with the run's counts and save it again.
+    baselines = inspector.load_rate_baselines(path)
+    flags = inspector.update_rate_baselines(baselines, counts)
+    inspector.save_rate_baselines(path, baselines)
+    return flags
+
+
+def quiet_count(day: int) -> int:
+    return 10 + day % 3
+
+
+def test_consecutive_single_day_runs_build_the_baseline(tmp_path):
+    path = str(tmp_path / "rates.json")
+    for day in range(30):
+        assert run(path, day_counts((day, quiet_count(day)))).empty
+    baselines = inspector.load_rate_baselines(path)
+    assert baselines.through == START_DAY + 28
+    assert baselines.pending_day == START_DAY + 29
+    assert baselines.pending == [["actor", "svc", "change", quiet_count(29)]]
+    mean, _, days, last = baselines.stats["actor"]["svc"]["change"]
+    assert (days, last) == (29, START_DAY + 28)
+    assert 10 <= mean <= 12
+
+    flags = run(path, day_counts((30, 4000)))
+    assert flags[["key", "day"]].values.tolist() == [["svc", START_DAY + 30]]
+    assert flags["rate_anomaly"].iloc[0].startswith("actor change 4000/day vs ")
+    # The spike day is only pending; the previous (quiet) day has now been folded in.
+    assert inspector.load_rate_baselines(path).stats["actor"]["svc"]["change"][2] == 30
+
+
+def test_new_key_on_a_runs_last_day_is_kept(tmp_path):
+    path = str(tmp_path / "rates.json")
+    run(path, day_counts((0, 5)))
+    run(path, day_counts((1, 7), key="new-bot"))
+    stats = inspector.load_rate_baselines(path).stats["actor"]
+    assert stats["svc"]["change"][2:] == [1, START_DAY]
+    assert "new-bot" not in stats
+    run(path, day_counts((2, 3)))
+    assert inspector.load_rate_baselines(path).stats["actor"]["new-bot"]["change"] == [7.0, 0.0, 1, START_DAY + 1]
+
+
+def test_overlapping_two_day_runs_match_one_run(tmp_path):
+    days = [(day, quiet_count(day)) for day in range(12)]
+    single = str(tmp_path / "single.json")
+    run(single, day_counts(*days))
+
+    overlapping = str(tmp_path / "overlapping.json")
+    # Each export re-covers the previous export's last day; the first one only saw part of day 1.
+    run(overlapping, day_counts(days[0], (1, 4)))
+    for day in range(1, 11):
+        run(overlapping, day_counts(days[day], days[day + 1]))
+    with open(single) as f, open(overlapping) as g:
+        assert f.read() == g.read()
+
+
+def test_late_events_are_logged_not_counted_and_flags_replayed(tmp_path, caplog):
+    path = str(tmp_path / "rates.json")
+    run(path, day_counts(*[(day, quiet_count(day)) for day in range(10)]))
+    spike = run(path, day_counts((10, 500), (11, 10)))
+    assert spike["day"].tolist() == [START_DAY + 10]
+    before = inspector.load_rate_baselines(path)
+
+    with caplog.at_level(logging.INFO):
+        flags = run(path, day_counts((3, 40), (10, 20), (11, 10)))
+    after = inspector.load_rate_baselines(path)
+    assert "not re-counting 60 actor events" in caplog.text
+    assert flags["rate_anomaly"].tolist() == spike["rate_anomaly"].tolist()
+    assert (after.stats, after.through, after.pending) == (before.stats, before.through, before.pending)
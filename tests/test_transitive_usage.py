@@ -0,0 +1,41 @@
+import pandas as pd
+
+import pigment_audit_change_inspector as inspector
+
+
+def diamond() -> inspector.MetadataContext:
+    # B and C use A, D uses both B and C; E and F use each other and D. Boards and views sit on
+    # different corners so a count that follows both paths to D would double it.
+    metrics = [
+        {"id": "A"},
+        {"id": "B", "referencedBlockIds": ["A"]},
+        {"id": "C", "referencedBlockIds": ["A"]},
+        {"id": "D", "referencedBlockIds": ["B", "C"]},
+        {"id": "E", "referencedBlockIds": ["D", "F"]},
+        {"id": "F", "referencedBlockIds": ["E"]},
+    ]
+    views = [{"id": "view-d", "underlyingId": "D"}, {"id": "view-c", "underlyingId": "C"}, {"id": "view-f", "underlyingId": "F"}]
+    boards = [
+        {"id": "board-d", "blocks": [{"blockId": "D", "blockType": "Metric"}]},
+        {"id": "board-b", "blocks": [{"blockId": "B", "blockType": "Metric"}, {"blockId": "view-d", "blockType": "View"}]},
+        {"id": "board-c", "blocks": [{"blockId": "view-c", "blockType": "View"}]},
+    ]
+    return inspector.build_metadata_context({"metrics": metrics, "views": views, "boards": boards})
+
+
+def test_diamond_counts_each_board_and_view_once():
+    meta = diamond()
+    boards, views = inspector.transitive_usage(meta)
+    assert boards == {"A": 3, "B": 2, "C": 3, "D": 2}
+    assert views == {"A": 3, "B": 2, "C": 3, "D": 2, "E": 1, "F": 1}
+    assert inspector.transitive_usage(meta) == (boards, views)
+
+
+def test_enrichment_reports_transitive_counts_next_to_direct_ones():
+    meta = diamond()
+    events = pd.DataFrame({"entity_id": ["A", "D", "E", "unknown"]})
+    columns = inspector.entity_metadata_columns(events["entity_id"], meta, None)
+    counts = columns[["boards_using_count", "boards_impacted_transitive", "views_impacted_transitive"]].fillna(0).astype(int)
+    assert counts["boards_using_count"].tolist() == [0, 2, 0, 0]
+    assert counts["boards_impacted_transitive"].tolist() == [3, 2, 0, 0]
+    assert counts["views_impacted_transitive"].tolist() == [3, 2, 1, 0]
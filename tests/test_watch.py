@@ -0,0 +1,98 @@
+import csv
+import logging
+import os
+import time
+
+import pandas as pd
+
+import pigment_audit_change_inspector as inspector
+from conftest import AUDIT_HEADER
+
+REWRITTEN = ["entity_change_summary.csv", "change_sessions.csv", "report.md"]
+
+
+def write_drop(path: str, rows) -> str:
+    # rows: (event_id, timestamp, event_type, user_email, entity_id); the mtime is pushed past the
+    # settle window so the next poll picks the file up.
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(AUDIT_HEADER)
+        for event_id, ts, event_type, user, entity in rows:
+            writer.writerow([event_id, ts, event_type, "Org", "1", user, "Metric", entity, f"M-{entity}", "app-1", "App1", "{}"])
+    past = time.time() - 60
+    os.utime(path, (past, past))
+    return path
+
+
+def test_second_drop_skips_ingested_events_and_keeps_first_copy(tmp_path, monkeypatch, caplog):
+    watch_dir = tmp_path / "incoming"
+    watch_dir.mkdir()
+    out = str(tmp_path / "out")
+    write_drop(str(watch_dir / "a.csv"), [
+        ("e1", "2025-12-01 10:00:00.000 UTC", "MetricUpdated", "a@x", "ent-1"),
+        ("e2", "2025-12-01 10:05:00.000 UTC", "MetricDeleted", "a@x", "ent-2"),
+        ("e3", "2025-12-01 10:10:00.000 UTC", "FormulaUpdated", "b@x", "ent-1"),
+    ])
+    second_drop = [
+        # e2 comes back newer (warned about, first copy kept); e3 comes back unchanged.
+        ("e2", "2025-12-02 09:00:00.000 UTC", "MetricCreated", "c@x", "ent-9"),
+        ("e3", "2025-12-01 10:10:00.000 UTC", "FormulaUpdated", "b@x", "ent-1"),
+        ("e4", "2025-12-01 11:00:00.000 UTC", "MetricUpdated", "b@x", "ent-3"),
+    ]
+
+    # The second file lands while the watcher sleeps between polls.
+    def drop_second_file(seconds):
+        if not (watch_dir / "b.csv").exists():
+            write_drop(str(watch_dir / "b.csv"), second_drop)
+
+    replaced = []
+    real_replace = os.replace
+
+    def record_replace(src, dst):
+        replaced.append((os.path.basename(src), os.path.basename(dst)))
+        real_replace(src, dst)
+
+    monkeypatch.setattr(inspector.time, "sleep", drop_second_file)
+    monkeypatch.setattr(inspector.os, "replace", record_replace)
+    args = inspector.parse_args(["--watch", str(watch_dir), "--out", out, "--watch-interval", "0"])
+    with caplog.at_level(logging.INFO):
+        assert inspector.run_watch(args, max_polls=3) == 0
+
+    assert "Skipping 2 events already ingested" in caplog.text
+    warnings = [r.getMessage() for r in caplog.records if r.levelno == logging.WARNING]
+    assert len(warnings) == 1 and warnings[0].startswith("1 re-emitted events are newer than their ingested copy")
+    assert "reloading" not in caplog.text
+
+    events = pd.read_csv(os.path.join(out, "events_enriched.csv"), dtype=str)
+    assert sorted(events["event_id"]) == ["e1", "e2", "e3", "e4"]
+    assert events.set_index("event_id").loc["e2", ["event_type", "user_email"]].tolist() == ["MetricDeleted", "a@x"]
+    changes = pd.read_csv(os.path.join(out, "changes_timeline.csv"), dtype=str)
+    assert len(changes) == 4
+
+    # Each poll that ingested something rewrote the derived outputs through a temp file.
+    for name in REWRITTEN:
+        assert replaced.count((f"{name}.tmp", name)) == 2, name
+    assert not [f for f in os.listdir(out) if f.endswith(".tmp")]
+    summary = pd.read_csv(os.path.join(out, "entity_change_summary.csv"), dtype=str).set_index("entity_id_norm")
+    assert summary.loc["ent-1", "top_users"] == "a@x=1;b@x=1"
+    assert "ent-9" not in summary.index
+
+
+def test_changed_metadata_is_reloaded(tmp_path, metadata_snapshot, monkeypatch, caplog):
+    watch_dir = tmp_path / "incoming"
+    watch_dir.mkdir()
+    touched = []
+
+    def touch_metadata(seconds):
+        if not touched:
+            later = time.time() + 5
+            os.utime(metadata_snapshot, (later, later))
+            touched.append(later)
+
+    monkeypatch.setattr(inspector.time, "sleep", touch_metadata)
+    args = inspector.parse_args([
+        "--watch", str(watch_dir), "--out", str(tmp_path / "out"), "--metadata", metadata_snapshot,
+    ])
+    with caplog.at_level(logging.INFO):
+        assert inspector.run_watch(args, max_polls=3) == 0
+    assert caplog.text.count("Metadata snapshot changed; reloading") == 1